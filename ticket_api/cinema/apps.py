@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 
 class CinemaConfig(AppConfig):
-    name = 'cinema'
+    name = 'ticket_api.cinema'
+    label = 'cinema'
+
+    def ready(self):
+        # Registers system checks
+        from ticket_api.cinema import checks  # noqa: F401
@@ -0,0 +1,98 @@
+from datetime import date
+from datetime import timedelta
+
+from django.db import connection
+from django.db import transaction
+
+from ticket_api.cinema.models import ArchivedMovieSession
+from ticket_api.cinema.models import ArchivedTicket
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+
+
+def ensure_ticket_partitions(dates):
+    """
+    Creates monthly partitions of archived tickets covering given dates,
+    only PostgreSQL has the table partitioned.
+    """
+    if connection.vendor != 'postgresql':
+        return
+
+    months = sorted({day.replace(day=1) for day in dates})
+    with connection.cursor() as cursor:
+        for month in months:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS '
+                f'cinema_archivedticket_{month:%Y_%m} '
+                f'PARTITION OF cinema_archivedticket '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                # Plain literals, older servers don't take casts in bounds
+                [month.isoformat(), next_month.isoformat()],
+            )
+
+
+def archive_movie_sessions(before: date, batch_size: int = 100):
+    """
+    Moves sessions older than the date with their tickets into archive
+    tables, a batch of sessions per transaction.
+
+    Returns numbers of archived sessions and tickets.
+    """
+    sessions_number = 0
+    tickets_number = 0
+
+    while True:
+        with transaction.atomic():
+            movie_sessions = list(
+                MovieSession.objects.filter(date__lt=before)
+                .order_by('date', 'pk')[:batch_size]
+            )
+            if not movie_sessions:
+                break
+
+            tickets = list(
+                Ticket.objects.filter(movie_session__in=movie_sessions)
+            )
+            session_dates = {
+                movie_session.pk: movie_session.date
+                for movie_session in movie_sessions
+            }
+            ensure_ticket_partitions(session_dates.values())
+
+            ArchivedMovieSession.objects.bulk_create(
+                ArchivedMovieSession(
+                    id=movie_session.pk,
+                    movie_id=movie_session.movie_id,
+                    hall_id=movie_session.hall_id,
+                    date=movie_session.date,
+                    starts_at=movie_session.starts_at,
+                    ticket_cost=movie_session.ticket_cost,
+                    advertise_duration=movie_session.advertise_duration,
+                )
+                for movie_session in movie_sessions
+            )
+            ArchivedTicket.objects.bulk_create(
+                ArchivedTicket(
+                    id=ticket.pk,
+                    movie_session_id=ticket.movie_session_id,
+                    session_date=session_dates[ticket.movie_session_id],
+                    customer_id=ticket.customer_id,
+                    row_number=ticket.row_number,
+                    seat_number=ticket.seat_number,
+                    order_number=ticket.order_number,
+                    cost=ticket.cost,
+                    booked_at=ticket.booked_at,
+                    paid_at=ticket.paid_at,
+                    checked_in_at=ticket.checked_in_at,
+                )
+                for ticket in tickets
+            )
+
+            Ticket.objects.filter(movie_session__in=movie_sessions).delete()
+            MovieSession.objects.filter(pk__in=session_dates).delete()
+
+        sessions_number += len(movie_sessions)
+        tickets_number += len(tickets)
+
+    return sessions_number, tickets_number
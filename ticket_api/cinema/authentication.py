@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from ticket_api.cinema.models import User
+from ticket_api.cinema.tokens import DATETIME_CLAIMS
+from ticket_api.cinema.tokens import USER_CLAIMS
+from ticket_api.cinema.tokens import are_claims_trusted
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Builds the user from signed token claims instead of loading its row.
+
+    Fields absent from the claims are deferred, so they are still loaded
+    lazily on access and never overwritten by `save()`. Tokens without
+    claims or with revoked ones fall back to the database lookup.
+    """
+
+    def authenticate_header(self, request):
+        # Keeps 403 responses for failed authentication, as they were while
+        # session authentication was the first one
+        return None
+
+    def get_user(self, validated_token):
+        if not are_claims_trusted(validated_token):
+            return super(ClaimsJWTAuthentication, self).get_user(
+                validated_token,
+            )
+
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(
+                'User is inactive',
+                code='user_inactive',
+            )
+
+        known = {
+            api_settings.USER_ID_FIELD:
+                validated_token[api_settings.USER_ID_CLAIM],
+        }
+        for claim in USER_CLAIMS:
+            value = validated_token[claim]
+            if claim in DATETIME_CLAIMS and value is not None:
+                value = datetime.fromtimestamp(value, timezone.utc)
+            known[claim] = value
+
+        # `from_db` expects values in the order of concrete fields
+        field_names = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in known
+        ]
+        values = [known[name] for name in field_names]
+
+        return User.from_db(DEFAULT_DB_ALIAS, field_names, values)
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from ticket_api.cinema.hashing import must_update
+from ticket_api.cinema.hashing import password_hashing
+
+UserModel = get_user_model()
+
+
+class OffloadedHashingBackend(ModelBackend):
+    """
+    Model backend verifying passwords through the hashing pool.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway, so missing users can't be told apart by timing
+            password_hashing.make_password(password)
+            return None
+
+        if not password_hashing.check_password(password, user.password):
+            return None
+
+        if must_update(user.password):
+            user.password = password_hashing.make_password(password)
+            user.save(update_fields=['password'])
+
+        if self.user_can_authenticate(user):
+            return user
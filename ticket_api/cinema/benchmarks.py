@@ -0,0 +1,255 @@
+import random
+from collections import Counter
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time
+from datetime import timedelta
+from time import perf_counter
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import make_password
+from django.db import DatabaseError
+from django.db import connection
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ticket_api.cinema.exceptions import AttemptsIsOverError
+from ticket_api.cinema.exceptions import MovieSessionOverlapsError
+from ticket_api.cinema.exceptions import NoBookingAvailableError
+from ticket_api.cinema.exceptions import SeatNotAvailableError
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.models import User
+from ticket_api.cinema.tasks import cancel_non_paid_booking
+from ticket_api.cinema.utils import percentile
+
+UNIFORM = 'uniform'
+SAME_SEAT = 'same_seat'
+SOLD_OUT = 'sold_out'
+SCENARIOS = (UNIFORM, SAME_SEAT, SOLD_OUT)
+
+BOOKED = 'booked'
+SEAT_NOT_AVAILABLE = 'seat_not_available'
+NO_BOOKING_AVAILABLE = 'no_booking_available'
+ATTEMPTS_IS_OVER = 'attempts_is_over'
+DATABASE_ERROR = 'database_error'
+
+Attempt = namedtuple('Attempt', 'customer_pk row_number seat_number')
+Outcome = namedtuple('Outcome', 'status duration queries')
+
+
+class BookingBenchmarkResult(
+    namedtuple(
+        'BookingBenchmarkResult',
+        'scenario booking_mode attempts elapsed outcomes durations queries',
+    )
+):
+    @property
+    def throughput(self) -> float:
+        return self.attempts / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.durations, 0.5)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.durations, 0.99)
+
+    @property
+    def conflict_rate(self) -> float:
+        """
+        Share of attempts which hit the unique seat constraint.
+        """
+        if not self.attempts:
+            return 0.0
+        return self.outcomes[SEAT_NOT_AVAILABLE] / self.attempts
+
+    @property
+    def queries_per_booking(self):
+        # Queued bookings are saved by consumer thread, out of sight
+        if self.booking_mode == MovieSession.QUEUED_BOOKING:
+            return None
+        if not self.outcomes[BOOKED]:
+            return 0.0
+        return self.queries[BOOKED] / self.outcomes[BOOKED]
+
+    def report(self) -> str:
+        outcomes = ', '.join(
+            f'{status}={count}'
+            for status, count in sorted(self.outcomes.items())
+        )
+        queries_per_booking = self.queries_per_booking
+        if queries_per_booking is None:
+            queries_per_booking = 'n/a'
+        else:
+            queries_per_booking = f'{queries_per_booking:.1f}'
+        return (
+            f'scenario: {self.scenario} ({self.booking_mode} booking)\n'
+            f'attempts: {self.attempts} in {self.elapsed:.3f}s '
+            f'({self.throughput:.1f}/s)\n'
+            f'latency: p50={self.p50 * 1000:.2f}ms '
+            f'p99={self.p99 * 1000:.2f}ms\n'
+            f'outcomes: {outcomes}\n'
+            f'conflict rate: {self.conflict_rate:.2%}\n'
+            f'queries per booking: {queries_per_booking}'
+        )
+
+
+def book(movie_session_pk: int, attempt: Attempt) -> Outcome:
+    """
+    Makes one booking attempt the way `book_ticket` view does.
+
+    Module level function, so it can be sent to worker processes.
+    """
+    with CaptureQueriesContext(connection) as context:
+        started = perf_counter()
+        try:
+            movie_session = MovieSession.objects.get(pk=movie_session_pk)
+            customer = User.objects.get(pk=attempt.customer_pk)
+            movie_session.book_ticket(
+                customer,
+                row_number=attempt.row_number,
+                seat_number=attempt.seat_number,
+            )
+        except SeatNotAvailableError:
+            status = SEAT_NOT_AVAILABLE
+        except NoBookingAvailableError:
+            status = NO_BOOKING_AVAILABLE
+        except AttemptsIsOverError:
+            status = ATTEMPTS_IS_OVER
+        except DatabaseError:
+            status = DATABASE_ERROR
+        else:
+            status = BOOKED
+        duration = perf_counter() - started
+
+    return Outcome(status, duration, len(context.captured_queries))
+
+
+def create_movie_session(hall: Hall, movie: Movie) -> MovieSession:
+    """
+    Creates session at the first day free of other sessions in the hall.
+    """
+    day = timezone.localdate() + timedelta(days=1)
+    while True:
+        try:
+            return MovieSession.objects.create(
+                hall=hall,
+                movie=movie,
+                date=day,
+                starts_at=time(12),
+                ticket_cost=100,
+            )
+        except MovieSessionOverlapsError:
+            day += timedelta(days=1)
+
+
+def create_customers(number: int, prefix: str):
+    # Unusable password is cheap to make, unlike a real hash
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(email=f'{prefix}-{i}@example.com', password=password)
+        for i in range(number)
+    )
+    return list(
+        User.objects.filter(email__startswith=f'{prefix}-')
+        .values_list('pk', flat=True)
+    )
+
+
+def make_attempts(scenario, movie_session, customer_pks, number, rnd):
+    hall = movie_session.hall
+    seats = [
+        (row_number, seat_number)
+        for row_number in range(1, hall.rows_number + 1)
+        for seat_number in range(1, hall.seats_per_row + 1)
+    ]
+
+    if scenario == UNIFORM:
+        chosen = [rnd.choice(seats) for _ in range(number)]
+    elif scenario == SAME_SEAT:
+        chosen = [seats[len(seats) // 2]] * number
+    elif scenario == SOLD_OUT:
+        # Session is pre-filled up to a few seats everyone races for
+        rnd.shuffle(seats)
+        free = seats[:max(len(seats) // 100, 1)]
+        Ticket.objects.bulk_create(
+            Ticket(
+                movie_session=movie_session,
+                customer_id=customer_pks[i % len(customer_pks)],
+                row_number=row_number,
+                seat_number=seat_number,
+                order_number=f'B{movie_session.pk:05d}{i:06d}',
+                cost=movie_session.ticket_cost,
+            )
+            for i, (row_number, seat_number) in enumerate(seats[len(free):])
+        )
+        chosen = [rnd.choice(free) for _ in range(number)]
+    else:
+        raise ValueError(f'Unknown scenario: {scenario}')
+
+    return [
+        Attempt(customer_pks[i % len(customer_pks)], row_number, seat_number)
+        for i, (row_number, seat_number) in enumerate(chosen)
+    ]
+
+
+def run_booking_benchmark(
+        movie_session: MovieSession,
+        customer_pks,
+        scenario: str = UNIFORM,
+        booking_mode: str = MovieSession.DIRECT_BOOKING,
+        attempts: int = 100,
+        concurrency: int = 4,
+        processes: bool = False,
+        seed: int = 0,
+) -> BookingBenchmarkResult:
+    movie_session.switch(booking_mode=booking_mode)
+    attempt_list = make_attempts(
+        scenario,
+        movie_session,
+        customer_pks,
+        attempts,
+        random.Random(seed),
+    )
+
+    if processes:
+        # Forked processes must not share parent's connections
+        connections.close_all()
+        executor_class = ProcessPoolExecutor
+    else:
+        executor_class = ThreadPoolExecutor
+
+    # Auto cancellation must not reach the broker, only booking is measured
+    with patch.object(cancel_non_paid_booking, 'apply_async'), \
+            executor_class(concurrency) as executor:
+        started = perf_counter()
+        outcomes = list(
+            executor.map(
+                book,
+                [movie_session.pk] * len(attempt_list),
+                attempt_list,
+            )
+        )
+        elapsed = perf_counter() - started
+
+    statuses = Counter()
+    queries = Counter()
+    for outcome in outcomes:
+        statuses[outcome.status] += 1
+        queries[outcome.status] += outcome.queries
+
+    return BookingBenchmarkResult(
+        scenario=scenario,
+        booking_mode=booking_mode,
+        attempts=len(outcomes),
+        elapsed=elapsed,
+        outcomes=statuses,
+        durations=sorted(outcome.duration for outcome in outcomes),
+        queries=queries,
+    )
@@ -0,0 +1,126 @@
+import math
+import threading
+from datetime import datetime
+from hashlib import blake2b
+from time import monotonic
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import transaction
+from django.utils import timezone
+
+from ticket_api.cinema.models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set: may answer "maybe" for absent values, but
+    never misses values that were added.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(
+            int(-capacity * math.log(error_rate) / math.log(2) ** 2),
+            8,
+        )
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class RevokedTokenStore:
+    """
+    Revoked token ids stored in the database and mirrored into a per-process
+    Bloom filter snapshot.
+
+    Checking a token that was never revoked costs no I/O while the snapshot
+    is fresh; the database is asked only on a filter hit. Tokens revoked by
+    other processes after the snapshot was taken are seen once it is
+    rebuilt, while `revoke` detects them immediately through the unique
+    constraint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._built_at = None
+
+    def _is_stale(self):
+        return (
+                self._filter is None or
+                monotonic() - self._built_at >
+                settings.REVOKED_TOKENS_SNAPSHOT_TTL.total_seconds()
+        )
+
+    def _locked_snapshot(self) -> BloomFilter:
+        if self._is_stale():
+            revoked = RevokedToken.objects.filter(
+                expires_at__gt=timezone.now(),
+            )
+            bloom_filter = BloomFilter(
+                # Spare room for tokens revoked until next rebuild
+                revoked.count() * 2 + 1024,
+                settings.REVOKED_TOKENS_FILTER_ERROR_RATE,
+            )
+            jtis = revoked.values_list('jti', flat=True)
+            for jti in jtis.iterator():
+                bloom_filter.add(jti)
+
+            self._filter = bloom_filter
+            self._built_at = monotonic()
+
+        return self._filter
+
+    def _snapshot(self) -> BloomFilter:
+        with self._lock:
+            return self._locked_snapshot()
+
+    def invalidate(self):
+        with self._lock:
+            self._filter = None
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._snapshot():
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti: str, expires_at: datetime) -> bool:
+        """
+        Returns `False` when the token has already been revoked.
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+
+        # Under the lock, so that a concurrent rebuild doesn't lose it
+        with self._lock:
+            self._locked_snapshot().add(jti)
+        return True
+
+    def prune(self) -> int:
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now(),
+        ).delete()
+        return deleted
+
+
+revoked_tokens = RevokedTokenStore()
@@ -0,0 +1,228 @@
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import connection
+from django.db import transaction
+
+from ticket_api.cinema.exceptions import BookingQueueBusyError
+from ticket_api.cinema.exceptions import SeatNotAvailableError
+
+BookingRequest = namedtuple(
+    'BookingRequest',
+    'customer row_number seat_number future',
+)
+
+
+def _create_tickets(movie_session, requests):
+    """
+    Saves tickets for the requests with one insert. Seats taken by other
+    processes since the batch started make it fall back to one insert per
+    ticket, conflicting ones are None.
+    """
+    from ticket_api.cinema.models import Ticket
+
+    order_number_field = Ticket._meta.get_field('order_number')
+    order_numbers = order_number_field.default.many(len(requests))
+    tickets = [
+        Ticket(
+            movie_session=movie_session,
+            customer=request.customer,
+            row_number=request.row_number,
+            seat_number=request.seat_number,
+            order_number=order_number,
+            cost=movie_session.ticket_cost,
+        )
+        for request, order_number in zip(requests, order_numbers)
+    ]
+
+    try:
+        with transaction.atomic():
+            Ticket.objects.bulk_create(tickets)
+    except IntegrityError:
+        created = []
+        for ticket in tickets:
+            try:
+                with transaction.atomic():
+                    ticket.save(force_insert=True)
+            except IntegrityError:
+                created.append(None)
+            else:
+                created.append(ticket)
+        return created
+
+    # Only some backends set primary keys of bulk created rows
+    if any(ticket.pk is None for ticket in tickets):
+        pks = dict(
+            Ticket.objects.filter(order_number__in=order_numbers)
+            .values_list('order_number', 'pk')
+        )
+        for ticket in tickets:
+            ticket.pk = pks[ticket.order_number]
+
+    return tickets
+
+
+def process_batch(movie_session_pk, requests):
+    """
+    Books seats for the requests in order of arrival against seats booked
+    so far, then saves all new tickets at once. Every request gets its
+    ticket or error through the future.
+    """
+    from ticket_api.cinema.models import MovieSession
+
+    requests = [
+        request for request in requests
+        if request.future.set_running_or_notify_cancel()
+    ]
+    if not requests:
+        return
+
+    try:
+        movie_session = MovieSession.objects.select_related(
+            'hall',
+            'movie',
+        ).get(pk=movie_session_pk)
+        booked = set(
+            movie_session.tickets.values_list('row_number', 'seat_number')
+        )
+
+        accepted = []
+        for request in requests:
+            seat = (request.row_number, request.seat_number)
+            if seat in booked:
+                request.future.set_exception(SeatNotAvailableError())
+            else:
+                booked.add(seat)
+                accepted.append(request)
+
+        if accepted:
+            tickets = _create_tickets(movie_session, accepted)
+        else:
+            tickets = []
+    except Exception as e:
+        for request in requests:
+            if not request.future.done():
+                request.future.set_exception(e)
+        return
+
+    for request, ticket in zip(accepted, tickets):
+        if ticket is None:
+            request.future.set_exception(SeatNotAvailableError())
+        else:
+            movie_session.schedule_auto_cancelation(ticket)
+            request.future.set_result(ticket)
+
+
+class SessionBookingQueue:
+    """
+    Booking requests of one session handled by a single consumer thread,
+    so they never contend for seats within the process. Consumer takes
+    whatever requests are waiting, up to `BOOKING_QUEUE_BATCH_SIZE`, as one
+    batch and stops after being idle for `BOOKING_QUEUE_IDLE_TIMEOUT`.
+    """
+
+    def __init__(self, movie_session_pk, registry: 'BookingQueues'):
+        self.movie_session_pk = movie_session_pk
+        self.registry = registry
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.consume,
+            name=f'booking-queue-{movie_session_pk}',
+            daemon=True,
+        )
+
+    def _next_batch(self):
+        idle_timeout = settings.BOOKING_QUEUE_IDLE_TIMEOUT.total_seconds()
+        try:
+            batch = [self.requests.get(timeout=idle_timeout)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < settings.BOOKING_QUEUE_BATCH_SIZE:
+            try:
+                batch.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def consume(self):
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    process_batch(self.movie_session_pk, batch)
+                elif self.registry.discard(self):
+                    return
+        finally:
+            connection.close()
+
+
+class BookingQueues:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = {}
+
+    def submit(self, movie_session_pk, customer, row_number, seat_number):
+        future = Future()
+        request = BookingRequest(customer, row_number, seat_number, future)
+        with self._lock:
+            session_queue = self._queues.get(movie_session_pk)
+            if session_queue is None:
+                session_queue = SessionBookingQueue(movie_session_pk, self)
+                self._queues[movie_session_pk] = session_queue
+                session_queue.thread.start()
+            session_queue.requests.put(request)
+        return future
+
+    def discard(self, session_queue: SessionBookingQueue) -> bool:
+        """
+        Forgets idle queue, returns False when requests came meanwhile.
+        """
+        with self._lock:
+            if not session_queue.requests.empty():
+                return False
+            del self._queues[session_queue.movie_session_pk]
+            return True
+
+    def book(self, movie_session, customer, row_number, seat_number):
+        """
+        Books a picked seat through the session queue. Only explicit seat
+        picks are queued, best seats and waitlist promotions insert their
+        tickets directly.
+        """
+        if connection.in_atomic_block:
+            # Consumer wouldn't see data of the caller's transaction
+            future = Future()
+            process_batch(
+                movie_session.pk,
+                [BookingRequest(customer, row_number, seat_number, future)],
+            )
+            return future.result()
+
+        future = self.submit(
+            movie_session.pk,
+            customer,
+            row_number,
+            seat_number,
+        )
+        timeout = settings.BOOKING_QUEUE_TIMEOUT.total_seconds()
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise BookingQueueBusyError()
+
+        # Being processed, but consumer may be stuck on a lock. Ticket saved
+        # after giving up is canceled as non paid.
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            raise BookingQueueBusyError()
+
+
+booking_queues = BookingQueues()
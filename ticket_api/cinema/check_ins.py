@@ -0,0 +1,231 @@
+from base64 import b64encode
+from collections import namedtuple
+from datetime import date
+from datetime import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import DateTimeField
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Value
+from django.db.models import When
+from django.utils import timezone
+
+from ticket_api.cinema.exceptions import EntryClosedAPIError
+from ticket_api.cinema.exceptions import OtherMovieSessionAPIError
+from ticket_api.cinema.exceptions import TicketAlreadyCheckedInAPIError
+from ticket_api.cinema.exceptions import TicketNotPaidAPIError
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+
+CHECKED_IN = 'checked_in'
+NOT_FOUND = 'not_found'
+# Same codes single ticket check in fails with
+OTHER_MOVIE_SESSION = OtherMovieSessionAPIError.default_code
+ENTRY_CLOSED = EntryClosedAPIError.default_code
+ALREADY_CHECKED_IN = TicketAlreadyCheckedInAPIError.default_code
+NOT_PAID = TicketNotPaidAPIError.default_code
+
+CheckInResult = namedtuple(
+    'CheckInResult',
+    'order_number status checked_in_at',
+)
+
+
+def seat_bitmap(rows_number: int, seats_per_row: int, seats) -> str:
+    """
+    Returns base64 of the hall bitmap, bit of every seat goes row by row
+    from the most significant bit of the first byte.
+    """
+    bitmap = bytearray((rows_number * seats_per_row + 7) // 8)
+    for row_number, seat_number in seats:
+        index = (row_number - 1) * seats_per_row + seat_number - 1
+        bitmap[index // 8] |= 0x80 >> index % 8
+    return b64encode(bitmap).decode()
+
+
+def build_manifests(day: date, versions=None, since: datetime = None):
+    """
+    Returns check in manifests of sessions of the day with two queries.
+
+    Manifest lists order numbers of paid tickets ordered by seat, the same
+    order as bits of `seats` bitmap go, `checked_in` bitmap marks seats of
+    checked in tickets.
+
+    Devices refreshing manifests they downloaded at `since` give their
+    versions in `versions` (a dict by session pk). Sessions of the same
+    version come as a delta, manifest of tickets paid or checked in after
+    `since`, or with their version only when none were. Sessions of
+    another version, which their tickets left, come in full.
+    """
+    versions = versions or {}
+    movie_sessions = list(
+        MovieSession.objects.filter(date=day)
+        .order_by('starts_at_dt', 'pk')
+        .values_list(
+            'pk',
+            'manifest_version',
+            'starts_at_dt',
+            'hall__rows_number',
+            'hall__seats_per_row',
+        )
+    )
+    full = {
+        pk for pk, version, *_ in movie_sessions
+        if since is None or versions.get(pk) != version
+    }
+
+    changed = Q(movie_session__in=full)
+    if since is not None:
+        # Changes committed late carry earlier time, so the window overlaps
+        # the previous one, devices merge tickets they already have
+        changed |= Q(
+            movie_session__in=[pk for pk, *_ in movie_sessions],
+            updated_at__gte=since - settings.CHECK_IN_MANIFEST_OVERLAP,
+        )
+
+    tickets = {}
+    if movie_sessions:
+        rows = (
+            Ticket.objects.filter(changed, paid_at__isnull=False)
+            .order_by('movie_session', 'row_number', 'seat_number')
+            .values_list(
+                'movie_session_id',
+                'order_number',
+                'row_number',
+                'seat_number',
+                'checked_in_at',
+            )
+        )
+        for movie_session_pk, *ticket in rows:
+            tickets.setdefault(movie_session_pk, []).append(ticket)
+
+    manifests = []
+    for pk, version, starts_at_dt, rows_number, seats_per_row in \
+            movie_sessions:
+        manifest = {'movie_session': pk, 'version': version}
+        session_tickets = tickets.get(pk, [])
+        if pk in full or session_tickets:
+            manifest.update(
+                delta=pk not in full,
+                starts_at_dt=starts_at_dt,
+                rows_number=rows_number,
+                seats_per_row=seats_per_row,
+                order_numbers=[
+                    order_number for order_number, *_ in session_tickets
+                ],
+                seats=seat_bitmap(
+                    rows_number,
+                    seats_per_row,
+                    (
+                        (row_number, seat_number)
+                        for _, row_number, seat_number, _ in session_tickets
+                    ),
+                ),
+                checked_in=seat_bitmap(
+                    rows_number,
+                    seats_per_row,
+                    (
+                        (row_number, seat_number)
+                        for _, row_number, seat_number, checked_in_at
+                        in session_tickets
+                        if checked_in_at is not None
+                    ),
+                ),
+            )
+        manifests.append(manifest)
+    return manifests
+
+
+@transaction.atomic
+def sync_check_ins(events):
+    """
+    Applies `(order_number, movie_session_pk, checked_in_at)` scans made by
+    door devices offline, session pk may be `None` to skip its check.
+    Scans outside the entry window of the ticket's session, as door check
+    in has it, are rejected. Returns result of every event in given order.
+
+    The earliest scan of a ticket wins whatever order devices sync in, so
+    sending a batch again gives the same results. Scans from the future
+    count as made now.
+    """
+    now = timezone.now()
+    events = [
+        (order_number, movie_session_pk, min(checked_in_at, now))
+        for order_number, movie_session_pk, checked_in_at in events
+    ]
+
+    # Locked in the same order by every sync, so they don't deadlock
+    tickets = {
+        order_number: ticket
+        for order_number, *ticket in
+        Ticket.objects.filter(
+            order_number__in={order_number for order_number, *_ in events},
+        )
+        .select_for_update(of=('self',))
+        .order_by('pk')
+        .values_list(
+            'order_number',
+            'pk',
+            'movie_session_id',
+            'paid_at',
+            'checked_in_at',
+            'movie_session__starts_at_dt',
+        )
+    }
+
+    # Events to be told by the earliest scans, `None` status
+    statuses = []
+    earliest = {}
+    for order_number, movie_session_pk, checked_in_at in events:
+        ticket = tickets.get(order_number)
+        if ticket is None:
+            statuses.append(NOT_FOUND)
+        elif ticket[2] is None:
+            statuses.append(NOT_PAID)
+        elif movie_session_pk is not None and movie_session_pk != ticket[1]:
+            statuses.append(OTHER_MOVIE_SESSION)
+        elif not (
+                ticket[4] - settings.TICKET_CODE_ENTRY_PERIOD <=
+                checked_in_at <=
+                ticket[4] + settings.CHECK_IN_CLOSE_PERIOD
+        ):
+            statuses.append(ENTRY_CLOSED)
+        else:
+            statuses.append(None)
+            stored = earliest.get(order_number, ticket[3])
+            if stored is None or checked_in_at < stored:
+                earliest[order_number] = checked_in_at
+
+    if earliest:
+        Ticket.objects.filter(
+            order_number__in=list(earliest),
+        ).update(
+            checked_in_at=Case(
+                *(
+                    When(order_number=order_number, then=Value(checked_in_at))
+                    for order_number, checked_in_at in earliest.items()
+                ),
+                default=F('checked_in_at'),
+                output_field=DateTimeField(),
+            ),
+            updated_at=now,
+        )
+
+    results = []
+    for (order_number, _, checked_in_at), status in zip(events, statuses):
+        if status is not None:
+            results.append(CheckInResult(order_number, status, None))
+            continue
+
+        winner = earliest.get(order_number, tickets[order_number][3])
+        results.append(
+            CheckInResult(
+                order_number,
+                CHECKED_IN if checked_in_at == winner else ALREADY_CHECKED_IN,
+                winner,
+            ),
+        )
+    return results
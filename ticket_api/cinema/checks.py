@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Tags
+from django.core.checks import Warning
+from django.core.checks import register
+
+# Caches holding state every process must see, e.g. revocations
+SHARED_CACHES = (
+    'JWT_REVOCATION_CACHE',
+    'SQL_PROFILE_CACHE',
+    'WAITING_ROOM_CACHE',
+)
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    warnings = []
+    for name in SHARED_CACHES:
+        alias = getattr(settings, name)
+        if settings.CACHES[alias]['BACKEND'] == LOCAL_CACHE_BACKEND:
+            warnings.append(
+                Warning(
+                    f'{name} is process local cache "{alias}", other '
+                    f'workers never see its entries.',
+                    hint='Set DJANGO_MEMCACHED_LOCATION.',
+                    id='cinema.W001',
+                ),
+            )
+    return warnings
@@ -1,5 +1,7 @@
 from rest_framework.exceptions import APIException
+from rest_framework.exceptions import Throttled
 from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
 
 
 class AttemptsIsOverError(Exception):
@@ -10,6 +12,14 @@ class SeatNotAvailableError(Exception):
     ...
 
 
+class NoSuitableSeatsError(Exception):
+    ...
+
+
+class SeatsAvailableError(Exception):
+    ...
+
+
 class TicketAlreadyPaidError(Exception):
     ...
 
@@ -18,6 +28,34 @@ class NoBookingAvailableError(Exception):
     ...
 
 
+class TicketNotPaidError(Exception):
+    ...
+
+
+class TicketAlreadyCheckedInError(Exception):
+    ...
+
+
+class OtherMovieSessionError(Exception):
+    ...
+
+
+class EntryClosedError(Exception):
+    ...
+
+
+class InvalidTicketCodeError(Exception):
+    ...
+
+
+class TicketCodeOutOfDateError(Exception):
+    ...
+
+
+class TicketCodeRevokedError(Exception):
+    ...
+
+
 class MovieIsScheduledError(Exception):
     ...
 
@@ -30,12 +68,43 @@ class MovieSessionOverlapsError(Exception):
     ...
 
 
+class PasswordHashingOverloadedError(Exception):
+    ...
+
+
+class BookingQueueBusyError(Exception):
+    ...
+
+
+class IncompatibleMovieSessionError(Exception):
+    ...
+
+
 class SeatNotAvailableAPIError(APIException):
     status_code = HTTP_422_UNPROCESSABLE_ENTITY
     default_code = 'seat_not_available'
     default_detail = 'Seat not available.'
 
 
+class NoSuitableSeatsAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'no_suitable_seats'
+    default_detail = 'No suitable seats.'
+
+
+class IncompatibleMovieSessionAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'incompatible_movie_session'
+    default_detail = 'Tickets can be moved only to another session ' \
+                     'of the same movie open for booking.'
+
+
+class SeatsAvailableAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'seats_available'
+    default_detail = 'Seats are available, book them instead.'
+
+
 class TicketAlreadyPaidAPIError(APIException):
     status_code = HTTP_422_UNPROCESSABLE_ENTITY
     default_code = 'ticket_already_paid'
@@ -48,6 +117,48 @@ class NoBookingAvailableAPIError(APIException):
     default_detail = 'No booking available.'
 
 
+class TicketNotPaidAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'ticket_not_paid'
+    default_detail = 'Ticket is not paid.'
+
+
+class TicketAlreadyCheckedInAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'ticket_already_checked_in'
+    default_detail = 'Ticket already checked in.'
+
+
+class OtherMovieSessionAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'other_movie_session'
+    default_detail = 'Ticket is for another movie session.'
+
+
+class EntryClosedAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'entry_closed'
+    default_detail = 'Entry to the movie session is not open now.'
+
+
+class InvalidTicketCodeAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'invalid_ticket_code'
+    default_detail = 'Invalid ticket code.'
+
+
+class TicketCodeOutOfDateAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'ticket_code_out_of_date'
+    default_detail = 'Ticket code is not valid at this time.'
+
+
+class TicketCodeRevokedAPIError(APIException):
+    status_code = HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'ticket_code_revoked'
+    default_detail = 'Ticket code is revoked.'
+
+
 class MovieIsScheduledAPIError(APIException):
     status_code = HTTP_422_UNPROCESSABLE_ENTITY
     default_code = 'movie_is_scheduled'
@@ -64,3 +175,20 @@ class MovieSessionOverlapsAPIError(APIException):
     status_code = HTTP_422_UNPROCESSABLE_ENTITY
     default_code = 'movie_session_overlaps'
     default_detail = 'Movie session overlaps.'
+
+
+class PasswordHashingOverloadedAPIError(APIException):
+    status_code = HTTP_503_SERVICE_UNAVAILABLE
+    default_code = 'password_hashing_overloaded'
+    default_detail = 'Too many login attempts, try again later.'
+
+
+class BookingQueueBusyAPIError(APIException):
+    status_code = HTTP_503_SERVICE_UNAVAILABLE
+    default_code = 'booking_queue_busy'
+    default_detail = 'Too many bookings of the session, try again later.'
+
+
+class NotAdmittedAPIError(Throttled):
+    default_code = 'not_admitted'
+    default_detail = 'Waiting for admission.'
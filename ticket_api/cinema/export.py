@@ -0,0 +1,149 @@
+import csv
+import io
+from datetime import date
+from datetime import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from rest_framework.utils import encoders
+
+from ticket_api.cinema.renderers import dumps
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    NDJSON: 'application/x-ndjson',
+}
+EXPORT_URL_PATH = rf'export\.(?P<export_format>{CSV}|{NDJSON})'
+
+# Column names and paths of values, related ones are joined in SQL
+TICKET_COLUMNS = (
+    ('id', 'pk'),
+    ('order_number', 'order_number'),
+    ('movie_session', 'movie_session_id'),
+    ('movie', 'movie_session__movie__name'),
+    ('hall', 'movie_session__hall__name'),
+    ('date', 'movie_session__date'),
+    ('starts_at', 'movie_session__starts_at'),
+    ('customer', 'customer__email'),
+    ('row_number', 'row_number'),
+    ('seat_number', 'seat_number'),
+    ('cost', 'cost'),
+    ('booked_at', 'booked_at'),
+    ('paid_at', 'paid_at'),
+)
+MOVIE_SESSION_COLUMNS = (
+    ('id', 'pk'),
+    ('movie', 'movie__name'),
+    ('hall', 'hall__name'),
+    ('date', 'date'),
+    ('starts_at', 'starts_at'),
+    ('starts_at_dt', 'starts_at_dt'),
+    ('ticket_cost', 'ticket_cost'),
+    ('booked_seats', 'booked_seats_number'),
+    ('high_demand', 'high_demand'),
+    ('booking_mode', 'booking_mode'),
+)
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def _export_value(value):
+    # Same representation as API responses have
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, time)):
+        return _drf_encoder.default(value)
+    return value
+
+
+def export_rows(queryset, columns):
+    """
+    Yields rows of column values, loading `EXPORT_CHUNK_SIZE` rows at a
+    time.
+    """
+    paths = [path for _, path in columns]
+    rows = queryset.values_list(*paths).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+    for row in rows:
+        yield [_export_value(value) for value in row]
+
+
+def csv_lines(rows, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    # Header goes out before the first query completes
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= settings.EXPORT_BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_lines(rows, header):
+    lines = []
+    size = 0
+    for row in rows:
+        line = dumps(dict(zip(header, row))) + b'\n'
+        lines.append(line)
+        size += len(line)
+        if size >= settings.EXPORT_BUFFER_SIZE:
+            yield b''.join(lines)
+            lines = []
+            size = 0
+
+    if lines:
+        yield b''.join(lines)
+
+
+def export_response(queryset, columns, export_format, filename):
+    """
+    Streams the queryset as CSV or NDJSON in constant memory.
+    """
+    header = [name for name, _ in columns]
+    rows = export_rows(queryset, columns)
+    if export_format == CSV:
+        content = csv_lines(rows, header)
+    else:
+        content = ndjson_lines(rows, header)
+
+    response = StreamingHttpResponse(
+        content,
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
+def export_tickets(queryset, export_format):
+    return export_response(
+        queryset.order_by('pk'),
+        TICKET_COLUMNS,
+        export_format,
+        'tickets',
+    )
+
+
+def export_movie_sessions(queryset, export_format):
+    return export_response(
+        queryset.annotate(booked_seats_number=Count('tickets'))
+        .order_by('starts_at_dt', 'pk'),
+        MOVIE_SESSION_COLUMNS,
+        export_format,
+        'movie-sessions',
+    )
@@ -1,5 +1,7 @@
+from django.contrib.auth.forms import UserCreationForm
 from django_registration.forms import RegistrationForm as DjangoRegistrationForm
 
+from ticket_api.cinema.hashing import password_hashing
 from ticket_api.cinema.models import User
 
 
@@ -11,3 +13,13 @@ class RegistrationForm(DjangoRegistrationForm):
             'password1',
             'password2',
         ]
+
+    def save(self, commit=True):
+        # Same as `UserCreationForm.save` but hashing in the pool
+        user = super(UserCreationForm, self).save(commit=False)
+        user.password = password_hashing.make_password(
+            self.cleaned_data['password1'],
+        )
+        if commit:
+            user.save()
+        return user
@@ -0,0 +1,118 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from ticket_api.cinema.exceptions import PasswordHashingOverloadedError
+
+
+def must_update(encoded: str) -> bool:
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return True
+    return (
+            hasher.algorithm != preferred.algorithm or
+            preferred.must_update(encoded)
+    )
+
+
+class PasswordHashingService:
+    """
+    Runs password hashing in a bounded process pool.
+
+    Requests beyond `PASSWORD_HASHING_MAX_PENDING` are rejected at once
+    instead of queueing up behind CPU bound work. Zero workers means
+    hashing inline, which is used in tests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.pending = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+        self.failed_total = 0
+        self.completed_total = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # Pool can't be inherited, e.g. by forked gunicorn workers
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    settings.PASSWORD_HASHING_WORKERS,
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _release(self, failed: bool):
+        with self._lock:
+            self.pending -= 1
+            if failed:
+                self.failed_total += 1
+            else:
+                self.completed_total += 1
+
+    def _on_done(self, future):
+        self._release(future.cancelled() or future.exception() is not None)
+
+    def _run(self, func, *args):
+        with self._lock:
+            if self.pending >= settings.PASSWORD_HASHING_MAX_PENDING:
+                self.rejected_total += 1
+                raise PasswordHashingOverloadedError()
+            self.pending += 1
+
+        if not settings.PASSWORD_HASHING_WORKERS:
+            try:
+                result = func(*args)
+            except BaseException:
+                self._release(failed=True)
+                raise
+            self._release(failed=False)
+            return result
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release(failed=True)
+            raise
+        # Hash stays pending until the pool is done with it, which may be
+        # long after the caller gave up waiting
+        future.add_done_callback(self._on_done)
+
+        try:
+            return future.result(
+                settings.PASSWORD_HASHING_TIMEOUT.total_seconds(),
+            )
+        except TimeoutError:
+            # Cancels only hashes not started yet
+            future.cancel()
+            with self._lock:
+                self.timed_out_total += 1
+            raise PasswordHashingOverloadedError()
+
+    def check_password(self, password: str, encoded: str) -> bool:
+        return self._run(hashers.check_password, password, encoded)
+
+    def make_password(self, password: str) -> str:
+        return self._run(hashers.make_password, password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'pending': self.pending,
+                'max_pending': settings.PASSWORD_HASHING_MAX_PENDING,
+                'rejected_total': self.rejected_total,
+                'timed_out_total': self.timed_out_total,
+                'failed_total': self.failed_total,
+                'completed_total': self.completed_total,
+            }
+
+
+password_hashing = PasswordHashingService()
@@ -0,0 +1,229 @@
+import json
+import re
+import threading
+from collections import Counter
+from collections import defaultdict
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.error import URLError
+from urllib.parse import urljoin
+from urllib.parse import urlsplit
+from urllib.request import Request
+from urllib.request import urlopen
+
+from ticket_api.cinema.models import User
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+from ticket_api.cinema.utils import percentile
+
+# Status of requests which got no response at all
+CONNECTION_ERROR = 'connection_error'
+
+Sample = namedtuple('Sample', 'endpoint status duration')
+TrafficRecord = namedtuple('TrafficRecord', 'method path body user')
+
+_ID_SEGMENT_RE = re.compile(r'/\d+(?=/|$)')
+
+
+def get_endpoint(method: str, path: str) -> str:
+    """
+    Names endpoint after the request with object ids and query stripped,
+    for example `POST /api/movie-sessions/{id}/book_ticket/`.
+    """
+    path = _ID_SEGMENT_RE.sub('/{id}', urlsplit(path).path)
+    return f'{method} {path}'
+
+
+def read_traffic(lines):
+    for line in lines:
+        if line.strip():
+            record = json.loads(line)
+            yield TrafficRecord(
+                method=record['method'],
+                path=record['path'],
+                body=record.get('body'),
+                user=record.get('user'),
+            )
+
+
+class LoadClient:
+    """
+    Thread safe HTTP client recording every response it gets.
+
+    Users are authenticated with access tokens signed locally, so the
+    target instance must share the secret key and the database.
+    """
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.samples = []
+        self._lock = threading.Lock()
+        self._tokens = {}
+
+    def token_for(self, user_pk) -> str:
+        with self._lock:
+            token = self._tokens.get(user_pk)
+        if token is None:
+            user = User.objects.get(pk=user_pk)
+            token = str(ClaimsRefreshToken.for_user(user).access_token)
+            with self._lock:
+                self._tokens[user_pk] = token
+        return token
+
+    def request(self, method, path, body=None, user=None):
+        """
+        Returns status code and decoded JSON body, which is None for
+        connection errors and non JSON responses.
+        """
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            data = json.dumps(body).encode()
+        if user is not None:
+            headers['Authorization'] = 'Bearer ' + self.token_for(user)
+
+        http_request = Request(
+            urljoin(self.base_url, path),
+            data=data,
+            headers=headers,
+            method=method,
+        )
+        content = b''
+        started = perf_counter()
+        try:
+            with urlopen(http_request, timeout=self.timeout) as response:
+                status = response.status
+                content = response.read()
+        except HTTPError as e:
+            status = e.code
+            content = e.read()
+        except (URLError, OSError):
+            status = CONNECTION_ERROR
+        duration = perf_counter() - started
+
+        with self._lock:
+            self.samples.append(
+                Sample(get_endpoint(method, path), status, duration),
+            )
+
+        try:
+            return status, json.loads(content.decode())
+        except ValueError:
+            return status, None
+
+
+def replay(client: LoadClient, record: TrafficRecord):
+    client.request(
+        record.method,
+        record.path,
+        body=record.body,
+        user=record.user,
+    )
+
+
+def premiere_visit(client: LoadClient, user_pk, movie_session_pk, rnd):
+    """
+    Customer of a premiere night: browses sessions, looks at the chosen
+    one and its seats, books a free seat and most likely pays for it.
+    """
+    client.request('GET', '/api/movie-sessions/', user=user_pk)
+    session_path = f'/api/movie-sessions/{movie_session_pk}/'
+    client.request('GET', session_path, user=user_pk)
+
+    status, seats = client.request(
+        'GET',
+        session_path + 'seats/',
+        user=user_pk,
+    )
+    if status != 200:
+        return
+
+    booked = {
+        (seat['row_number'], seat['seat_number'])
+        for seat in seats['booked_seats']
+    }
+    free = [
+        (row_number, seat_number)
+        for row_number in range(1, seats['rows_number'] + 1)
+        for seat_number in range(1, seats['seats_per_row'] + 1)
+        if (row_number, seat_number) not in booked
+    ]
+    if not free:
+        return
+
+    row_number, seat_number = rnd.choice(free)
+    status, ticket = client.request(
+        'POST',
+        session_path + 'book_ticket/',
+        body={'row_number': row_number, 'seat_number': seat_number},
+        user=user_pk,
+    )
+    if status == 200 and rnd.random() < 0.8:
+        client.request(
+            'POST',
+            urlsplit(ticket['url']).path + 'pay/',
+            user=user_pk,
+        )
+
+
+class LoadReport:
+    def __init__(self, samples, elapsed):
+        self.elapsed = elapsed
+        self.durations = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        for sample in samples:
+            self.durations[sample.endpoint].append(sample.duration)
+            self.statuses[sample.endpoint][sample.status] += 1
+        for durations in self.durations.values():
+            durations.sort()
+
+    @property
+    def requests(self) -> int:
+        return sum(len(durations) for durations in self.durations.values())
+
+    def errors(self, endpoint) -> Counter:
+        return Counter({
+            status: count
+            for status, count in self.statuses[endpoint].items()
+            if status == CONNECTION_ERROR or status >= 400
+        })
+
+    def report(self) -> str:
+        throughput = self.requests / self.elapsed if self.elapsed else 0.0
+        lines = [
+            f'requests: {self.requests} in {self.elapsed:.3f}s '
+            f'({throughput:.1f}/s)',
+        ]
+        for endpoint in sorted(self.durations):
+            durations = self.durations[endpoint]
+            errors = ', '.join(
+                f'{status}={count}'
+                for status, count in sorted(
+                    self.errors(endpoint).items(),
+                    key=lambda item: str(item[0]),
+                )
+            )
+            lines.append(
+                f'{endpoint}: {len(durations)} requests, '
+                f'p50={percentile(durations, 0.5) * 1000:.2f}ms '
+                f'p95={percentile(durations, 0.95) * 1000:.2f}ms '
+                f'p99={percentile(durations, 0.99) * 1000:.2f}ms, '
+                f'errors: {errors or "none"}'
+            )
+        return '\n'.join(lines)
+
+
+def run_load(client: LoadClient, tasks, concurrency=8) -> LoadReport:
+    """
+    Runs tasks, which are callables taking the client, concurrently.
+    """
+    started = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(task, client) for task in tasks]:
+            future.result()
+    elapsed = perf_counter() - started
+
+    return LoadReport(client.samples, elapsed)
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ticket_api.cinema.archive import archive_movie_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves finished movie sessions with their tickets into archive '
+        'tables in batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--before',
+            type=parse_date,
+            default=None,
+            help='Archive sessions before the date, retention window by '
+                 'default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TICKET_ARCHIVE_BATCH_SIZE,
+            help='Number of sessions archived per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        before = options['before'] or (
+            timezone.localdate() - settings.TICKET_ARCHIVE_RETENTION
+        )
+        sessions_number, tickets_number = archive_movie_sessions(
+            before,
+            options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {sessions_number} sessions and {tickets_number} '
+            f'tickets before {before}.'
+        ))
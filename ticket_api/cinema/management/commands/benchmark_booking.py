@@ -0,0 +1,83 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from ticket_api.cinema.benchmarks import SCENARIOS
+from ticket_api.cinema.benchmarks import create_customers
+from ticket_api.cinema.benchmarks import create_movie_session
+from ticket_api.cinema.benchmarks import run_booking_benchmark
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures booking throughput, latency, conflicts and queries '
+        'under concurrent booking of one movie session. '
+        'Creates its own movie, session and customers and removes them '
+        'afterwards, auto cancellation tasks are not sent to the broker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            choices=SCENARIOS,
+            action='append',
+            help='Scenario to run, all of them by default.',
+        )
+        parser.add_argument(
+            '--booking-mode',
+            choices=[mode for mode, _ in MovieSession.BOOKING_MODES],
+            action='append',
+            help='Booking mode to compare, all of them by default.',
+        )
+        parser.add_argument('--hall', default='Universe')
+        parser.add_argument('--attempts', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--customers', type=int, default=100)
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Use processes instead of threads.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep created data.',
+        )
+
+    def handle(self, *args, **options):
+        hall = Hall.objects.get(name=options['hall'])
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        movie = Movie.objects.create(name=prefix, duration=90)
+        customer_pks = create_customers(options['customers'], prefix)
+
+        booking_modes = options['booking_mode'] or [
+            mode for mode, _ in MovieSession.BOOKING_MODES
+        ]
+        for scenario in options['scenario'] or SCENARIOS:
+            for booking_mode in booking_modes:
+                movie_session = create_movie_session(hall, movie)
+                result = run_booking_benchmark(
+                    movie_session,
+                    customer_pks,
+                    scenario=scenario,
+                    booking_mode=booking_mode,
+                    attempts=options['attempts'],
+                    concurrency=options['concurrency'],
+                    processes=options['processes'],
+                    seed=options['seed'],
+                )
+                self.stdout.write(result.report())
+                self.stdout.write('')
+
+                if not options['keep']:
+                    movie_session.tickets.all().delete()
+                    movie_session.delete()
+
+        if not options['keep']:
+            movie.delete()
+            User.objects.filter(pk__in=customer_pks).delete()
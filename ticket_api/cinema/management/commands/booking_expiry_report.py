@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from ticket_api.cinema.metrics import AUTO_CANCEL_LAG
+from ticket_api.cinema.metrics import AUTO_CANCEL_OUTCOMES
+from ticket_api.cinema.metrics import registry
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.tasks import AUTO_CANCEL_ALREADY_PAID
+from ticket_api.cinema.tasks import AUTO_CANCEL_CANCELED
+from ticket_api.cinema.tasks import AUTO_CANCEL_GONE
+from ticket_api.cinema.tasks import AUTO_CANCEL_MOVED
+
+
+def histogram_quantile(buckets, q: float):
+    """
+    Returns upper bound of the bucket holding the quantile, buckets are
+    cumulative `(bound, count)` pairs sorted by bound.
+    """
+    if not buckets or not buckets[-1][1]:
+        return None
+    rank = q * buckets[-1][1]
+    for bound, count in buckets:
+        if count >= rank:
+            return bound
+    return buckets[-1][0]
+
+
+def format_seconds(value) -> str:
+    if value is None:
+        return 'n/a'
+    if value == float('inf'):
+        return f'> {AUTO_CANCEL_LAG.buckets[-2]}s'
+    return f'<= {value}s'
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports whether non paid bookings are released on time: outcomes '
+        'and lag of auto cancellations from metrics, and non paid tickets '
+        'still held after their auto cancellation time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=1,
+            help='Look for overdue bookings of sessions that many days back.',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60,
+            help='Seconds after auto cancellation time a booking may live.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.METRICS_DIR:
+            self.stdout.write(self.style.WARNING(
+                'METRICS_DIR is not set, metrics of workers are not seen.'
+            ))
+
+        samples = registry.collect()
+        self.report_outcomes(samples)
+        self.report_lag(samples)
+        self.report_overdue(options['days'], options['grace'])
+
+    def report_outcomes(self, samples):
+        outcomes = {
+            outcome: int(samples.get(
+                (AUTO_CANCEL_OUTCOMES.name, (('outcome', outcome),)),
+                0,
+            ))
+            for outcome in (
+                AUTO_CANCEL_CANCELED,
+                AUTO_CANCEL_ALREADY_PAID,
+                AUTO_CANCEL_GONE,
+                AUTO_CANCEL_MOVED,
+            )
+        }
+        self.stdout.write(
+            f'Auto cancellations: {sum(outcomes.values())} '
+            f'(freed {outcomes[AUTO_CANCEL_CANCELED]}, '
+            f'already paid {outcomes[AUTO_CANCEL_ALREADY_PAID]}, '
+            f'gone {outcomes[AUTO_CANCEL_GONE]}, '
+            f'moved {outcomes[AUTO_CANCEL_MOVED]})'
+        )
+
+    def report_lag(self, samples):
+        name = AUTO_CANCEL_LAG.name
+        count = samples.get((f'{name}_count', ()), 0)
+        total = samples.get((f'{name}_sum', ()), 0.0)
+        buckets = sorted(
+            (
+                float(dict(labels)['le']),
+                value,
+            )
+            for (sample_name, labels), value in samples.items()
+            if sample_name == f'{name}_bucket'
+        )
+
+        mean = f'{total / count:.3f}s' if count else 'n/a'
+        self.stdout.write(
+            f'Auto cancellation lag: mean {mean}, '
+            f'p50 {format_seconds(histogram_quantile(buckets, 0.5))}, '
+            f'p99 {format_seconds(histogram_quantile(buckets, 0.99))}'
+        )
+
+    def report_overdue(self, days, grace):
+        now = timezone.now()
+        today = timezone.localdate()
+        movie_sessions = (
+            MovieSession.objects
+            .filter(
+                date__range=(today - timedelta(days=days), today),
+                tickets__paid_at__isnull=True,
+            )
+            .annotate(non_paid=Count('tickets'))
+        )
+
+        tickets_number = 0
+        sessions_number = 0
+        oldest = timedelta()
+        for movie_session in movie_sessions:
+            overdue = now - movie_session.auto_cancelation_dt
+            if overdue > timedelta(seconds=grace):
+                tickets_number += movie_session.non_paid
+                sessions_number += 1
+                oldest = max(oldest, overdue)
+
+        message = (
+            f'Overdue bookings: {tickets_number} non paid tickets in '
+            f'{sessions_number} sessions past auto cancellation time'
+        )
+        if tickets_number:
+            self.stdout.write(self.style.WARNING(
+                f'{message}, oldest by {oldest}'
+            ))
+        else:
+            self.stdout.write(message)
@@ -0,0 +1,282 @@
+import random
+import string
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.models import User
+from ticket_api.cinema.utils import local_datetime
+
+# Sessions start at round times
+START_STEP_MINUTES = 5
+# Fixed, so the same seed gives the same data whenever it's run. Each seed
+# starts `--days` later than the previous one, so seeds don't share days.
+DEFAULT_START_DATE = date(2030, 1, 1)
+PREFIX_LENGTH = 4
+SEEDS_NUMBER = len(string.ascii_uppercase) ** PREFIX_LENGTH
+
+
+def order_number_prefix(seed: int) -> str:
+    # Four letters like generated order numbers have, unique per seed
+    letters = []
+    for _ in range(PREFIX_LENGTH):
+        seed, index = divmod(seed, len(string.ascii_uppercase))
+        letters.append(string.ascii_uppercase[index])
+    return ''.join(letters)
+
+
+def day_schedule(hall: Hall, movies, rnd):
+    """
+    Yields `(movie, starts_at)` for back to back sessions in the hall
+    within opening hours, so that they never overlap.
+    """
+    starts_at = datetime.combine(
+        date.min,
+        settings.MOVIE_SESSION_EARLIEST_OPEN_TIME,
+    )
+    latest = datetime.combine(
+        date.min,
+        settings.MOVIE_SESSION_LATEST_OPEN_TIME,
+    )
+    advertise_duration = MovieSession._meta.get_field(
+        'advertise_duration',
+    ).default
+
+    while starts_at <= latest:
+        movie = rnd.choice(movies)
+        yield movie, starts_at.time()
+
+        total_duration = (
+                advertise_duration +
+                movie.duration +
+                hall.cleaning_duration
+        )
+        step = -(-total_duration // START_STEP_MINUTES) * START_STEP_MINUTES
+        starts_at += timedelta(minutes=step)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates users, movies, sessions in existing halls and tickets '
+        'for scale testing. Output is deterministic for given seed and '
+        'start date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--movies', type=int, default=50)
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument(
+            '--start-date',
+            type=parse_date,
+            help=(
+                f'First day of sessions, {DEFAULT_START_DATE} plus '
+                f'--days for every seed before given one by default.'
+            ),
+        )
+        parser.add_argument(
+            '--occupancy',
+            type=float,
+            default=0.6,
+            help='Average share of booked seats.',
+        )
+        parser.add_argument(
+            '--paid',
+            type=float,
+            default=0.8,
+            help='Share of paid tickets.',
+        )
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        if not 0 <= seed < SEEDS_NUMBER:
+            raise CommandError(
+                f'Seed must be from 0 to {SEEDS_NUMBER - 1}.',
+            )
+        rnd = random.Random(seed)
+        batch_size = options['batch_size']
+        prefix = order_number_prefix(seed)
+
+        if Ticket.objects.filter(order_number__startswith=prefix).exists():
+            raise CommandError(f'Data for seed {seed} is already generated.')
+
+        halls = list(Hall.objects.order_by('pk'))
+        if not halls:
+            raise CommandError('No halls found.')
+
+        start_date = options['start_date']
+        if start_date is None:
+            try:
+                start_date = DEFAULT_START_DATE + timedelta(
+                    days=seed * options['days'],
+                )
+            except OverflowError:
+                raise CommandError(
+                    f'No default start date for seed {seed}, '
+                    'pass --start-date.',
+                )
+
+        user_pks = self.create_users(seed, options['users'], batch_size)
+        movies = self.create_movies(seed, options['movies'], rnd)
+
+        tickets_number = 0
+        sessions_number = 0
+        for day_number in range(options['days']):
+            day = start_date + timedelta(days=day_number)
+            with transaction.atomic():
+                movie_sessions = self.create_movie_sessions(
+                    day,
+                    halls,
+                    movies,
+                    rnd,
+                )
+                tickets_number += self.create_tickets(
+                    movie_sessions,
+                    user_pks,
+                    prefix,
+                    tickets_number,
+                    options,
+                    rnd,
+                )
+            sessions_number += len(movie_sessions)
+
+            self.stdout.write(
+                f'{day}: {sessions_number} sessions, '
+                f'{tickets_number} tickets',
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(user_pks)} users, {len(movies)} movies, '
+            f'{sessions_number} sessions, {tickets_number} tickets.'
+        ))
+
+    def create_users(self, seed, number, batch_size):
+        # Unusable password is cheap to make, unlike a real hash
+        password = make_password(None)
+        # Chunked by hand, since given batch size isn't capped by the
+        # backend's limit of query parameters
+        for start in range(0, number, batch_size):
+            User.objects.bulk_create(
+                (
+                    User(
+                        email=f'load-{seed}-{i}@example.com',
+                        password=password,
+                    )
+                    for i in range(start, min(start + batch_size, number))
+                ),
+                ignore_conflicts=True,
+            )
+        return list(
+            User.objects.filter(email__startswith=f'load-{seed}-')
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def create_movies(self, seed, number, rnd):
+        names = [f'Load {seed} movie {i}' for i in range(number)]
+        Movie.objects.bulk_create(
+            (
+                Movie(name=name, duration=rnd.randint(80, 180))
+                for name in names
+            ),
+            ignore_conflicts=True,
+        )
+        return list(Movie.objects.filter(name__in=names).order_by('pk'))
+
+    def create_movie_sessions(self, day, halls, movies, rnd):
+        busy_hall_pks = set(
+            MovieSession.objects.filter(date=day)
+            .values_list('hall_id', flat=True)
+        )
+
+        movie_sessions = [
+            MovieSession(
+                hall=hall,
+                movie=movie,
+                date=day,
+                starts_at=starts_at,
+                starts_at_dt=local_datetime(day, starts_at),
+                ticket_cost=rnd.choice((250, 300, 350, 400, 500)),
+            )
+            for hall in halls
+            # Sessions already scheduled by someone else must not overlap
+            if hall.pk not in busy_hall_pks
+            for movie, starts_at in day_schedule(hall, movies, rnd)
+        ]
+        MovieSession.objects.bulk_create(movie_sessions)
+
+        # SQLite doesn't return primary keys from bulk insert
+        return list(
+            MovieSession.objects.filter(date=day)
+            .exclude(hall_id__in=busy_hall_pks)
+            .select_related('hall')
+            .order_by('pk')
+        )
+
+    def create_tickets(
+            self,
+            movie_sessions,
+            user_pks,
+            prefix,
+            first_number,
+            options,
+            rnd,
+    ):
+        close_minutes = int(
+            settings.BOOKING_CLOSE_PERIOD.total_seconds() // 60,
+        )
+        number = first_number
+        tickets = []
+
+        for movie_session in movie_sessions:
+            hall = movie_session.hall
+            occupancy = min(max(rnd.gauss(options['occupancy'], 0.2), 0), 1)
+            seats = rnd.sample(
+                range(hall.capacity),
+                int(hall.capacity * occupancy),
+            )
+            starts_at = movie_session.starts_at_dt
+
+            for seat in seats:
+                row_number, seat_number = divmod(seat, hall.seats_per_row)
+                booked_at = starts_at - timedelta(
+                    minutes=rnd.randint(close_minutes, 60 * 24 * 14),
+                )
+                paid_at = None
+                if rnd.random() < options['paid']:
+                    paid_at = booked_at + timedelta(minutes=rnd.randint(1, 60))
+
+                tickets.append(
+                    Ticket(
+                        movie_session=movie_session,
+                        customer_id=rnd.choice(user_pks),
+                        row_number=row_number + 1,
+                        seat_number=seat_number + 1,
+                        order_number=f'{prefix}{number:08d}',
+                        cost=movie_session.ticket_cost,
+                        booked_at=booked_at,
+                        paid_at=paid_at,
+                    )
+                )
+                number += 1
+
+                if len(tickets) >= options['batch_size']:
+                    Ticket.objects.bulk_create(tickets)
+                    tickets = []
+
+        Ticket.objects.bulk_create(tickets)
+
+        return number - first_number
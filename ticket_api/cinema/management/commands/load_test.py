@@ -0,0 +1,89 @@
+import random
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from ticket_api.cinema.loadgen import LoadClient
+from ticket_api.cinema.loadgen import premiere_visit
+from ticket_api.cinema.loadgen import read_traffic
+from ticket_api.cinema.loadgen import replay
+from ticket_api.cinema.loadgen import run_load
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Loads running instance with recorded traffic or with a synthetic '
+        'premiere night mix and reports latency percentiles and errors '
+        'per endpoint. Access tokens are signed with local settings, so '
+        'the instance must share the secret key and the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000')
+        parser.add_argument(
+            '--replay',
+            metavar='FILE',
+            help='JSONL traffic log to replay, premiere night otherwise.',
+        )
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--visits',
+            type=int,
+            default=1000,
+            help='Number of premiere night customer visits.',
+        )
+        parser.add_argument(
+            '--movie-session',
+            type=int,
+            action='append',
+            help='Premiere session, nearest bookable sessions by default.',
+        )
+        parser.add_argument('--customers', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        client = LoadClient(options['url'])
+
+        if options['replay']:
+            with open(options['replay']) as file:
+                tasks = [
+                    partial(replay, record=record)
+                    for record in read_traffic(file)
+                ]
+        else:
+            tasks = self.premiere_night(options)
+
+        report = run_load(client, tasks, concurrency=options['concurrency'])
+        self.stdout.write(report.report())
+
+    def premiere_night(self, options):
+        rnd = random.Random(options['seed'])
+
+        movie_session_pks = options['movie_session']
+        if not movie_session_pks:
+            movie_session_pks = list(
+                MovieSession.objects.filter(starts_at_dt__gt=timezone.now())
+                .order_by('starts_at_dt')
+                .values_list('pk', flat=True)[:3]
+            )
+        customer_pks = list(
+            User.objects.filter(is_active=True, is_staff=False)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:options['customers']]
+        )
+        if not movie_session_pks or not customer_pks:
+            raise CommandError('No movie sessions or customers to load.')
+
+        return [
+            partial(
+                premiere_visit,
+                user_pk=rnd.choice(customer_pks),
+                movie_session_pk=rnd.choice(movie_session_pks),
+                rnd=random.Random(rnd.random()),
+            )
+            for _ in range(options['visits'])
+        ]
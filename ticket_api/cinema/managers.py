@@ -1,4 +1,14 @@
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from ticket_api.cinema.exceptions import EntryClosedError
+from ticket_api.cinema.exceptions import OtherMovieSessionError
+from ticket_api.cinema.exceptions import TicketAlreadyCheckedInError
+from ticket_api.cinema.exceptions import TicketNotPaidError
 
 
 class UserManager(BaseUserManager):
@@ -25,3 +35,85 @@ class UserManager(BaseUserManager):
             raise ValueError('Superuser must have is_superuser=True.')
 
         return self._create_user(email, password, **extra_fields)
+
+
+class MovieSessionQuerySet(QuerySet):
+    def with_booked_seats(self):
+        return self.annotate(booked_seats_number=Count('tickets'))
+
+    def bump_manifest_version(self):
+        """
+        Makes door devices download check in manifests of the sessions in
+        full, to be called when their paid tickets leave or change seats.
+        Payments and check ins are sent as changes of tickets instead.
+        """
+        return self.update(manifest_version=F('manifest_version') + 1)
+
+
+class TicketQuerySet(QuerySet):
+    def payable(self):
+        """
+        Tickets not paid yet of sessions still open for booking, a condition
+        `update` checks in the same statement.
+        """
+        cutoff = timezone.now() + settings.BOOKING_CLOSE_PERIOD
+        return self.filter(
+            paid_at__isnull=True,
+            movie_session__starts_at_dt__gt=cutoff,
+        )
+
+    def entry_open(self):
+        """
+        Tickets of sessions admitted at the door now, from
+        `TICKET_CODE_ENTRY_PERIOD` before start till `CHECK_IN_CLOSE_PERIOD`
+        after it, a condition `update` checks in the same statement.
+        """
+        now = timezone.now()
+        return self.filter(
+            movie_session__starts_at_dt__lte=(
+                now + settings.TICKET_CODE_ENTRY_PERIOD
+            ),
+            movie_session__starts_at_dt__gte=(
+                now - settings.CHECK_IN_CLOSE_PERIOD
+            ),
+        )
+
+    def check_in(self, order_number, movie_session_pk=None):
+        """
+        Checks in paid ticket of a session open for entry with one guarded
+        update by unique order number, so of concurrent scans of the ticket
+        only one succeeds. Given session pk is the one the door admits to,
+        tickets of others are rejected. Failure reason is looked up only
+        when the update misses.
+
+        Returns check in time.
+        """
+        tickets = self.filter(order_number=order_number)
+        if movie_session_pk is not None:
+            tickets = tickets.filter(movie_session_id=movie_session_pk)
+
+        checked_in_at = timezone.now()
+        if tickets.entry_open().filter(
+                paid_at__isnull=False,
+                checked_in_at__isnull=True,
+        ).update(checked_in_at=checked_in_at, updated_at=checked_in_at):
+            return checked_in_at
+
+        found = list(
+            self.filter(order_number=order_number).values_list(
+                'movie_session_id',
+                'paid_at',
+                'checked_in_at',
+            )
+        )
+        if not found:
+            raise self.model.DoesNotExist()
+        [(found_movie_session_pk, paid_at, found_checked_in_at)] = found
+        if movie_session_pk is not None and \
+                found_movie_session_pk != movie_session_pk:
+            raise OtherMovieSessionError()
+        if paid_at is None:
+            raise TicketNotPaidError()
+        if found_checked_in_at is not None:
+            raise TicketAlreadyCheckedInError(found_checked_in_at)
+        raise EntryClosedError()
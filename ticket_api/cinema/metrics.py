@@ -0,0 +1,306 @@
+import fcntl
+import json
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from time import monotonic
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Sums of finished processes, with names of files merged into it
+FINISHED_FILE_NAME = 'finished.json'
+LOCK_FILE_NAME = '.lock'
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"'),
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _is_finished(file_name: str, host: str) -> bool:
+    # Processes of other hosts, e.g. containers sharing the directory,
+    # can't be checked from here
+    parts = file_name[:-len('.json')].rsplit('-', 2)
+    if len(parts) != 3 or parts[0] != host or not parts[1].isdigit():
+        return False
+    return not _is_alive(int(parts[1]))
+
+
+def _load(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _dump(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def _sort_key(sample):
+    labels, _ = sample
+    # Buckets go in order of their bounds
+    return tuple(
+        (name, float(value) if name == 'le' else value)
+        for name, value in labels
+    )
+
+
+class MetricsRegistry:
+    """
+    Process local metric values, optionally shared between processes.
+
+    Every sample is a plain number keyed by its name and labels, so
+    aggregation over processes is a sum. With `METRICS_DIR` set, each
+    process periodically dumps its samples into an own file there and
+    exposition sums up files of all processes, including finished ones,
+    which keeps counters monotonic over worker restarts. Files of finished
+    processes are merged into one by exposition.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._samples = defaultdict(float)
+        self._pid = None
+        self._file_name = None
+        self._flushed_at = None
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add(self, name, labels, amount):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._own_file_name()
+            self._samples[key] += amount
+
+    def _own_file_name(self):
+        # Forked processes must not write into parent's file
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file_name = (
+                f'{socket.gethostname()}-{self._pid}-{uuid.uuid4().hex}.json'
+            )
+            self._samples = defaultdict(float)
+            self._flushed_at = None
+        return self._file_name
+
+    def flush(self, force=False):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+
+        with self._lock:
+            file_name = self._own_file_name()
+            interval = settings.METRICS_FLUSH_INTERVAL.total_seconds()
+            if not force and self._flushed_at is not None and \
+                    monotonic() - self._flushed_at < interval:
+                return
+            self._flushed_at = monotonic()
+            samples = [
+                [name, labels, value]
+                for (name, labels), value in self._samples.items()
+            ]
+
+        os.makedirs(directory, exist_ok=True)
+        _dump(os.path.join(directory, file_name), samples)
+
+    def merge_finished(self):
+        """
+        Merges files of finished processes of this host into one, so
+        restarts don't leave files behind. Files are removed only once
+        merged, and merged ones are never counted twice.
+        """
+        directory = settings.METRICS_DIR
+        host = socket.gethostname()
+        finished_path = os.path.join(directory, FINISHED_FILE_NAME)
+
+        with open(os.path.join(directory, LOCK_FILE_NAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            file_names = set(os.listdir(directory))
+            finished = _load(finished_path) or {'files': [], 'samples': []}
+            # Files removed by earlier merges are forgotten
+            merged = set(finished['files']) & file_names
+            samples = defaultdict(float)
+            for name, labels, value in finished['samples']:
+                samples[(name, tuple(tuple(pair) for pair in labels))] = value
+
+            new_file_names = [
+                file_name for file_name in sorted(file_names - merged)
+                if file_name.endswith('.json') and
+                file_name != FINISHED_FILE_NAME and
+                _is_finished(file_name, host)
+            ]
+            for file_name in new_file_names:
+                dumped = _load(os.path.join(directory, file_name))
+                for name, labels, value in dumped or ():
+                    labels = tuple(tuple(pair) for pair in labels)
+                    samples[(name, labels)] += value
+                merged.add(file_name)
+
+            if new_file_names or merged != set(finished['files']):
+                _dump(
+                    finished_path,
+                    {
+                        'files': sorted(merged),
+                        'samples': [
+                            [name, labels, value]
+                            for (name, labels), value in samples.items()
+                        ],
+                    },
+                )
+            for file_name in merged:
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except FileNotFoundError:
+                    pass
+
+    def collect(self) -> dict:
+        with self._lock:
+            own_file_name = self._own_file_name()
+            samples = defaultdict(float, self._samples)
+
+        directory = settings.METRICS_DIR
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.merge_finished()
+
+            finished = _load(os.path.join(directory, FINISHED_FILE_NAME))
+            if finished is None:
+                finished = {'files': [], 'samples': []}
+            dumps = [finished['samples']]
+            skipped = set(finished['files'])
+            skipped.update((FINISHED_FILE_NAME, own_file_name))
+            for file_name in os.listdir(directory):
+                if file_name.endswith('.json') and file_name not in skipped:
+                    dumps.append(_load(os.path.join(directory, file_name)))
+
+            for dumped in dumps:
+                for name, labels, value in dumped or ():
+                    labels = tuple(tuple(pair) for pair in labels)
+                    samples[(name, labels)] += value
+
+        return samples
+
+    def render(self) -> str:
+        by_name = defaultdict(list)
+        for (name, labels), value in self.collect().items():
+            by_name[name].append((labels, value))
+
+        lines = []
+        for metric in sorted(self._metrics.values(), key=lambda m: m.name):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for sample_name in metric.sample_names():
+                samples = sorted(
+                    by_name.get(sample_name, ()),
+                    key=_sort_key,
+                )
+                for labels, value in samples:
+                    lines.append(
+                        f'{sample_name}{_format_labels(labels)} {value!r}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        registry.register(self)
+
+    def sample_names(self):
+        return (self.name,)
+
+    def inc(self, amount=1, **labels):
+        registry.add(self.name, labels, amount)
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets) + (float('inf'),)
+        registry.register(self)
+
+    def sample_names(self):
+        return (
+            f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count',
+        )
+
+    def observe(self, value, **labels):
+        # Buckets are stored cumulative, as they are exposed
+        for bound in self.buckets:
+            if value <= bound:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                registry.add(f'{self.name}_bucket', dict(labels, le=le), 1)
+        registry.add(f'{self.name}_sum', labels, value)
+        registry.add(f'{self.name}_count', labels, 1)
+
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'Number of handled requests.',
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling requests.',
+)
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'Number of database queries made while handling requests.',
+)
+DB_QUERIES_DURATION = Counter(
+    'db_queries_duration_seconds_total',
+    'Time spent in database queries while handling requests.',
+)
+BOOKINGS = Counter(
+    'booking_outcomes_total',
+    'Number of booking attempts by outcome.',
+)
+AUTO_CANCEL_LAG = Histogram(
+    'booking_auto_cancel_lag_seconds',
+    'Delay of non paid booking auto cancellation after its intended time.',
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+AUTO_CANCEL_OUTCOMES = Counter(
+    'booking_auto_cancel_outcomes_total',
+    'Number of non paid booking auto cancellations by outcome.',
+)
@@ -0,0 +1,283 @@
+import json
+import random
+import threading
+import time
+from time import perf_counter
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+from django.utils.text import compress_string
+from rest_framework.exceptions import AuthenticationFailed
+
+from ticket_api.cinema.authentication import ClaimsJWTAuthentication
+from ticket_api.cinema.metrics import DB_QUERIES
+from ticket_api.cinema.metrics import DB_QUERIES_DURATION
+from ticket_api.cinema.metrics import REQUESTS
+from ticket_api.cinema.metrics import REQUEST_DURATION
+from ticket_api.cinema.metrics import registry
+from ticket_api.cinema.profiling import SqlProfiler
+
+try:
+    import brotli
+except ImportError:
+    # Optional, responses are gzipped without it
+    brotli = None
+
+
+def get_view_name(request, response) -> str:
+    """
+    Names DRF views after their basename and action, for example
+    `moviesession:book_ticket`, and other views after their URL name.
+    """
+    renderer_context = getattr(response, 'renderer_context', None) or {}
+    view = renderer_context.get('view')
+    basename = getattr(view, 'basename', None)
+    action = getattr(view, 'action', None)
+    if basename and action:
+        return f'{basename}:{action}'
+
+    resolver_match = request.resolver_match
+    if resolver_match is not None and resolver_match.url_name:
+        return resolver_match.url_name
+
+    # Unresolved paths must not blow up the number of label values
+    return 'unknown'
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_stats = QueryStats()
+        started = perf_counter()
+        with connection.execute_wrapper(query_stats):
+            response = self.get_response(request)
+        duration = perf_counter() - started
+
+        view = get_view_name(request, response)
+        REQUESTS.inc(
+            view=view,
+            method=request.method,
+            status=response.status_code,
+        )
+        REQUEST_DURATION.observe(duration, view=view)
+        DB_QUERIES.inc(query_stats.count, view=view)
+        DB_QUERIES_DURATION.inc(query_stats.duration, view=view)
+        registry.flush()
+
+        return response
+
+
+def is_staff_request(request) -> bool:
+    # Bearer token is checked the way DRF does, session user otherwise
+    try:
+        authenticated = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+
+    if authenticated is not None:
+        user, _ = authenticated
+    else:
+        user = request.user
+    return user.is_active and user.is_staff
+
+
+class SqlProfilingMiddleware:
+    """
+    Profiles SQL of a single request for staff users sending the profiling
+    header. Totals come back in response headers, the full report is kept
+    in cache and served by `sql-profiles` endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.META.get(settings.SQL_PROFILING_HEADER) or \
+                not is_staff_request(request):
+            return self.get_response(request)
+
+        profiler = SqlProfiler()
+        with connection.execute_wrapper(profiler):
+            response = self.get_response(request)
+
+        duplicates = profiler.duplicates()
+        response['X-SQL-Profile-Id'] = profiler.store()
+        response['X-SQL-Queries'] = str(len(profiler.queries))
+        response['X-SQL-Duration'] = f'{profiler.duration:.6f}'
+        response['X-SQL-Duplicates'] = str(
+            sum(group['count'] - 1 for group in duplicates['similar'])
+        )
+
+        return response
+
+
+def _redact(data):
+    if isinstance(data, dict):
+        return {
+            key: '***'
+            if key in settings.TRAFFIC_CAPTURE_REDACTED_FIELDS
+            else _redact(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_redact(value) for value in data]
+    return data
+
+
+def _captured_body(request):
+    if request.content_type == 'application/json' and request.body:
+        try:
+            return _redact(json.loads(request.body.decode()))
+        except ValueError:
+            return None
+    if request.content_type == 'application/x-www-form-urlencoded':
+        return _redact(request.POST.dict()) or None
+    return None
+
+
+class TrafficCaptureMiddleware:
+    """
+    Appends a sample of requests to `TRAFFIC_CAPTURE_FILE` as JSON lines
+    of method, path, body and user, the format `load_test` replays.
+    Secrets like passwords and tokens are redacted.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.TRAFFIC_CAPTURE_FILE or \
+                random.random() >= settings.TRAFFIC_CAPTURE_SAMPLE_RATE:
+            return self.get_response(request)
+
+        # Body must be read before views consume the stream
+        body = _captured_body(request)
+        response = self.get_response(request)
+
+        # Token users are known to DRF request only
+        renderer_context = getattr(response, 'renderer_context', None) or {}
+        user = getattr(
+            renderer_context.get('request', request),
+            'user',
+            None,
+        )
+
+        record = {
+            'time': time.time(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'body': body,
+            'user': user.pk if user and user.is_authenticated else None,
+            'status': response.status_code,
+        }
+        line = json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+        with self._lock, open(settings.TRAFFIC_CAPTURE_FILE, 'a') as file:
+            file.write(line)
+
+        return response
+
+
+def accepted_encodings(request):
+    encodings = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor()
+    for item in sequence:
+        chunk = compressor.process(item)
+        if chunk:
+            yield chunk
+    yield compressor.finish()
+
+
+def _is_compressible(response) -> bool:
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    return content_type.lower() in settings.COMPRESSION_CONTENT_TYPES
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of `COMPRESSION_CONTENT_TYPES` with brotli when it
+    is installed and accepted by the client, with gzip otherwise. Bodies
+    shorter than `COMPRESSION_MIN_SIZE` are sent as is, streaming ones are
+    compressed on the fly. Responses carrying CSRF token are never
+    compressed, whatever their type, against BREACH attack.
+
+    Strong ETags are weakened, as the compressed body is not byte for byte
+    the one they were computed for, so conditional requests keep working.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header('Content-Encoding') or \
+                not _is_compressible(response) or \
+                request.META.get('CSRF_COOKIE_USED'):
+            return response
+        if not response.streaming and \
+                len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = accepted_encodings(request)
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                content = _brotli_sequence(response.streaming_content)
+            else:
+                content = compress_sequence(response.streaming_content)
+            response.streaming_content = content
+            del response['Content-Length']
+        else:
+            if encoding == 'br':
+                content = brotli.compress(response.content)
+            else:
+                content = compress_string(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+        return response
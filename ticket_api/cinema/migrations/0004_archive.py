@@ -0,0 +1,98 @@
+# Generated by Django 2.2 on 2026-10-19 16:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+# Primary key of a partitioned table must include the partition key,
+# partitions themselves are created by archiving
+PARTITIONED_TICKET_TABLE_SQL = '''
+DROP TABLE cinema_archivedticket;
+CREATE TABLE cinema_archivedticket (
+    id integer NOT NULL,
+    movie_session_id integer NOT NULL
+        REFERENCES cinema_archivedmoviesession (id)
+        DEFERRABLE INITIALLY DEFERRED,
+    session_date date NOT NULL,
+    customer_id integer NOT NULL
+        REFERENCES cinema_user (id)
+        DEFERRABLE INITIALLY DEFERRED,
+    row_number integer NOT NULL,
+    seat_number integer NOT NULL,
+    order_number varchar(12) NOT NULL,
+    cost numeric(14, 2) NOT NULL,
+    booked_at timestamp with time zone NOT NULL,
+    paid_at timestamp with time zone NULL,
+    PRIMARY KEY (id, session_date)
+) PARTITION BY RANGE (session_date);
+CREATE INDEX cinema_archivedticket_movie_session_id
+    ON cinema_archivedticket (movie_session_id);
+CREATE INDEX cinema_archivedticket_customer_id
+    ON cinema_archivedticket (customer_id);
+CREATE INDEX cinema_archivedticket_order_number
+    ON cinema_archivedticket (order_number);
+'''
+
+
+def partition_archived_tickets(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(PARTITIONED_TICKET_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0003_revoked_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMovieSession',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField(db_index=True)),
+                ('starts_at', models.TimeField()),
+                ('ticket_cost', models.DecimalField(decimal_places=2,
+                                                    max_digits=14)),
+                ('advertise_duration', models.IntegerField()),
+                ('archived_at', models.DateTimeField(
+                    default=django.utils.timezone.now)),
+                ('hall', models.ForeignKey(
+                    on_delete=django.db.models.deletion.PROTECT,
+                    related_name='archived_movie_sessions',
+                    to='cinema.Hall')),
+                ('movie', models.ForeignKey(
+                    on_delete=django.db.models.deletion.PROTECT,
+                    related_name='archived_movie_sessions',
+                    to='cinema.Movie')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('session_date', models.DateField()),
+                ('row_number', models.IntegerField()),
+                ('seat_number', models.IntegerField()),
+                ('order_number', models.CharField(db_index=True,
+                                                  max_length=12)),
+                ('cost', models.DecimalField(decimal_places=2,
+                                             max_digits=14)),
+                ('booked_at', models.DateTimeField()),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('customer', models.ForeignKey(
+                    on_delete=django.db.models.deletion.PROTECT,
+                    related_name='archived_tickets',
+                    to=settings.AUTH_USER_MODEL)),
+                ('movie_session', models.ForeignKey(
+                    on_delete=django.db.models.deletion.PROTECT,
+                    related_name='tickets',
+                    to='cinema.ArchivedMovieSession')),
+            ],
+        ),
+        migrations.RunPython(
+            partition_archived_tickets,
+            migrations.RunPython.noop,
+        ),
+    ]
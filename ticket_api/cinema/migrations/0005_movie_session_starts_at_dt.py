@@ -0,0 +1,58 @@
+# Generated by Django 2.2 on 2026-10-19 19:40
+
+from datetime import datetime
+
+from django.db import migrations
+from django.db import models
+from django.db import transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def fill_starts_at_dt(apps, schema_editor):
+    MovieSession = apps.get_model('cinema', 'MovieSession')
+    tz = timezone.get_default_timezone()
+
+    # Batch per transaction, so the table isn't locked for the whole run
+    while True:
+        with transaction.atomic():
+            movie_sessions = list(
+                MovieSession.objects.filter(starts_at_dt__isnull=True)
+                .order_by('pk')[:BATCH_SIZE]
+            )
+            if not movie_sessions:
+                break
+
+            for movie_session in movie_sessions:
+                movie_session.starts_at_dt = timezone.make_aware(
+                    datetime.combine(
+                        movie_session.date,
+                        movie_session.starts_at,
+                    ),
+                    tz,
+                )
+            MovieSession.objects.bulk_update(movie_sessions, ['starts_at_dt'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('cinema', '0004_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='starts_at_dt',
+            field=models.DateTimeField(db_index=True, editable=False,
+                                       null=True),
+        ),
+        migrations.RunPython(fill_starts_at_dt, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='moviesession',
+            name='starts_at_dt',
+            field=models.DateTimeField(db_index=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 2.2 on 2026-10-19 16:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0005_movie_session_starts_at_dt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('status', models.CharField(
+                    choices=[('waiting', 'Waiting'), ('offered', 'Offered')],
+                    default='waiting',
+                    max_length=16)),
+                ('created_at', models.DateTimeField(
+                    default=django.utils.timezone.now)),
+                ('offered_at', models.DateTimeField(blank=True, null=True)),
+                ('customer', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='waitlist_entries',
+                    to=settings.AUTH_USER_MODEL)),
+                ('movie_session', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='waitlist',
+                    to='cinema.MovieSession')),
+                ('ticket', models.OneToOneField(
+                    blank=True,
+                    null=True,
+                    on_delete=django.db.models.deletion.SET_NULL,
+                    related_name='waitlist_entry',
+                    to='cinema.Ticket')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['movie_session', 'status'],
+                               name='cinema_wait_movie_s_eb5bef_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='waitlistentry',
+            unique_together={('movie_session', 'customer')},
+        ),
+    ]
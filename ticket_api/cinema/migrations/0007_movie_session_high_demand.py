@@ -0,0 +1,18 @@
+# Generated by Django 2.2 on 2026-10-19 16:45
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0006_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='high_demand',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2 on 2026-10-19 16:49
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0007_movie_session_high_demand'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='booking_mode',
+            field=models.CharField(choices=[('direct', 'Direct'),
+                                            ('queued', 'Queued')],
+                                   default='direct',
+                                   max_length=16),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2 on 2026-10-19 20:41
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0009_ticket_checked_in_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moviesession',
+            name='manifest_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2 on 2026-10-19 21:05
+
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0010_movie_session_manifest_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='waitlistentry',
+            name='ticket',
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='waitlist_entry',
+                to='cinema.Ticket',
+            ),
+        ),
+    ]
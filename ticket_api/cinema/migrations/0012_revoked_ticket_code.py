@@ -0,0 +1,31 @@
+# Generated by Django 2.2 on 2026-10-19 21:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0011_waitlist_entry_ticket_cascade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedTicketCode',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('revoked_at', models.DateTimeField(
+                    default=django.utils.timezone.now,
+                )),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('ticket', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='revoked_codes',
+                    to='cinema.Ticket',
+                )),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2 on 2026-10-19 21:55
+
+import django.utils.timezone
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('cinema', '0012_revoked_ticket_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='updated_at',
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['movie_session', 'updated_at'],
+                               name='cinema_tick_movie_s_2ba32a_idx'),
+        ),
+    ]
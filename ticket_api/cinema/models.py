@@ -14,16 +14,26 @@ from django.core.validators import MinValueValidator
 from django.db import IntegrityError
 from django.db import transaction
 from django.db.models import BooleanField
+from django.db.models import CASCADE
+from django.db.models import Case
 from django.db.models import CharField
 from django.db.models import DateField
 from django.db.models import DateTimeField
 from django.db.models import DecimalField
 from django.db.models import EmailField
+from django.db.models import F
 from django.db.models import ForeignKey
+from django.db.models import Index
 from django.db.models import IntegerField
 from django.db.models import Model
+from django.db.models import OneToOneField
+from django.db.models import PositiveIntegerField
 from django.db.models import PROTECT
 from django.db.models import TimeField
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 from django.db.models.signals import pre_delete
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
@@ -31,20 +41,34 @@ from django.utils import timezone
 from django.utils.deconstruct import deconstructible
 from django.utils.translation import gettext as _
 
+from ticket_api.cinema.booking_queue import booking_queues
 from ticket_api.cinema.exceptions import AttemptsIsOverError
+from ticket_api.cinema.exceptions import IncompatibleMovieSessionError
 from ticket_api.cinema.exceptions import MovieIsScheduledError
 from ticket_api.cinema.exceptions import MovieSessionHasBookingsError
 from ticket_api.cinema.exceptions import MovieSessionOverlapsError
 from ticket_api.cinema.exceptions import NoBookingAvailableError
+from ticket_api.cinema.exceptions import NoSuitableSeatsError
 from ticket_api.cinema.exceptions import SeatNotAvailableError
+from ticket_api.cinema.exceptions import SeatsAvailableError
 from ticket_api.cinema.exceptions import TicketAlreadyPaidError
+from ticket_api.cinema.managers import MovieSessionQuerySet
+from ticket_api.cinema.managers import TicketQuerySet
 from ticket_api.cinema.managers import UserManager
+from ticket_api.cinema.seating import find_best_seats
+from ticket_api.cinema.seating import remap_seats
 from ticket_api.cinema.tasks import cancel_non_paid_booking
-from ticket_api.cinema.utils import local_time_as_naive
+from ticket_api.cinema.tasks import cancel_non_paid_bookings
+from ticket_api.cinema.tasks import promote_waitlist
+from ticket_api.cinema.tasks import send_notifications
+from ticket_api.cinema.ticket_codes import revoked_ticket_codes
+from ticket_api.cinema.tokens import revoke_user_claims
+from ticket_api.cinema.utils import local_datetime
 from ticket_api.cinema.validators import NonNegativeDecimal
 from ticket_api.cinema.validators import NonNegativeInt
 from ticket_api.cinema.validators import NotBlank
 from ticket_api.cinema.validators import PositiveInt
+from ticket_api.cinema.waiting_room import guard_movie_session
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -87,6 +111,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+@receiver([post_save, post_delete], sender=User)
+def revoke_token_claims(sender, instance, **kwargs):
+    revoke_user_claims(instance.pk)
+
+
 class Hall(Model):
     name = CharField(max_length=256, unique=True, validators=[NotBlank])
     rows_number = IntegerField(validators=[PositiveInt])
@@ -116,6 +145,15 @@ def check_movie_not_scheduled(sender, instance, **kwargs):
 
 
 class MovieSession(Model):
+    DIRECT_BOOKING = 'direct'
+    QUEUED_BOOKING = 'queued'
+    BOOKING_MODES = (
+        (DIRECT_BOOKING, 'Direct'),
+        (QUEUED_BOOKING, 'Queued'),
+    )
+    # May be switched for sessions on sale
+    SWITCHES = ('high_demand', 'booking_mode')
+
     movie = ForeignKey(Movie, on_delete=PROTECT, related_name='movie_sessions')
     hall = ForeignKey(Hall, on_delete=PROTECT, related_name='movie_sessions')
     date = DateField()
@@ -131,6 +169,22 @@ class MovieSession(Model):
         validators=[NonNegativeDecimal],
     )
     advertise_duration = IntegerField(default=10, validators=[NonNegativeInt])
+    # Aware copy of `date` and `starts_at` kept by `save`, so upcoming
+    # sessions are a range scan over one index
+    starts_at_dt = DateTimeField(db_index=True, editable=False)
+    # Booking and payment go through the waiting room
+    high_demand = BooleanField(default=False)
+    # Queued bookings are serialized by `booking_queue`
+    booking_mode = CharField(
+        max_length=16,
+        choices=BOOKING_MODES,
+        default=DIRECT_BOOKING,
+    )
+    # Bumped by every change of paid tickets, so door devices refresh
+    # manifests of changed sessions only
+    manifest_version = PositiveIntegerField(default=0, editable=False)
+
+    objects = MovieSessionQuerySet.as_manager()
 
     @property
     def total_duration(self) -> int:
@@ -142,6 +196,9 @@ class MovieSession(Model):
 
     @property
     def booked_seats(self) -> int:
+        # Annotated by `MovieSessionQuerySet.with_booked_seats`
+        if hasattr(self, 'booked_seats_number'):
+            return self.booked_seats_number
         return self.tickets.count()
 
     @property
@@ -150,16 +207,27 @@ class MovieSession(Model):
 
     @property
     def is_booking_closed(self):
-        time_remains: timedelta = (
-                datetime.combine(self.date, self.starts_at) -
-                local_time_as_naive()
-
-        )
+        time_remains: timedelta = self.starts_at_dt - timezone.now()
         return time_remains <= settings.BOOKING_CLOSE_PERIOD
 
+    @property
+    def auto_cancelation_dt(self) -> datetime:
+        return self.starts_at_dt - settings.BOOKING_CLOSE_PERIOD
+
     def save(self, *args, **kwargs):
+        if self.date is not None and self.starts_at is not None:
+            self.starts_at_dt = local_datetime(self.date, self.starts_at)
         self.full_clean()
         super(MovieSession, self).save(*args, **kwargs)
+        guard_movie_session(self.pk, self.high_demand)
+
+    def switch(self, **switches):
+        """
+        Changes fields of `SWITCHES` only, sessions on sale included.
+        """
+        for name, value in switches.items():
+            setattr(self, name, value)
+        self.save(update_fields=list(switches))
 
     def clean(self):
         super(MovieSession, self).clean()
@@ -187,29 +255,97 @@ class MovieSession(Model):
 
         return overlap > timedelta()
 
-    @transaction.atomic
+    def _lock(self):
+        # Seat searches of the session go one by one and don't conflict
+        list(
+            MovieSession.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list('pk', flat=True)
+        )
+
+    def _customer_errors(self, customer: User) -> dict:
+        # We are expecting authenticated and valid user
+        if customer.is_authenticated:
+            try:
+                customer.full_clean()
+            except ValidationError as e:
+                return {'customer': e}
+            return {}
+        else:
+            return {
+                'customer': ValidationError(
+                    'Unauthenticated customer.',
+                    'unauthenticated_customer',
+                ),
+            }
+
+    def _create_ticket(
+            self,
+            customer: User,
+            row_number: int,
+            seat_number: int,
+            cancel_at: datetime = None,
+    ) -> 'Ticket':
+        try:
+            ticket = Ticket.objects.create(
+                movie_session=self,
+                customer=customer,
+                row_number=row_number,
+                seat_number=seat_number,
+                cost=self.ticket_cost,
+            )
+        except IntegrityError:
+            raise SeatNotAvailableError()
+        else:
+            self.schedule_auto_cancelation(ticket, cancel_at)
+            return ticket
+
+    def schedule_auto_cancelation(
+            self,
+            ticket: 'Ticket',
+            cancel_at: datetime = None,
+    ):
+        auto_cancelation_dt = cancel_at or self.auto_cancelation_dt
+
+        transaction.on_commit(
+            lambda: cancel_non_paid_booking.apply_async(
+                (ticket.pk, self.pk, auto_cancelation_dt),
+                eta=auto_cancelation_dt,
+            ),
+        )
+
     def book_ticket(
             self,
             customer: User,
             row_number: int,
             seat_number: int,
     ) -> 'Ticket':
+        if self.booking_mode == self.QUEUED_BOOKING:
+            self._check_booking(customer, row_number, seat_number)
+            return booking_queues.book(self, customer, row_number, seat_number)
+
+        return self._book_ticket(customer, row_number, seat_number)
+
+    @transaction.atomic
+    def _book_ticket(
+            self,
+            customer: User,
+            row_number: int,
+            seat_number: int,
+    ) -> 'Ticket':
+        self._check_booking(customer, row_number, seat_number)
+        return self._create_ticket(customer, row_number, seat_number)
+
+    def _check_booking(
+            self,
+            customer: User,
+            row_number: int,
+            seat_number: int,
+    ):
         # Before booking ticket check that movie session is valid
         self.full_clean()
 
-        errors = {}
-
-        # We are expecting authenticated and valid user
-        if customer.is_authenticated:
-            try:
-                customer.full_clean()
-            except ValidationError as e:
-                errors['customer'] = e
-        else:
-            errors['customer'] = ValidationError(
-                'Unauthenticated customer.',
-                'unauthenticated_customer',
-            )
+        errors = self._customer_errors(customer)
 
         if row_number < 1 or row_number > self.hall.rows_number:
             errors['row_number'] = ValidationError(
@@ -229,38 +365,357 @@ class MovieSession(Model):
         if self.is_booking_closed:
             raise NoBookingAvailableError()
 
+    def book_best_seats(
+            self,
+            customer: User,
+            party_size: int,
+            together: bool = True,
+            aisle: bool = False,
+            max_retries: int = 3,
+    ):
+        """
+        Books the best free seats for the party at once, see
+        `find_best_seats`. Seats taken by concurrent bookings make the
+        search start over.
+        """
+        for _ in range(max_retries):
+            try:
+                return self._book_best_seats(
+                    customer,
+                    party_size,
+                    together,
+                    aisle,
+                )
+            except SeatNotAvailableError:
+                continue
+
+        raise SeatNotAvailableError()
+
+    @transaction.atomic
+    def _book_best_seats(self, customer, party_size, together, aisle):
+        self.full_clean()
+
+        errors = self._customer_errors(customer)
+        if errors:
+            raise ValidationError(errors)
+
+        if self.is_booking_closed:
+            raise NoBookingAvailableError()
+
+        self._lock()
+
+        seats = find_best_seats(
+            self.hall.rows_number,
+            self.hall.seats_per_row,
+            self.tickets.values_list('row_number', 'seat_number'),
+            party_size,
+            together=together,
+            aisle=aisle,
+        )
+        if seats is None:
+            raise NoSuitableSeatsError()
+
+        return [
+            self._create_ticket(customer, row_number, seat_number)
+            for row_number, seat_number in seats
+        ]
+
+    def join_waitlist(self, customer: User) -> 'WaitlistEntry':
+        """
+        Puts the customer in line for seats of sold out session, joining
+        twice keeps the place.
+        """
+        self.full_clean()
+
+        errors = self._customer_errors(customer)
+        if errors:
+            raise ValidationError(errors)
+
+        if self.is_booking_closed:
+            raise NoBookingAvailableError()
+
+        if self.empty_seats > 0:
+            raise SeatsAvailableError()
+
+        entry, _ = WaitlistEntry.objects.get_or_create(
+            movie_session=self,
+            customer=customer,
+        )
+        return entry
+
+    @transaction.atomic
+    def promote_waitlist(self, batch_size: int):
+        """
+        Offers free seats to the first waiting customers, at most
+        `batch_size` of them. Offer is a ticket held for
+        `WAITLIST_HOLD_PERIOD`, it's canceled unless paid in time.
+
+        Returns booked tickets.
+        """
+        if self.is_booking_closed:
+            return []
+
+        self._lock()
+
+        booked = set(self.tickets.values_list('row_number', 'seat_number'))
+        free_seats_number = self.hall.capacity - len(booked)
+        if free_seats_number <= 0:
+            return []
+
+        entries = list(
+            self.waitlist.filter(status=WaitlistEntry.WAITING)
+            .select_related('customer')
+            .order_by('pk')[:min(batch_size, free_seats_number)]
+        )
+
+        now = timezone.now()
+        hold_until = min(
+            now + settings.WAITLIST_HOLD_PERIOD,
+            self.auto_cancelation_dt,
+        )
+        tickets = []
+        for entry in entries:
+            [(row_number, seat_number)] = find_best_seats(
+                self.hall.rows_number,
+                self.hall.seats_per_row,
+                booked,
+                1,
+            )
+            booked.add((row_number, seat_number))
+
+            ticket = self._create_ticket(
+                entry.customer,
+                row_number,
+                seat_number,
+                cancel_at=hold_until,
+            )
+            entry.status = WaitlistEntry.OFFERED
+            entry.offered_at = now
+            entry.ticket = ticket
+            entry.save()
+            tickets.append(ticket)
+
+        return tickets
+
+    @transaction.atomic
+    def cancel_unpaid_tickets(self) -> int:
+        """
+        Cancels all non paid tickets of the session with one delete and
+        notifies their customers, freed seats are offered to the waitlist.
+        Returns number of canceled tickets.
+        """
+        self._lock()
+        tickets = list(
+            self.tickets.filter(paid_at__isnull=True)
+            .select_for_update(of=('self',))
+            .values_list('pk', 'customer__email', 'row_number', 'seat_number')
+        )
+        if not tickets:
+            return 0
+
+        Ticket.objects.filter(pk__in=[pk for pk, *_ in tickets]).delete()
+
+        if self.waitlist.filter(status=WaitlistEntry.WAITING).exists():
+            transaction.on_commit(lambda: promote_waitlist.delay(self.pk))
+
+        seats = {}
+        for _, email, row_number, seat_number in tickets:
+            seats.setdefault(email, []).append((row_number, seat_number))
+        notify_customers(
+            (
+                email,
+                'Booking canceled',
+                f'Your booking of {self} ({_format_seats(customer_seats)}) '
+                f'was canceled.',
+            )
+            for email, customer_seats in seats.items()
+        )
+
+        return len(tickets)
+
+    @transaction.atomic
+    def move_tickets(self, target: 'MovieSession') -> int:
+        """
+        Moves every ticket of the session to another session of the same
+        movie with one update and notifies their customers. Tickets keep
+        their seats when possible, see `remap_seats`.
+
+        Returns number of moved tickets.
+        """
+        if target.pk == self.pk or target.movie_id != self.movie_id:
+            raise IncompatibleMovieSessionError()
+
+        if target.is_booking_closed:
+            raise NoBookingAvailableError()
+
+        # Locked in the same order by every move, so they don't deadlock
+        list(
+            MovieSession.objects.select_for_update()
+            .filter(pk__in=(self.pk, target.pk))
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        tickets = list(
+            self.tickets.select_for_update(of=('self',)).values_list(
+                'pk',
+                'customer_id',
+                'customer__email',
+                'row_number',
+                'seat_number',
+                'paid_at',
+            )
+        )
+        if not tickets:
+            return 0
+
+        remapped = remap_seats(
+            target.hall.rows_number,
+            target.hall.seats_per_row,
+            target.tickets.values_list('row_number', 'seat_number'),
+            [
+                (pk, customer_pk, row_number, seat_number)
+                for pk, customer_pk, _, row_number, seat_number, _ in tickets
+            ],
+        )
+        if remapped is None:
+            raise NoSuitableSeatsError()
+
+        changes = {'movie_session': target, 'updated_at': timezone.now()}
+        if remapped:
+            for index, name in enumerate(('row_number', 'seat_number')):
+                changes[name] = Case(
+                    *(
+                        When(pk=pk, then=Value(seat[index]))
+                        for pk, seat in remapped.items()
+                    ),
+                    default=F(name),
+                    output_field=IntegerField(),
+                )
         try:
-            ticket = Ticket.objects.create(
-                movie_session=self,
-                customer=customer,
-                row_number=row_number,
-                seat_number=seat_number,
-                cost=self.ticket_cost,
+            Ticket.objects.filter(pk__in=[pk for pk, *_ in tickets]).update(
+                **changes,
             )
         except IntegrityError:
+            # Seat of the target was booked meanwhile
             raise SeatNotAvailableError()
-        else:
-            start_dt = datetime.combine(
-                self.date,
-                self.starts_at,
-            ).astimezone(timezone.get_default_timezone())
-            auto_cancelation_dt = start_dt - settings.BOOKING_CLOSE_PERIOD
 
+        # Codes of paid tickets name the old session and seats, and both
+        # manifests are sent in full, as tickets left one of them
+        paid_pks = [pk for pk, *_, paid_at in tickets if paid_at is not None]
+        if paid_pks:
+            MovieSession.objects.filter(
+                pk__in=(self.pk, target.pk),
+            ).bump_manifest_version()
+            revoked_ticket_codes.revoke(
+                paid_pks,
+                self.starts_at_dt + timedelta(minutes=self.total_duration),
+            )
+
+        unpaid_pks = [pk for pk, *_, paid_at in tickets if paid_at is None]
+        auto_cancelation_dt = target.auto_cancelation_dt
+        if unpaid_pks:
+            offers = self._move_waitlist_offers(target, unpaid_pks)
+            # Offers keep their short hold, other tickets get the target's
+            for ticket_pk, offered_at in offers.items():
+                hold_until = min(
+                    offered_at + settings.WAITLIST_HOLD_PERIOD,
+                    auto_cancelation_dt,
+                )
+                transaction.on_commit(
+                    lambda ticket_pk=ticket_pk, hold_until=hold_until:
+                    cancel_non_paid_bookings.apply_async(
+                        ([ticket_pk], target.pk, hold_until),
+                        eta=hold_until,
+                    ),
+                )
+            unpaid_pks = [pk for pk in unpaid_pks if pk not in offers]
+        if unpaid_pks:
             transaction.on_commit(
-                lambda: cancel_non_paid_booking.apply_async(
-                    (ticket.pk,),
+                lambda: cancel_non_paid_bookings.apply_async(
+                    (unpaid_pks, target.pk, auto_cancelation_dt),
                     eta=auto_cancelation_dt,
                 ),
             )
 
-            return ticket
+        seats = {}
+        for pk, _, email, row_number, seat_number, _ in tickets:
+            seat = remapped.get(pk, (row_number, seat_number))
+            seats.setdefault(email, []).append(seat)
+        notify_customers(
+            (
+                email,
+                'Booking moved',
+                f'Your booking of {self} was moved to {target} '
+                f'({_format_seats(customer_seats)}).',
+            )
+            for email, customer_seats in seats.items()
+        )
+
+        return len(tickets)
+
+    def _move_waitlist_offers(self, target: 'MovieSession', ticket_pks):
+        """
+        Moves waitlist entries offering given tickets to the target session.
+        Returns offer time by ticket pk.
+        """
+        offers = dict(
+            WaitlistEntry.objects.filter(ticket__in=ticket_pks)
+            .values_list('ticket_id', 'offered_at')
+        )
+        if not offers:
+            return offers
+
+        entries = WaitlistEntry.objects.filter(ticket__in=list(offers))
+        # Customers holding an offer don't wait for the target's seats
+        # anymore, the one already offered a seat there keeps that entry
+        WaitlistEntry.objects.filter(
+            movie_session=target,
+            customer__in=entries.values('customer'),
+            status=WaitlistEntry.WAITING,
+        ).delete()
+        entries.filter(
+            customer__in=target.waitlist.values('customer'),
+        ).delete()
+        entries.update(movie_session=target)
+        return offers
 
     def __str__(self):
         return f'{self.movie} at {self.date} in "{self.hall}"'
 
 
+def _format_seats(seats) -> str:
+    return ', '.join(
+        f'row {row_number}, seat {seat_number}'
+        for row_number, seat_number in sorted(seats)
+    )
+
+
+def notify_customers(messages):
+    """
+    Sends `(email, subject, message)` notifications after commit, in tasks
+    of `NOTIFICATION_BATCH_SIZE` emails.
+    """
+    messages = [
+        (subject, message, email) for email, subject, message in messages
+    ]
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start:start + batch_size]
+        transaction.on_commit(
+            lambda batch=batch: send_notifications.delay(batch),
+        )
+
+
 @receiver([pre_save, pre_delete], sender=MovieSession)
-def check_movie_session_has_no_bookings(sender, instance, **kwargs):
+def check_movie_session_has_no_bookings(
+        sender,
+        instance,
+        update_fields=None,
+        **kwargs,
+):
+    if update_fields is not None and \
+            set(update_fields) <= set(MovieSession.SWITCHES):
+        return
     if instance.tickets.exists():
         raise MovieSessionHasBookingsError()
 
@@ -280,6 +735,25 @@ class OrderNumberGenerator:
     def _exists(self, value):
         return Ticket.objects.filter(order_number=value).exists()
 
+    def many(self, number: int):
+        """
+        Generates distinct values for bulk created tickets, checking them
+        with one query per try.
+        """
+        values = set()
+        for _ in range(self.max_retries):
+            candidates = {
+                self._generate() for _ in range(number - len(values))
+            } - values
+            candidates -= set(
+                Ticket.objects.filter(order_number__in=candidates)
+                .values_list('order_number', flat=True)
+            )
+            values |= candidates
+            if len(values) == number:
+                return list(values)
+        raise AttemptsIsOverError()
+
     def __call__(self):
         value = self._generate()
         try_number = 1
@@ -295,6 +769,9 @@ class OrderNumberGenerator:
 class Ticket(Model):
     class Meta:
         unique_together = ('movie_session', 'row_number', 'seat_number')
+        indexes = [
+            Index(fields=['movie_session', 'updated_at']),
+        ]
 
     movie_session = ForeignKey(
         MovieSession,
@@ -321,19 +798,39 @@ class Ticket(Model):
     )
     booked_at = DateTimeField(default=timezone.now)
     paid_at = DateTimeField(null=True, blank=True)
+    checked_in_at = DateTimeField(null=True, blank=True)
+    # Set by every payment, check in and move, so door devices refresh
+    # check in manifests with tickets changed since their last download
+    updated_at = DateTimeField(default=timezone.now, editable=False)
 
-    @transaction.atomic
-    def make_payment(self):
-        self.full_clean()
+    objects = TicketQuerySet.as_manager()
 
+    def make_payment(self):
+        """
+        Pays the ticket with one guarded update, so it is never paid twice
+        or after booking closes whatever concurrent requests do. Failure
+        reason is looked up only when the update misses.
+        """
         if self.paid_at is not None:
             raise TicketAlreadyPaidError('Ticket already paid.')
 
-        if self.movie_session.is_booking_closed:
-            raise NoBookingAvailableError()
-
-        self.paid_at = timezone.now()
-        self.save()
+        paid_at = timezone.now()
+        if Ticket.objects.filter(pk=self.pk).payable().update(
+                paid_at=paid_at,
+                updated_at=paid_at,
+        ):
+            self.paid_at = paid_at
+            self.updated_at = paid_at
+            return
+
+        self.paid_at = Ticket.objects.filter(pk=self.pk).values_list(
+            'paid_at',
+            flat=True,
+        ).first()
+        if self.paid_at is not None:
+            raise TicketAlreadyPaidError('Ticket already paid.')
+        # Session is closed for booking, or the ticket is canceled
+        raise NoBookingAvailableError()
 
     @transaction.atomic
     def cancel_booking(self):
@@ -342,8 +839,154 @@ class Ticket(Model):
 
         self.delete()
 
+        movie_session_pk = self.movie_session_id
+        if WaitlistEntry.objects.filter(
+                movie_session_id=movie_session_pk,
+                status=WaitlistEntry.WAITING,
+        ).exists():
+            transaction.on_commit(
+                lambda: promote_waitlist.delay(movie_session_pk),
+            )
+
+    def __str__(self):
+        return (
+            f'{self.movie_session} '
+            f'(row {self.row_number}, seat {self.seat_number})'
+        )
+
+
+class WaitlistEntry(Model):
+    WAITING = 'waiting'
+    OFFERED = 'offered'
+    STATUSES = (
+        (WAITING, 'Waiting'),
+        (OFFERED, 'Offered'),
+    )
+
+    class Meta:
+        unique_together = ('movie_session', 'customer')
+        indexes = [
+            Index(fields=['movie_session', 'status']),
+        ]
+
+    movie_session = ForeignKey(
+        MovieSession,
+        on_delete=CASCADE,
+        related_name='waitlist',
+    )
+    customer = ForeignKey(
+        User,
+        on_delete=CASCADE,
+        related_name='waitlist_entries',
+    )
+    status = CharField(max_length=16, choices=STATUSES, default=WAITING)
+    created_at = DateTimeField(default=timezone.now)
+    offered_at = DateTimeField(null=True, blank=True)
+    # Offer ends with its ticket, whether expired or canceled, so the
+    # customer may join again
+    ticket = OneToOneField(
+        Ticket,
+        on_delete=CASCADE,
+        null=True,
+        blank=True,
+        related_name='waitlist_entry',
+    )
+
+    @property
+    def position(self):
+        if self.status != self.WAITING:
+            return None
+        return WaitlistEntry.objects.filter(
+            movie_session_id=self.movie_session_id,
+            status=self.WAITING,
+            pk__lte=self.pk,
+        ).count()
+
+    def __str__(self):
+        return f'{self.customer} for {self.movie_session}'
+
+
+class ArchivedMovieSession(Model):
+    """
+    Finished movie session moved out of the hot table, keeps original pk.
+    """
+
+    id = IntegerField(primary_key=True)
+    movie = ForeignKey(
+        Movie,
+        on_delete=PROTECT,
+        related_name='archived_movie_sessions',
+    )
+    hall = ForeignKey(
+        Hall,
+        on_delete=PROTECT,
+        related_name='archived_movie_sessions',
+    )
+    date = DateField(db_index=True)
+    starts_at = TimeField()
+    ticket_cost = DecimalField(max_digits=14, decimal_places=2)
+    advertise_duration = IntegerField()
+    archived_at = DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.movie} at {self.date} in "{self.hall}"'
+
+
+class ArchivedTicket(Model):
+    """
+    Ticket of an archived session, keeps original pk.
+
+    Session date is copied, so the table can be partitioned by it. Order
+    numbers are not unique here, they are unique among live tickets only.
+    """
+
+    id = IntegerField(primary_key=True)
+    movie_session = ForeignKey(
+        ArchivedMovieSession,
+        on_delete=PROTECT,
+        related_name='tickets',
+    )
+    session_date = DateField()
+    customer = ForeignKey(
+        User,
+        on_delete=PROTECT,
+        related_name='archived_tickets',
+    )
+    row_number = IntegerField()
+    seat_number = IntegerField()
+    order_number = CharField(max_length=12, db_index=True)
+    cost = DecimalField(max_digits=14, decimal_places=2)
+    booked_at = DateTimeField()
+    paid_at = DateTimeField(null=True, blank=True)
+    checked_in_at = DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return (
             f'{self.movie_session} '
             f'(row {self.row_number}, seat {self.seat_number})'
         )
+
+
+class RevokedToken(Model):
+    jti = CharField(max_length=255, unique=True)
+    expires_at = DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class RevokedTicketCode(Model):
+    """
+    Codes of the ticket issued till `revoked_at` are stale, e.g. of moved
+    tickets. Kept till the codes expire anyway.
+    """
+    ticket = ForeignKey(
+        Ticket,
+        on_delete=CASCADE,
+        related_name='revoked_codes',
+    )
+    revoked_at = DateTimeField(default=timezone.now)
+    expires_at = DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.ticket_id} at {self.revoked_at}'
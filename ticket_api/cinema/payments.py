@@ -0,0 +1,99 @@
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ticket_api.cinema.exceptions import NoBookingAvailableAPIError
+from ticket_api.cinema.exceptions import TicketAlreadyPaidAPIError
+from ticket_api.cinema.models import Ticket
+
+PAID = 'paid'
+NOT_FOUND = 'not_found'
+# Same codes single ticket payment fails with
+ALREADY_PAID = TicketAlreadyPaidAPIError.default_code
+BOOKING_CLOSED = NoBookingAvailableAPIError.default_code
+
+PaymentResult = namedtuple(
+    'PaymentResult',
+    'ticket id order_number status paid_at',
+)
+
+
+def _is_id(identifier) -> bool:
+    # Order numbers start with letters
+    return str(identifier).isdecimal()
+
+
+@transaction.atomic
+def pay_tickets(queryset, identifiers, check_session=None):
+    """
+    Pays tickets of the queryset given by ids or order numbers with one
+    conditional update, so tickets paid or closed for booking meanwhile are
+    never paid twice. Returns result of every identifier in given order.
+
+    `check_session` is called with every session of the tickets before
+    payment and may raise to reject the whole batch.
+    """
+    ids = {int(identifier) for identifier in identifiers if _is_id(identifier)}
+    order_numbers = {
+        identifier for identifier in identifiers if not _is_id(identifier)
+    }
+    found = list(
+        queryset.filter(Q(pk__in=ids) | Q(order_number__in=order_numbers))
+        .values_list('pk', 'order_number', 'movie_session_id')
+    )
+
+    if check_session is not None:
+        for movie_session_pk in sorted({row[2] for row in found}):
+            check_session(movie_session_pk)
+
+    paid_at = timezone.now()
+    pks = [pk for pk, _, _ in found]
+    paid_number = Ticket.objects.filter(pk__in=pks).payable().update(
+        paid_at=paid_at,
+        updated_at=paid_at,
+    )
+
+    if paid_number == len(pks):
+        statuses = {pk: (PAID, paid_at) for pk in pks}
+    else:
+        # Tickets paid by the update are told by their payment time
+        statuses = {}
+        rows = Ticket.objects.filter(pk__in=pks).values_list(
+            'pk',
+            'paid_at',
+        )
+        for pk, ticket_paid_at in rows:
+            if ticket_paid_at is None:
+                statuses[pk] = (BOOKING_CLOSED, None)
+            elif ticket_paid_at == paid_at:
+                statuses[pk] = (PAID, paid_at)
+            else:
+                statuses[pk] = (ALREADY_PAID, ticket_paid_at)
+
+    by_pk = {pk: order_number for pk, order_number, _ in found}
+    by_order_number = {order_number: pk for pk, order_number, _ in found}
+    results = []
+    for identifier in identifiers:
+        if _is_id(identifier):
+            pk = int(identifier)
+        else:
+            pk = by_order_number.get(identifier)
+
+        if pk not in statuses:
+            results.append(
+                PaymentResult(identifier, None, None, NOT_FOUND, None),
+            )
+        else:
+            status, ticket_paid_at = statuses[pk]
+            results.append(
+                PaymentResult(
+                    identifier,
+                    pk,
+                    by_pk[pk],
+                    status,
+                    ticket_paid_at,
+                ),
+            )
+    return results
@@ -0,0 +1,96 @@
+import os
+import traceback
+import uuid
+from collections import Counter
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _cache():
+    return caches[settings.SQL_PROFILE_CACHE]
+
+
+def _origin():
+    """
+    Returns project frames of the current stack, innermost last.
+    """
+    return [
+        f'{os.path.relpath(frame.filename, PROJECT_DIR)}:{frame.lineno} '
+        f'in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_DIR) and
+        frame.filename != __file__
+    ]
+
+
+class SqlProfiler:
+    """
+    Database execute wrapper collecting every statement of a request with
+    its duration and origin.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': repr(params),
+                'duration': perf_counter() - started,
+                'origin': _origin(),
+            })
+
+    @property
+    def duration(self) -> float:
+        return sum(query['duration'] for query in self.queries)
+
+    def duplicates(self):
+        """
+        Groups statements repeated with the same parameters ("exact") and
+        with any parameters ("similar"), the latter being a typical N+1.
+        """
+        exact = Counter(
+            (query['sql'], query['params']) for query in self.queries
+        )
+        similar = Counter(query['sql'] for query in self.queries)
+        return {
+            'exact': [
+                {'sql': sql, 'params': params, 'count': count}
+                for (sql, params), count in exact.most_common()
+                if count > 1
+            ],
+            'similar': [
+                {'sql': sql, 'count': count}
+                for sql, count in similar.most_common()
+                if count > 1
+            ],
+        }
+
+    def summary(self) -> dict:
+        return {
+            'count': len(self.queries),
+            'duration': self.duration,
+            'duplicates': self.duplicates(),
+            'queries': self.queries,
+        }
+
+    def store(self) -> str:
+        profile_id = uuid.uuid4().hex
+        _cache().set(
+            f'sql-profile:{profile_id}',
+            self.summary(),
+            int(settings.SQL_PROFILE_TTL.total_seconds()),
+        )
+        return profile_id
+
+
+def get_stored_profile(profile_id):
+    return _cache().get(f'sql-profile:{profile_id}')
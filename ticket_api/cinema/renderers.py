@@ -0,0 +1,91 @@
+import json
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    # Optional, stdlib json is used without it
+    orjson = None
+
+# Same escapes as DRF does, JSON is valid JavaScript then
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def _reject_constant(value):
+    raise ValueError(f'Out of range float values are not allowed: {value}')
+
+
+def dumps(data) -> bytes:
+    """
+    Encodes data into compact UTF-8 JSON. Values serializers don't convert,
+    like decimals, dates and times, are encoded the way DRF does, so both
+    backends give the same output.
+    """
+    if orjson is not None:
+        content = orjson.dumps(
+            data,
+            default=_drf_encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+    else:
+        content = json.dumps(
+            data,
+            cls=encoders.JSONEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(',', ':'),
+        ).encode()
+
+    for separator, escaped in LINE_SEPARATORS:
+        if separator in content:
+            content = content.replace(separator, escaped)
+    return content
+
+
+def loads(content: bytes):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content.decode(), parse_constant=_reject_constant)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # Pretty printing clients are rare, DRF serves them
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super(FastJSONRenderer, self).render(
+                data,
+                accepted_media_type,
+                renderer_context,
+            )
+
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read() if stream is not None else b''
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding).encode()
+            return loads(content)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,121 @@
+def _distance(row_index, first_index, size, center_row, center_seat):
+    block_center = first_index + (size - 1) / 2
+    return abs(row_index - center_row) + abs(block_center - center_seat)
+
+
+def find_best_seats(
+        rows_number: int,
+        seats_per_row: int,
+        booked,
+        party_size: int,
+        together: bool = True,
+        aisle: bool = False,
+):
+    """
+    Picks seats for a party among free ones, closest to the hall center.
+
+    Every row is scanned once keeping the length of the free run ending at
+    each seat, so each block of `party_size` free seats in a row is scored
+    in constant time. With `aisle` blocks touching a row end win. Parties
+    not requiring to sit `together` get the best single seats when there
+    is no block for them.
+
+    Returns sorted `(row_number, seat_number)` pairs or None when there
+    are no suitable seats.
+    """
+    occupied = [[False] * seats_per_row for _ in range(rows_number)]
+    for row_number, seat_number in booked:
+        occupied[row_number - 1][seat_number - 1] = True
+
+    center_row = (rows_number - 1) / 2
+    center_seat = (seats_per_row - 1) / 2
+
+    best_score = None
+    best_block = None
+    for row_index, row in enumerate(occupied):
+        run = 0
+        for seat_index, is_occupied in enumerate(row):
+            run = 0 if is_occupied else run + 1
+            if run < party_size:
+                continue
+
+            first_index = seat_index - party_size + 1
+            score = (
+                aisle and first_index != 0 and
+                seat_index != seats_per_row - 1,
+                _distance(
+                    row_index,
+                    first_index,
+                    party_size,
+                    center_row,
+                    center_seat,
+                ),
+            )
+            if best_score is None or score < best_score:
+                best_score = score
+                best_block = (row_index, first_index)
+
+    if best_block is not None:
+        row_index, first_index = best_block
+        return [
+            (row_index + 1, first_index + offset + 1)
+            for offset in range(party_size)
+        ]
+
+    if together:
+        return None
+
+    free = sorted(
+        (
+            _distance(row_index, seat_index, 1, center_row, center_seat),
+            row_index,
+            seat_index,
+        )
+        for row_index, row in enumerate(occupied)
+        for seat_index, is_occupied in enumerate(row)
+        if not is_occupied
+    )
+    if len(free) < party_size:
+        return None
+
+    return sorted(
+        (row_index + 1, seat_index + 1)
+        for _, row_index, seat_index in free[:party_size]
+    )
+
+
+def remap_seats(rows_number: int, seats_per_row: int, booked, tickets):
+    """
+    Seats tickets moved into a hall with `booked` seats. Tickets keep their
+    seats when those exist in the hall and are free, others get the best
+    free seats, together with displaced tickets of the same customer when
+    possible.
+
+    Tickets are `(pk, customer_pk, row_number, seat_number)` tuples.
+    Returns new `(row_number, seat_number)` of tickets changing seats by
+    their pk, or None when they don't fit.
+    """
+    occupied = set(booked)
+    displaced = {}
+    for pk, customer_pk, row_number, seat_number in tickets:
+        seat = (row_number, seat_number)
+        if row_number <= rows_number and seat_number <= seats_per_row and \
+                seat not in occupied:
+            occupied.add(seat)
+        else:
+            displaced.setdefault(customer_pk, []).append(pk)
+
+    remapped = {}
+    for pks in displaced.values():
+        seats = find_best_seats(
+            rows_number,
+            seats_per_row,
+            occupied,
+            len(pks),
+            together=False,
+        )
+        if seats is None:
+            return None
+        occupied.update(seats)
+        remapped.update(zip(pks, seats))
+    return remapped
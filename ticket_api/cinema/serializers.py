@@ -1,19 +1,95 @@
+from django.conf import settings
+from rest_framework.compat import MaxValueValidator
 from rest_framework.compat import MinValueValidator
+from rest_framework.exceptions import ValidationError
 from rest_framework.fields import BooleanField
+from rest_framework.fields import CharField
+from rest_framework.fields import DateTimeField
 from rest_framework.fields import IntegerField
+from rest_framework.fields import ListField
+from rest_framework.relations import PrimaryKeyRelatedField
 from rest_framework.relations import SlugRelatedField
 from rest_framework.serializers import HyperlinkedModelSerializer
 from rest_framework.serializers import ModelSerializer
 from rest_framework.serializers import Serializer
-
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.serializers import TokenVerifySerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from ticket_api.cinema.blacklist import revoked_tokens
+from ticket_api.cinema.exceptions import PasswordHashingOverloadedAPIError
+from ticket_api.cinema.exceptions import PasswordHashingOverloadedError
+from ticket_api.cinema.models import ArchivedMovieSession
+from ticket_api.cinema.models import ArchivedTicket
 from ticket_api.cinema.models import Hall
 from ticket_api.cinema.models import Movie
 from ticket_api.cinema.models import MovieSession
 from ticket_api.cinema.models import Ticket
 from ticket_api.cinema.models import User
+from ticket_api.cinema.models import WaitlistEntry
+from ticket_api.cinema.sparse import SparseFieldsMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
 from ticket_api.cinema.validators import DynamicMaxValueValidator
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return ClaimsRefreshToken.for_user(user)
+
+    def validate(self, attrs):
+        try:
+            return super(ClaimsTokenObtainPairSerializer, self).validate(attrs)
+        except PasswordHashingOverloadedError:
+            raise PasswordHashingOverloadedAPIError()
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        # Claims are re-read on every refresh to keep them fresh
+        refresh = RefreshToken(attrs['refresh'])
+        if revoked_tokens.is_revoked(refresh['jti']):
+            raise InvalidToken('Token is revoked')
+
+        user = User.objects.filter(
+            is_active=True,
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None:
+            raise InvalidToken('User not found or inactive')
+
+        refreshed = ClaimsRefreshToken.for_user(user)
+
+        data = {'access': str(refreshed.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Rotated token must not be used again. Failed revocation means
+            # it was concurrently used by someone else.
+            revoked = revoked_tokens.revoke(
+                refresh['jti'],
+                datetime_from_epoch(refresh['exp']),
+            )
+            if not revoked:
+                raise InvalidToken('Token is revoked')
+
+            data['refresh'] = str(refreshed)
+
+        return data
+
+
+class RevocationAwareTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        if 'jti' in token and revoked_tokens.is_revoked(token['jti']):
+            raise InvalidToken('Token is revoked')
+
+        return {}
+
+
 class UserInfoSerializer(ModelSerializer):
     class Meta:
         model = User
@@ -28,55 +104,79 @@ class AnonymousUserInfoSerializer(Serializer):
     is_authenticated = BooleanField()
 
 
-class UserAdminSerializer(ModelSerializer):
+class UserAdminSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ('email', 'last_login', 'date_joined')
 
 
-class HallPublicSerializer(HyperlinkedModelSerializer):
+class HallPublicSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Hall
         exclude = ('cleaning_duration',)
+        field_sources = {
+            'capacity': ('rows_number', 'seats_per_row'),
+        }
 
     capacity = IntegerField(read_only=True)
 
 
-class HallAdminSerializer(HyperlinkedModelSerializer):
+class HallAdminSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Hall
         fields = '__all__'
+        field_sources = {
+            'capacity': ('rows_number', 'seats_per_row'),
+        }
 
     capacity = IntegerField(read_only=True)
 
 
-class MoviePublicSerializer(HyperlinkedModelSerializer):
+class MoviePublicSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Movie
         fields = '__all__'
 
 
-class MovieAdminSerializer(HyperlinkedModelSerializer):
+class MovieAdminSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Movie
         fields = '__all__'
 
 
-class MovieSessionPublicSerializer(HyperlinkedModelSerializer):
+class MovieSessionPublicSerializer(
+    SparseFieldsMixin,
+    HyperlinkedModelSerializer,
+):
     class Meta:
         model = MovieSession
         fields = (
             'url', 'hall', 'movie', 'date', 'starts_at', 'ticket_cost',
             'empty_seats',
         )
+        field_sources = {
+            'empty_seats': ('hall__rows_number', 'hall__seats_per_row'),
+        }
 
     empty_seats = IntegerField(read_only=True)
 
 
-class MovieSessionAdminSerializer(HyperlinkedModelSerializer):
+class MovieSessionAdminSerializer(
+    SparseFieldsMixin,
+    HyperlinkedModelSerializer,
+):
     class Meta:
         model = MovieSession
         fields = '__all__'
+        field_sources = {
+            'total_duration': (
+                'advertise_duration',
+                'movie__duration',
+                'hall__cleaning_duration',
+            ),
+            'booked_seats': (),
+            'empty_seats': ('hall__rows_number', 'hall__seats_per_row'),
+        }
 
     total_duration = IntegerField(read_only=True)
     booked_seats = IntegerField(read_only=True)
@@ -118,6 +218,99 @@ class BookingSerializer(Serializer):
     )
 
 
+class BestSeatsSerializer(Serializer):
+    party_size = IntegerField(
+        validators=(
+            MinValueValidator(1),
+            MaxValueValidator(settings.BEST_SEATS_MAX_PARTY_SIZE),
+        )
+    )
+    together = BooleanField(default=True)
+    aisle = BooleanField(default=False)
+
+
+class BatchPaymentSerializer(Serializer):
+    # Ticket ids or order numbers
+    tickets = ListField(
+        child=CharField(max_length=12),
+        min_length=1,
+        max_length=settings.BATCH_PAYMENT_MAX_TICKETS,
+    )
+
+
+class MoveTicketsSerializer(Serializer):
+    movie_session = PrimaryKeyRelatedField(
+        queryset=MovieSession.objects.select_related('hall', 'movie'),
+    )
+
+
+class CheckInSerializer(Serializer):
+    order_number = CharField(max_length=12)
+    # Session the door admits to, tickets of others are rejected
+    movie_session = IntegerField(allow_null=True, default=None)
+
+
+class TicketCodeSerializer(Serializer):
+    code = CharField(max_length=128)
+
+
+class ManifestSerializer(Serializer):
+    # Manifest versions the device has, as `<session>:<version>` pairs
+    # separated by commas
+    versions = CharField(required=False, default='')
+    # `synced_at` of the manifests the device has
+    since = DateTimeField(default=None)
+
+    def validate_versions(self, value):
+        try:
+            return dict(
+                map(int, pair.split(':')) for pair in value.split(',') if pair
+            )
+        except ValueError:
+            raise ValidationError('Expected <session>:<version> pairs.')
+
+
+class CheckInEventSerializer(Serializer):
+    order_number = CharField(max_length=12)
+    # Session the device admits to, tickets of others are rejected
+    movie_session = IntegerField(allow_null=True, default=None)
+    checked_in_at = DateTimeField()
+
+
+class CheckInSyncSerializer(Serializer):
+    events = ListField(
+        child=CheckInEventSerializer(),
+        min_length=1,
+        max_length=settings.CHECK_IN_SYNC_MAX_EVENTS,
+    )
+
+
+class PaymentResultSerializer(Serializer):
+    ticket = CharField()
+    id = IntegerField()
+    order_number = CharField()
+    status = CharField()
+    paid_at = DateTimeField()
+
+
+class CheckInResultSerializer(Serializer):
+    order_number = CharField()
+    status = CharField()
+    checked_in_at = DateTimeField()
+
+
+class RevokedTicketCodeSerializer(Serializer):
+    ticket = IntegerField(source='ticket_id')
+    revoked_at = DateTimeField()
+    expires_at = DateTimeField()
+
+
+class WaitlistEntrySerializer(HyperlinkedModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = ('status', 'position', 'created_at', 'offered_at', 'ticket')
+
+
 class BookingForCustomerSerializer(BookingSerializer):
     customer = SlugRelatedField(
         slug_field='email',
@@ -125,13 +318,16 @@ class BookingForCustomerSerializer(BookingSerializer):
     )
 
 
-class InlineHallSerializer(HyperlinkedModelSerializer):
+class InlineHallSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Hall
         fields = ('url', 'name')
 
 
-class InlineMovieSessionSerializer(HyperlinkedModelSerializer):
+class InlineMovieSessionSerializer(
+    SparseFieldsMixin,
+    HyperlinkedModelSerializer,
+):
     class Meta:
         model = MovieSession
         fields = ('url', 'hall', 'movie', 'date', 'starts_at')
@@ -140,20 +336,44 @@ class InlineMovieSessionSerializer(HyperlinkedModelSerializer):
     movie = MoviePublicSerializer()
 
 
-class TicketPrivateSerializer(HyperlinkedModelSerializer):
+class TicketPrivateSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Ticket
         fields = (
             'url', 'movie_session', 'row_number', 'seat_number', 'order_number',
-            'cost', 'booked_at', 'paid_at',
+            'cost', 'booked_at', 'paid_at', 'checked_in_at',
         )
 
     movie_session = InlineMovieSessionSerializer()
 
 
-class TicketAdminSerializer(HyperlinkedModelSerializer):
+class TicketAdminSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
     class Meta:
         model = Ticket
         fields = '__all__'
 
     customer = SlugRelatedField('email', queryset=User.objects.all())
+
+
+class ArchivedMovieSessionSerializer(SparseFieldsMixin, ModelSerializer):
+    class Meta:
+        model = ArchivedMovieSession
+        fields = (
+            'id', 'hall', 'movie', 'date', 'starts_at', 'ticket_cost',
+            'advertise_duration', 'archived_at',
+        )
+
+    hall = InlineHallSerializer()
+    movie = MoviePublicSerializer()
+
+
+class ArchivedTicketSerializer(SparseFieldsMixin, HyperlinkedModelSerializer):
+    class Meta:
+        model = ArchivedTicket
+        fields = (
+            'url', 'movie_session', 'customer', 'row_number', 'seat_number',
+            'order_number', 'cost', 'booked_at', 'paid_at', 'checked_in_at',
+        )
+
+    movie_session = ArchivedMovieSessionSerializer()
+    customer = SlugRelatedField('email', read_only=True)
@@ -0,0 +1,167 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.relations import HyperlinkedIdentityField
+from rest_framework.relations import HyperlinkedRelatedField
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.relations import RelatedField
+from rest_framework.relations import SlugRelatedField
+from rest_framework.serializers import BaseSerializer
+from rest_framework.serializers import HyperlinkedModelSerializer
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def requested_names(request, param):
+    """
+    Returns names listed in comma separated query parameter, None when it
+    is not given at all.
+    """
+    if request is None or param not in request.query_params:
+        return None
+    return {
+        name.strip()
+        for name in request.query_params[param].split(',')
+        if name.strip()
+    }
+
+
+def _link_field(serializer: BaseSerializer):
+    model = serializer.Meta.model
+    kwargs = {'read_only': True}
+    if serializer.source is not None:
+        kwargs['source'] = serializer.source
+
+    if isinstance(serializer, HyperlinkedModelSerializer):
+        return HyperlinkedRelatedField(
+            view_name=f'{model._meta.model_name}-detail',
+            **kwargs
+        )
+    else:
+        return PrimaryKeyRelatedField(**kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    Renders only top level fields listed in `fields` query parameter. When
+    `expand` parameter is given, nested serializers not listed in it by
+    dotted path are rendered as links instead.
+
+    `Meta.field_sources` lists model field paths needed by fields which
+    are not model fields themselves, see `queryset_paths`.
+    """
+
+    def _path(self):
+        names = []
+        node = self
+        while node.parent is not None:
+            if not isinstance(node.parent, ListSerializer):
+                names.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(names))
+
+    def get_fields(self):
+        fields = super(SparseFieldsMixin, self).get_fields()
+        request = self.context.get('request')
+        path = self._path()
+
+        requested = requested_names(request, FIELDS_PARAM)
+        if requested is not None and not path:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested
+            }
+
+        expand = requested_names(request, EXPAND_PARAM)
+        if expand is not None:
+            for name, field in fields.items():
+                if not isinstance(field, BaseSerializer) or \
+                        isinstance(field, ListSerializer):
+                    continue
+
+                field_path = f'{path}.{name}' if path else name
+                if not any(
+                        expanded == field_path or
+                        expanded.startswith(f'{field_path}.')
+                        for expanded in expand
+                ):
+                    fields[name] = _link_field(field)
+
+        return fields
+
+
+def queryset_paths(serializer: BaseSerializer, prefix=''):
+    """
+    Returns model field paths for `QuerySet.only` and relations for
+    `QuerySet.select_related` needed to render the serializer, or None
+    when some field can't be traced to the model.
+    """
+    model = serializer.Meta.model
+    field_sources = getattr(serializer.Meta, 'field_sources', {})
+    only = set()
+    related = set()
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, HyperlinkedIdentityField):
+            continue
+
+        if name in field_sources:
+            paths = field_sources[name]
+        elif isinstance(field, ListSerializer):
+            # Loaded by its own query
+            continue
+        elif isinstance(field, BaseSerializer):
+            nested = queryset_paths(field, f'{prefix}{field.source}__')
+            if nested is None:
+                return None
+            only |= nested[0]
+            related |= {prefix + field.source} | nested[1]
+            continue
+        elif isinstance(field, SlugRelatedField):
+            paths = (f'{field.source}__{field.slug_field}',)
+        else:
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            # Nested relations are rendered by serializers only
+            if model_field.is_relation and \
+                    not isinstance(field, RelatedField):
+                return None
+            paths = (field.source,)
+
+        for path in paths:
+            only.add(prefix + path)
+            relation, _, _ = path.rpartition('__')
+            if relation:
+                related.add(prefix + relation)
+
+    return only | related, related
+
+
+class SparseQuerySetMixin:
+    """
+    Loads only columns and joins needed by fields the serializer renders
+    for list and detail views.
+    """
+
+    def sparse_fields(self):
+        """
+        Returns names of top level fields to render.
+        """
+        return set(self.get_serializer().fields)
+
+    def sparse_queryset(self, queryset):
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        paths = queryset_paths(self.get_serializer())
+        if paths is None:
+            return queryset
+
+        only, related = paths
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
@@ -1,14 +1,131 @@
 from celery import shared_task
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import send_mass_mail
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ticket_api.cinema.exceptions import SeatNotAvailableError
+from ticket_api.cinema.exceptions import TicketAlreadyPaidError
+from ticket_api.cinema.metrics import AUTO_CANCEL_LAG
+from ticket_api.cinema.metrics import AUTO_CANCEL_OUTCOMES
+from ticket_api.cinema.metrics import registry
+
+AUTO_CANCEL_CANCELED = 'canceled'
+AUTO_CANCEL_ALREADY_PAID = 'already_paid'
+AUTO_CANCEL_GONE = 'gone'
+AUTO_CANCEL_MOVED = 'moved'
+
+
+def _cancel(ticket, eta) -> str:
+    if eta is None:
+        # Scheduled before the time was passed along
+        eta = ticket.movie_session.auto_cancelation_dt
+    elif isinstance(eta, str):
+        # JSON serializer sends datetimes as ISO strings
+        eta = parse_datetime(eta)
+    lag = timezone.now() - eta
+    AUTO_CANCEL_LAG.observe(max(lag.total_seconds(), 0))
+
+    try:
+        ticket.cancel_booking()
+    except TicketAlreadyPaidError:
+        return AUTO_CANCEL_ALREADY_PAID
+    else:
+        return AUTO_CANCEL_CANCELED
 
 
 @shared_task
-def cancel_non_paid_booking(ticket_pk):
+def cancel_non_paid_booking(ticket_pk, movie_session_pk=None, eta=None):
     from ticket_api.cinema.models import Ticket
 
     try:
-        ticket: Ticket = Ticket.objects.get(pk=ticket_pk)
+        ticket: Ticket = Ticket.objects.select_related('movie_session').get(
+            pk=ticket_pk,
+        )
     except ObjectDoesNotExist:
-        return
+        # Already canceled by staff
+        outcome = AUTO_CANCEL_GONE
     else:
-        ticket.cancel_booking()
+        if movie_session_pk is not None and \
+                ticket.movie_session_id != movie_session_pk:
+            # Moved to another session, which scheduled its own cancellation
+            outcome = AUTO_CANCEL_MOVED
+        else:
+            outcome = _cancel(ticket, eta)
+
+    AUTO_CANCEL_OUTCOMES.inc(outcome=outcome)
+    registry.flush()
+
+    return outcome
+
+
+@shared_task
+def cancel_non_paid_bookings(ticket_pks, movie_session_pk, eta=None):
+    return [
+        cancel_non_paid_booking(ticket_pk, movie_session_pk, eta)
+        for ticket_pk in ticket_pks
+    ]
+
+
+@shared_task
+def send_notifications(messages):
+    """
+    Sends `(subject, message, recipient)` emails over one connection.
+    """
+    return send_mass_mail(
+        [
+            (subject, message, None, [recipient])
+            for subject, message, recipient in messages
+        ],
+    )
+
+
+@shared_task(bind=True, max_retries=3)
+def promote_waitlist(self, movie_session_pk):
+    from ticket_api.cinema.models import MovieSession
+
+    try:
+        movie_session = MovieSession.objects.select_related(
+            'hall',
+            'movie',
+        ).get(pk=movie_session_pk)
+    except ObjectDoesNotExist:
+        return 0
+
+    batch_size = settings.WAITLIST_BATCH_SIZE
+    try:
+        tickets = movie_session.promote_waitlist(batch_size)
+    except SeatNotAvailableError:
+        # Seat was booked meanwhile, next run picks another one
+        raise self.retry(countdown=1)
+
+    # Batch is full, so there may be more seats and customers
+    if len(tickets) == batch_size:
+        promote_waitlist.delay(movie_session_pk)
+
+    return len(tickets)
+
+
+@shared_task
+def prune_revoked_tokens():
+    from ticket_api.cinema.blacklist import revoked_tokens
+
+    return revoked_tokens.prune()
+
+
+@shared_task
+def prune_revoked_ticket_codes():
+    from ticket_api.cinema.ticket_codes import revoked_ticket_codes
+
+    return revoked_ticket_codes.prune()
+
+
+@shared_task
+def archive_finished_movie_sessions():
+    from ticket_api.cinema.archive import archive_movie_sessions
+
+    return archive_movie_sessions(
+        timezone.localdate() - settings.TICKET_ARCHIVE_RETENTION,
+        settings.TICKET_ARCHIVE_BATCH_SIZE,
+    )
@@ -1,15 +1,23 @@
 from datetime import time
 from datetime import timedelta
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from hamcrest import assert_that
 from hamcrest import ends_with
+from hamcrest import equal_to
 from hamcrest import has_entries
+from hamcrest import less_than_or_equal_to
+from rest_framework.status import HTTP_200_OK
 
 from ticket_api.cinema.models import Hall
 from ticket_api.cinema.models import Movie
 from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
 from ticket_api.cinema.models import User
+from ticket_api.cinema.utils import local_datetime
 
 
 def make_url_of_model(instance):
@@ -196,3 +204,110 @@ class TicketSetupMixin(UserSetupMixin, MovieSessionSetupMixin):
         self.ticket_400_120_match = has_entries(
             url=self.ticket_400_120_url_match,
         )
+
+
+class QueryBudgetMixin:
+    """
+    Checks that number of queries made by an endpoint doesn't depend on the
+    amount of data it returns.
+
+    Data set of `TicketSetupMixin` is scale 1, every next scale adds
+    movies, sessions, customers and tickets, so that responses grow
+    proportionally. Every added customer also books a seat of
+    `movie_session_100_90`, so its detail and seats grow too.
+    """
+
+    query_budget_scales = (1, 10, 100)
+
+    def add_scale_units(self, first, number):
+        if number <= 0:
+            return
+
+        units = range(first, first + number)
+
+        names = [f'Scale movie {i}' for i in units]
+        Movie.objects.bulk_create(
+            Movie(name=name, duration=90) for name in names
+        )
+        movies = Movie.objects.filter(name__in=names).order_by('pk')
+
+        emails = [f'scale_{i}@example.com' for i in units]
+        User.objects.bulk_create(
+            User(email=email, password='!') for email in emails
+        )
+        customers = User.objects.filter(email__in=emails).order_by('pk')
+
+        halls = (self.hall_100, self.hall_400)
+        new_movie_sessions = []
+        for i, movie in zip(units, movies):
+            day = (timezone.now() + timedelta(days=2 + i)).date()
+            new_movie_sessions.append(
+                MovieSession(
+                    hall=halls[i % len(halls)],
+                    movie=movie,
+                    date=day,
+                    starts_at=time(10),
+                    starts_at_dt=local_datetime(day, time(10)),
+                    ticket_cost=100,
+                )
+            )
+        MovieSession.objects.bulk_create(new_movie_sessions)
+        movie_sessions = MovieSession.objects.filter(movie__in=movies) \
+            .order_by('date')
+
+        tickets = []
+        for i, movie_session, customer in zip(units, movie_sessions, customers):
+            for row_number, owner in ((1, self.user_1), (2, customer)):
+                tickets.append(
+                    Ticket(
+                        movie_session=movie_session,
+                        customer=owner,
+                        row_number=row_number,
+                        seat_number=1,
+                        order_number=f'SCAL{i:06d}{row_number:02d}',
+                        cost=100,
+                    )
+                )
+
+        booked = set(
+            self.movie_session_100_90.tickets
+            .values_list('row_number', 'seat_number')
+        )
+        free_seats = (
+            (row_number, seat_number)
+            for row_number in range(1, self.hall_100.rows_number + 1)
+            for seat_number in range(1, self.hall_100.seats_per_row + 1)
+            if (row_number, seat_number) not in booked
+        )
+        for i, customer, (row_number, seat_number) in zip(
+                units,
+                customers,
+                free_seats,
+        ):
+            tickets.append(
+                Ticket(
+                    movie_session=self.movie_session_100_90,
+                    customer=customer,
+                    row_number=row_number,
+                    seat_number=seat_number,
+                    order_number=f'SCAL{i:06d}00',
+                    cost=100,
+                )
+            )
+        Ticket.objects.bulk_create(tickets)
+
+    def assert_query_budget(self, path, budget):
+        added = 0
+        for scale in self.query_budget_scales:
+            self.add_scale_units(added + 1, scale - 1 - added)
+            added = scale - 1
+
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(path)
+
+            assert_that(response.status_code, equal_to(HTTP_200_OK))
+            assert_that(
+                len(context.captured_queries),
+                less_than_or_equal_to(budget),
+                f'Query budget of {path} at scale {scale}',
+            )
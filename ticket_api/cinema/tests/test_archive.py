@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import contains_string
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.archive import archive_movie_sessions
+from ticket_api.cinema.models import ArchivedMovieSession
+from ticket_api.cinema.models import ArchivedTicket
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class ArchiveTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(ArchiveTestCase, self).setUp()
+
+        self.ticket_past = Ticket.objects.create(
+            movie_session=self.movie_session_past,
+            customer=self.user_1,
+            row_number=1,
+            seat_number=1,
+            cost=self.movie_session_past.ticket_cost,
+            paid_at=timezone.now(),
+        )
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def test_moves_finished_sessions(self):
+        result = archive_movie_sessions(timezone.localdate(), batch_size=1)
+
+        assert_that(result, equal_to((1, 1)))
+        assert_that(
+            MovieSession.objects.filter(
+                pk=self.movie_session_past.pk,
+            ).exists(),
+            equal_to(False),
+        )
+        assert_that(
+            Ticket.objects.filter(pk=self.ticket_past.pk).exists(),
+            equal_to(False),
+        )
+        assert_that(
+            ArchivedMovieSession.objects.get(pk=self.movie_session_past.pk),
+            has_properties(
+                date=self.movie_session_past.date,
+                hall_id=self.movie_session_past.hall_id,
+            ),
+        )
+        assert_that(
+            ArchivedTicket.objects.get(pk=self.ticket_past.pk),
+            has_properties(
+                order_number=self.ticket_past.order_number,
+                session_date=self.movie_session_past.date,
+                customer_id=self.user_1.pk,
+            ),
+        )
+        assert_that(Ticket.objects.count(), equal_to(2))
+
+    def test_command_uses_retention_window(self):
+        out = StringIO()
+        call_command('archive_movie_sessions', stdout=out)
+
+        assert_that(
+            out.getvalue(),
+            contains_string('Archived 0 sessions and 0 tickets'),
+        )
+
+    def test_admin_reads_archive(self):
+        archive_movie_sessions(timezone.localdate())
+        self.authenticate(self.superuser)
+
+        response = self.client.get(
+            '/api/archived-tickets/',
+            {'order_number': self.ticket_past.order_number},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    results=contains(
+                        has_entries(
+                            order_number=self.ticket_past.order_number,
+                            customer=self.user_1.email,
+                            movie_session=has_entries(
+                                id=self.movie_session_past.pk,
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        )
+
+    def test_customer_cannot_read_archive(self):
+        self.authenticate(self.user_1)
+
+        response = self.client.get('/api/archived-tickets/')
+        assert_that(response, has_properties(status_code=HTTP_403_FORBIDDEN))
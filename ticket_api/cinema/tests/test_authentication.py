@@ -0,0 +1,105 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_401_UNAUTHORIZED
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class ClaimsAuthenticationTestCase(TicketSetupMixin, APITestCase):
+    def authenticate(self, token_class, user):
+        refresh_token = token_class.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def count_queries(self, token_class, path):
+        self.authenticate(token_class, self.user_1)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        assert_that(response, has_properties(status_code=HTTP_200_OK))
+        return len(context.captured_queries)
+
+    def test_user_info_without_queries(self):
+        self.authenticate(ClaimsRefreshToken, self.user_1)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/user-info/')
+
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    email=self.user_1.email,
+                    is_authenticated=True,
+                ),
+            )
+        )
+
+    def test_saves_user_query_on_user_info(self):
+        stock = self.count_queries(RefreshToken, '/api/user-info/')
+        claims = self.count_queries(ClaimsRefreshToken, '/api/user-info/')
+        assert_that(stock - claims, equal_to(1))
+
+    def test_saves_user_query_on_tickets(self):
+        stock = self.count_queries(RefreshToken, '/api/tickets/')
+        claims = self.count_queries(ClaimsRefreshToken, '/api/tickets/')
+        assert_that(stock - claims, equal_to(1))
+
+    def test_rejects_deactivated_user(self):
+        self.authenticate(ClaimsRefreshToken, self.user_1)
+
+        self.user_1.is_active = False
+        self.user_1.save()
+
+        response = self.client.get('/api/tickets/')
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_403_FORBIDDEN),
+        )
+
+    def test_refresh_renews_claims(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+
+        self.user_1.email = 'user_1_renamed@example.com'
+        self.user_1.save()
+
+        response = self.client.post(
+            '/api/auth/token/refresh/',
+            data={'refresh': str(refresh_token)},
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + response.data['access'],
+        )
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/user-info/')
+        assert_that(
+            response,
+            has_properties(
+                data=has_entries(email='user_1_renamed@example.com'),
+            )
+        )
+
+    def test_refresh_rejects_deactivated_user(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+
+        self.user_1.is_active = False
+        self.user_1.save()
+
+        response = self.client.post(
+            '/api/auth/token/refresh/',
+            data={'refresh': str(refresh_token)},
+        )
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_401_UNAUTHORIZED),
+        )
@@ -0,0 +1,68 @@
+from django.test import TransactionTestCase
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import greater_than
+from hamcrest import none
+
+from ticket_api.cinema.benchmarks import BOOKED
+from ticket_api.cinema.benchmarks import SAME_SEAT
+from ticket_api.cinema.benchmarks import SEAT_NOT_AVAILABLE
+from ticket_api.cinema.benchmarks import SOLD_OUT
+from ticket_api.cinema.benchmarks import UNIFORM
+from ticket_api.cinema.benchmarks import create_customers
+from ticket_api.cinema.benchmarks import create_movie_session
+from ticket_api.cinema.benchmarks import run_booking_benchmark
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import MovieSession
+
+
+class BookingBenchmarkTestCase(TransactionTestCase):
+    def setUp(self):
+        super(BookingBenchmarkTestCase, self).setUp()
+
+        hall = Hall.objects.create(name='Hall', rows_number=10, seats_per_row=10)
+        movie = Movie.objects.create(name='Movie', duration=90)
+        self.movie_session = create_movie_session(hall, movie)
+        self.customer_pks = create_customers(5, 'benchmark')
+
+    def run_benchmark(self, scenario, concurrency=1, **kwargs):
+        return run_booking_benchmark(
+            self.movie_session,
+            self.customer_pks,
+            scenario=scenario,
+            attempts=20,
+            concurrency=concurrency,
+            **kwargs
+        )
+
+    def test_uniform(self):
+        result = self.run_benchmark(UNIFORM)
+
+        assert_that(result.attempts, equal_to(20))
+        assert_that(result.outcomes[BOOKED], greater_than(0))
+        assert_that(result.queries_per_booking, greater_than(0))
+
+    def test_same_seat(self):
+        result = self.run_benchmark(SAME_SEAT)
+
+        assert_that(result.outcomes[BOOKED], equal_to(1))
+        assert_that(result.outcomes[SEAT_NOT_AVAILABLE], equal_to(19))
+        assert_that(result.conflict_rate, equal_to(0.95))
+
+    def test_sold_out(self):
+        result = self.run_benchmark(SOLD_OUT)
+
+        assert_that(result.outcomes[BOOKED], equal_to(1))
+        assert_that(self.movie_session.empty_seats, equal_to(0))
+
+    def test_queued_same_seat(self):
+        result = self.run_benchmark(
+            SAME_SEAT,
+            booking_mode=MovieSession.QUEUED_BOOKING,
+            concurrency=4,
+        )
+
+        assert_that(result.outcomes[BOOKED], equal_to(1))
+        assert_that(result.outcomes[SEAT_NOT_AVAILABLE], equal_to(19))
+        assert_that(result.queries_per_booking, none())
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_item
+from hamcrest import has_properties
+from hamcrest import is_
+from hamcrest import is_not
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_401_UNAUTHORIZED
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.blacklist import BloomFilter
+from ticket_api.cinema.blacklist import RevokedTokenStore
+from ticket_api.cinema.models import RevokedToken
+from ticket_api.cinema.tests.mixins import UserSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class BloomFilterTestCase(TestCase):
+    def test_contains_added(self):
+        bloom_filter = BloomFilter(100)
+        values = [f'jti-{i}' for i in range(100)]
+        for value in values:
+            bloom_filter.add(value)
+
+        for value in values:
+            assert_that(value in bloom_filter, is_(True))
+
+    def test_false_positives_are_rare(self):
+        bloom_filter = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(f'jti-{i}')
+
+        false_positives = sum(
+            f'other-{i}' in bloom_filter
+            for i in range(10000)
+        )
+        assert_that(false_positives < 300, is_(True))
+
+
+class RevokedTokenStoreTestCase(TestCase):
+    def setUp(self):
+        super(RevokedTokenStoreTestCase, self).setUp()
+
+        self.store = RevokedTokenStore()
+        self.expires_at = timezone.now() + timedelta(days=1)
+
+    def test_not_revoked_without_queries(self):
+        self.store.revoke('revoked', self.expires_at)
+
+        with self.assertNumQueries(0):
+            assert_that(self.store.is_revoked('not-revoked'), is_(False))
+
+    def test_revoked(self):
+        self.store.revoke('revoked', self.expires_at)
+
+        assert_that(self.store.is_revoked('revoked'), is_(True))
+
+    def test_revoked_by_other_process(self):
+        RevokedToken.objects.create(jti='revoked', expires_at=self.expires_at)
+
+        assert_that(self.store.is_revoked('revoked'), is_(True))
+
+    def test_second_revocation_fails(self):
+        assert_that(self.store.revoke('revoked', self.expires_at), is_(True))
+        assert_that(self.store.revoke('revoked', self.expires_at), is_(False))
+
+    def test_prune_expired(self):
+        self.store.revoke('expired', timezone.now() - timedelta(seconds=1))
+        self.store.revoke('revoked', self.expires_at)
+
+        assert_that(self.store.prune(), equal_to(1))
+        assert_that(
+            RevokedToken.objects.values_list('jti', flat=True),
+            is_not(has_item('expired')),
+        )
+
+
+class TokenRotationTestCase(UserSetupMixin, APITestCase):
+    def refresh(self, refresh_token):
+        return self.client.post(
+            '/api/auth/token/refresh/',
+            data={'refresh': str(refresh_token)},
+        )
+
+    def test_rotated_token_is_rejected(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+
+        assert_that(
+            self.refresh(refresh_token),
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(refresh=is_not(str(refresh_token))),
+            ),
+        )
+        assert_that(
+            self.refresh(refresh_token),
+            has_properties(status_code=HTTP_401_UNAUTHORIZED),
+        )
+
+    def test_verify_rejects_rotated_token(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+        self.refresh(refresh_token)
+
+        response = self.client.post(
+            '/api/auth/token/verify/',
+            data={'token': str(refresh_token)},
+        )
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_401_UNAUTHORIZED),
+        )
@@ -0,0 +1,175 @@
+from concurrent.futures import Future
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import contains_inanyorder
+from hamcrest import equal_to
+from hamcrest import has_properties
+from hamcrest import instance_of
+from hamcrest import raises
+
+from ticket_api.cinema.benchmarks import create_customers
+from ticket_api.cinema.benchmarks import create_movie_session
+from ticket_api.cinema.booking_queue import BookingQueues
+from ticket_api.cinema.booking_queue import BookingRequest
+from ticket_api.cinema.booking_queue import process_batch
+from ticket_api.cinema.exceptions import BookingQueueBusyError
+from ticket_api.cinema.exceptions import SeatNotAvailableError
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.models import User
+from ticket_api.cinema.tasks import cancel_non_paid_booking
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+
+
+class ProcessBatchTestCase(TicketSetupMixin, TestCase):
+    def request(self, user, row_number, seat_number):
+        return BookingRequest(user, row_number, seat_number, Future())
+
+    def test_books_in_order(self):
+        requests = [
+            self.request(self.user_1, 1, 1),
+            self.request(self.user_2, 1, 1),
+            self.request(self.user_2, 1, 2),
+            self.request(self.user_2, 5, 5),
+        ]
+
+        process_batch(self.movie_session_100_90.pk, requests)
+
+        assert_that(
+            requests[0].future.result(),
+            has_properties(customer=self.user_1, row_number=1, seat_number=1),
+        )
+        assert_that(
+            requests[1].future.exception(),
+            instance_of(SeatNotAvailableError),
+        )
+        assert_that(
+            requests[2].future.result(),
+            has_properties(customer=self.user_2, row_number=1, seat_number=2),
+        )
+        assert_that(
+            requests[3].future.exception(),
+            instance_of(SeatNotAvailableError),
+        )
+        assert_that(
+            Ticket.objects.get(pk=requests[2].future.result().pk),
+            has_properties(customer=self.user_2, row_number=1, seat_number=2),
+        )
+
+    def test_seat_taken_by_another_process(self):
+        requests = [
+            self.request(self.user_1, 1, 1),
+            self.request(self.user_2, 1, 2),
+        ]
+        order_number_generator = Ticket._meta.get_field('order_number').default
+        many = order_number_generator.many
+
+        def take_seat(number):
+            Ticket.objects.create(
+                movie_session=self.movie_session_100_90,
+                customer=self.superuser,
+                row_number=1,
+                seat_number=2,
+                cost=100,
+            )
+            return many(number)
+
+        with patch.object(order_number_generator, 'many', take_seat):
+            process_batch(self.movie_session_100_90.pk, requests)
+
+        assert_that(requests[0].future.result().pk, equal_to(
+            Ticket.objects.get(
+                movie_session=self.movie_session_100_90,
+                row_number=1,
+                seat_number=1,
+            ).pk,
+        ))
+        assert_that(
+            requests[1].future.exception(),
+            instance_of(SeatNotAvailableError),
+        )
+
+    def test_canceled_request_skipped(self):
+        request = self.request(self.user_1, 1, 1)
+        request.future.cancel()
+
+        with self.assertNumQueries(0):
+            process_batch(self.movie_session_100_90.pk, [request])
+
+    def test_queued_book_ticket(self):
+        self.movie_session_100_90.switch(
+            booking_mode=MovieSession.QUEUED_BOOKING,
+        )
+
+        ticket = self.movie_session_100_90.book_ticket(self.user_1, 1, 1)
+
+        assert_that(ticket.pk, equal_to(Ticket.objects.latest('pk').pk))
+        assert_that(
+            calling(self.movie_session_100_90.book_ticket).with_args(
+                self.user_2,
+                1,
+                1,
+            ),
+            raises(SeatNotAvailableError),
+        )
+
+
+class BookingQueuesTestCase(SimpleTestCase):
+    @override_settings(BOOKING_QUEUE_TIMEOUT=timedelta(milliseconds=10))
+    def test_stuck_request_times_out(self):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        booking_queues = BookingQueues()
+
+        with patch.object(booking_queues, 'submit', return_value=future):
+            assert_that(
+                calling(booking_queues.book).with_args(
+                    Mock(pk=1),
+                    None,
+                    1,
+                    1,
+                ),
+                raises(BookingQueueBusyError),
+            )
+
+
+class BookingQueueTestCase(TransactionTestCase):
+    def setUp(self):
+        super(BookingQueueTestCase, self).setUp()
+
+        hall = Hall.objects.create(name='Hall', rows_number=2, seats_per_row=2)
+        movie = Movie.objects.create(name='Movie', duration=90)
+        self.movie_session = create_movie_session(hall, movie)
+        self.movie_session.switch(booking_mode=MovieSession.QUEUED_BOOKING)
+        self.customers = list(
+            User.objects.filter(pk__in=create_customers(8, 'queue'))
+        )
+
+    def book(self, customer):
+        try:
+            return self.movie_session.book_ticket(customer, 1, 1)
+        except SeatNotAvailableError:
+            return None
+
+    def test_concurrent_bookings_of_one_seat(self):
+        with patch.object(cancel_non_paid_booking, 'apply_async'), \
+                ThreadPoolExecutor(8) as executor:
+            tickets = list(executor.map(self.book, self.customers))
+
+        booked = [ticket for ticket in tickets if ticket is not None]
+        assert_that(len(booked), equal_to(1))
+        assert_that(
+            list(Ticket.objects.values_list('pk', flat=True)),
+            contains_inanyorder(booked[0].pk),
+        )
@@ -0,0 +1,214 @@
+from datetime import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import transaction
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import contains_inanyorder
+from hamcrest import contains_string
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import raises
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_204_NO_CONTENT
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.exceptions import TicketCodeRevokedError
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tasks import cancel_non_paid_bookings
+from ticket_api.cinema.tasks import send_notifications
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tests.utils import run_on_commit
+from ticket_api.cinema.ticket_codes import make_ticket_code
+from ticket_api.cinema.ticket_codes import revoked_ticket_codes
+from ticket_api.cinema.ticket_codes import verify_ticket_code
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class BulkOperationsTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(BulkOperationsTestCase, self).setUp()
+        self.authenticate(self.superuser)
+
+        self.ticket_100_90_paid = self.movie_session_100_90.book_ticket(
+            self.user_2,
+            row_number=1,
+            seat_number=1,
+        )
+        self.ticket_100_90_paid.make_payment()
+        self.movie_session_400_90 = MovieSession.objects.create(
+            hall=self.hall_400,
+            movie=self.movie_90,
+            date=(timezone.now() + timedelta(days=2)).date(),
+            starts_at=time(10),
+            ticket_cost=120,
+        )
+        self.movie_session_400_90.book_ticket(
+            self.user_2,
+            row_number=5,
+            seat_number=5,
+        )
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def post(self, url, data=None):
+        cancel_patcher = patch.object(cancel_non_paid_bookings, 'apply_async')
+        with patch.object(transaction, 'on_commit', run_on_commit), \
+                patch.object(send_notifications, 'delay') as notify, \
+                cancel_patcher as cancel:
+            response = self.client.post(url, data, format='json')
+        return response, notify, cancel
+
+    def test_cancels_unpaid_tickets(self):
+        response, notify, _ = self.post(
+            self.movie_session_100_90_url + 'cancel_unpaid_tickets/',
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(canceled=1),
+            ),
+        )
+        assert_that(
+            list(self.movie_session_100_90.tickets.all()),
+            equal_to([self.ticket_100_90_paid]),
+        )
+
+        [(messages,), _] = notify.call_args
+        assert_that(
+            messages,
+            equal_to([(
+                'Booking canceled',
+                f'Your booking of {self.movie_session_100_90} '
+                f'(row 5, seat 5) was canceled.',
+                'user_1@example.com',
+            )]),
+        )
+
+    def test_moves_tickets(self):
+        revoked_ticket_codes.invalidate()
+        code = make_ticket_code(self.ticket_100_90_paid)
+
+        response, notify, cancel = self.post(
+            self.movie_session_100_90_url + 'move_tickets/',
+            {'movie_session': self.movie_session_400_90.pk},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(moved=2),
+            ),
+        )
+        assert_that(
+            self.movie_session_400_90.tickets.filter(customer=self.user_1)
+            .values_list('row_number', 'seat_number', 'paid_at')
+            .get(),
+            # Seat is taken in the target, so the closest to center is given
+            equal_to((10, 10, None)),
+        )
+        self.ticket_100_90_paid.refresh_from_db()
+        assert_that(
+            self.ticket_100_90_paid,
+            has_properties(
+                movie_session_id=self.movie_session_400_90.pk,
+                row_number=1,
+                seat_number=1,
+            ),
+        )
+
+        cancel.assert_called_once_with(
+            (
+                [self.ticket_100_90.pk],
+                self.movie_session_400_90.pk,
+                self.movie_session_400_90.auto_cancelation_dt,
+            ),
+            eta=self.movie_session_400_90.auto_cancelation_dt,
+        )
+        [(messages,), _] = notify.call_args
+        assert_that(
+            [message[2] for message in messages],
+            contains_inanyorder('user_1@example.com', 'user_2@example.com'),
+        )
+        assert_that(messages[0][1], contains_string('moved to'))
+
+        # Code names the old session
+        assert_that(
+            calling(verify_ticket_code).with_args(
+                code,
+                self.movie_session_100_90.starts_at_dt.timestamp(),
+            ),
+            raises(TicketCodeRevokedError),
+        )
+
+        response = self.client.delete(self.movie_session_100_90_url)
+        assert_that(response.status_code, equal_to(HTTP_204_NO_CONTENT))
+
+    def test_moves_tickets_in_few_queries(self):
+        with self.assertNumQueries(11):
+            self.post(
+                self.movie_session_100_90_url + 'move_tickets/',
+                {'movie_session': self.movie_session_400_90.pk},
+            )
+
+    def test_rejects_session_of_another_movie(self):
+        response, _, _ = self.post(
+            self.movie_session_100_90_url + 'move_tickets/',
+            {'movie_session': self.movie_session_400_120.pk},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(
+                    detail=has_properties(code='incompatible_movie_session'),
+                ),
+            ),
+        )
+
+    def test_rejects_session_without_enough_seats(self):
+        hall = Hall.objects.create(
+            name='Hall 1',
+            rows_number=1,
+            seats_per_row=1,
+        )
+        movie_session = MovieSession.objects.create(
+            hall=hall,
+            movie=self.movie_90,
+            date=(timezone.now() + timedelta(days=2)).date(),
+            starts_at=time(10),
+            ticket_cost=120,
+        )
+
+        response, _, _ = self.post(
+            self.movie_session_100_90_url + 'move_tickets/',
+            {'movie_session': movie_session.pk},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(
+                    detail=has_properties(code='no_suitable_seats'),
+                ),
+            ),
+        )
+        assert_that(self.movie_session_100_90.tickets.count(), equal_to(2))
+
+    def test_bulk_operations_are_staff_only(self):
+        self.authenticate(self.user_1)
+
+        for action in ('cancel_unpaid_tickets/', 'move_tickets/'):
+            response, _, _ = self.post(self.movie_session_100_90_url + action)
+            assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
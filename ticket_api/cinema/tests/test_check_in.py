@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import none
+from hamcrest import not_none
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.status import HTTP_404_NOT_FOUND
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+CHECK_IN_URL = '/api/tickets/check_in/'
+
+
+class CheckInTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(CheckInTestCase, self).setUp()
+        self.authenticate(self.superuser)
+        self.ticket_100_90.make_payment()
+        self.open_entry(self.movie_session_100_90)
+
+    def open_entry(self, movie_session, starts_in=timedelta(minutes=10)):
+        MovieSession.objects.filter(pk=movie_session.pk).update(
+            starts_at_dt=timezone.now() + starts_in,
+        )
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def check_in(self, order_number, **kwargs):
+        return self.client.post(
+            CHECK_IN_URL,
+            dict(order_number=order_number, **kwargs),
+            format='json',
+        )
+
+    def assert_rejected(self, response, code):
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(detail=has_properties(code=code)),
+            ),
+        )
+
+    def test_checks_in_with_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.check_in(self.ticket_100_90.order_number)
+
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    order_number=self.ticket_100_90.order_number,
+                    checked_in_at=not_none(),
+                ),
+            ),
+        )
+        self.ticket_100_90.refresh_from_db()
+        assert_that(self.ticket_100_90.checked_in_at, not_none())
+
+    def test_rejects_second_scan(self):
+        self.check_in(self.ticket_100_90.order_number)
+
+        response = self.check_in(self.ticket_100_90.order_number)
+        self.assert_rejected(response, 'ticket_already_checked_in')
+
+    def test_rejects_unpaid_ticket(self):
+        self.open_entry(self.movie_session_400_120)
+
+        response = self.check_in(self.ticket_400_120.order_number)
+        self.assert_rejected(response, 'ticket_not_paid')
+
+    def test_admits_to_given_session_only(self):
+        response = self.check_in(
+            self.ticket_100_90.order_number,
+            movie_session=self.movie_session_400_120.pk,
+        )
+        self.assert_rejected(response, 'other_movie_session')
+
+        response = self.check_in(
+            self.ticket_100_90.order_number,
+            movie_session=self.movie_session_100_90.pk,
+        )
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_rejects_ticket_outside_entry_window(self):
+        for starts_in in (timedelta(hours=2), -timedelta(hours=1)):
+            self.open_entry(self.movie_session_100_90, starts_in)
+
+            response = self.check_in(self.ticket_100_90.order_number)
+            self.assert_rejected(response, 'entry_closed')
+
+        self.ticket_100_90.refresh_from_db()
+        assert_that(self.ticket_100_90.checked_in_at, none())
+
+    def test_rejects_unknown_ticket(self):
+        response = self.check_in('XXXX00000000')
+        assert_that(response.status_code, equal_to(HTTP_404_NOT_FOUND))
+
+        response = self.check_in('')
+        assert_that(response.status_code, equal_to(HTTP_400_BAD_REQUEST))
+
+    def test_check_in_is_staff_only(self):
+        self.authenticate(self.user_1)
+
+        response = self.check_in(self.ticket_100_90.order_number)
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
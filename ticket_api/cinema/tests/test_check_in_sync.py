@@ -0,0 +1,258 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_key
+from hamcrest import has_properties
+from hamcrest import is_not
+from hamcrest import none
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.check_ins import seat_bitmap
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+MANIFEST_URL = '/api/movie-sessions/manifest/'
+SYNC_URL = '/api/tickets/check_in/sync/'
+
+
+class SeatBitmapTestCase(SimpleTestCase):
+    def test_sets_bits_row_by_row(self):
+        assert_that(seat_bitmap(2, 4, [(1, 1), (2, 4)]), equal_to('gQ=='))
+
+    def test_empty_hall(self):
+        assert_that(seat_bitmap(3, 3, []), equal_to('AAA='))
+
+
+class CheckInSyncTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(CheckInSyncTestCase, self).setUp()
+        refresh_token = ClaimsRefreshToken.for_user(self.superuser)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+        self.ticket_100_90.make_payment()
+        self.unpaid_ticket = self.movie_session_100_90.book_ticket(
+            self.user_2,
+            row_number=1,
+            seat_number=1,
+        )
+        # Session of today still open for booking, as its start isn't moved
+        MovieSession.objects.filter(pk=self.movie_session_100_90.pk).update(
+            date=timezone.localdate(),
+        )
+
+    def open_entry(self, starts_in=timedelta(minutes=10)):
+        MovieSession.objects.filter(pk=self.movie_session_100_90.pk).update(
+            starts_at_dt=timezone.now() + starts_in,
+        )
+
+    def get_manifests(self, versions=None, since=None):
+        params = {}
+        if versions is not None:
+            params.update(versions=versions, since=since.isoformat())
+        response = self.client.get(MANIFEST_URL, params)
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+        self.synced_at = response.data['synced_at']
+        return response.data['movie_sessions']
+
+    def sync(self, *events):
+        return self.client.post(SYNC_URL, {'events': events}, format='json')
+
+    def event(self, ticket, checked_in_at, **kwargs):
+        return dict(
+            order_number=ticket.order_number,
+            checked_in_at=checked_in_at.isoformat(),
+            **kwargs
+        )
+
+    def test_lists_paid_tickets_of_today_sessions(self):
+        with self.assertNumQueries(2):
+            manifests = self.get_manifests()
+
+        assert_that(
+            manifests,
+            contains(
+                has_entries(
+                    movie_session=self.movie_session_100_90.pk,
+                    version=0,
+                    delta=False,
+                    rows_number=10,
+                    seats_per_row=10,
+                    order_numbers=[self.ticket_100_90.order_number],
+                    seats=seat_bitmap(10, 10, [(5, 5)]),
+                    checked_in=seat_bitmap(10, 10, []),
+                ),
+            ),
+        )
+
+    def test_refreshes_changed_tickets_only(self):
+        [manifest] = self.get_manifests()
+        versions = f'{manifest["movie_session"]}:{manifest["version"]}'
+        # Past the overlap of changes, as if the download was a while ago
+        since = self.synced_at + settings.CHECK_IN_MANIFEST_OVERLAP
+
+        with self.assertNumQueries(2):
+            [manifest] = self.get_manifests(versions, since)
+        assert_that(manifest, is_not(has_key('order_numbers')))
+
+        # Late payment and check in are sent as a delta, session row is
+        # left alone
+        self.unpaid_ticket.make_payment()
+        self.open_entry()
+        self.sync(self.event(self.unpaid_ticket, timezone.now()))
+
+        [manifest] = self.get_manifests(versions, since)
+        assert_that(
+            manifest,
+            has_entries(
+                version=0,
+                delta=True,
+                order_numbers=[self.unpaid_ticket.order_number],
+                seats=seat_bitmap(10, 10, [(1, 1)]),
+                checked_in=seat_bitmap(10, 10, [(1, 1)]),
+            ),
+        )
+
+    def test_sends_moved_from_session_in_full(self):
+        [manifest] = self.get_manifests()
+        versions = f'{manifest["movie_session"]}:{manifest["version"]}'
+        since = self.synced_at + settings.CHECK_IN_MANIFEST_OVERLAP
+        MovieSession.objects.filter(
+            pk=self.movie_session_100_90.pk,
+        ).bump_manifest_version()
+
+        [manifest] = self.get_manifests(versions, since)
+        assert_that(
+            manifest,
+            has_entries(
+                version=1,
+                delta=False,
+                order_numbers=[self.ticket_100_90.order_number],
+            ),
+        )
+
+    def test_checks_in_synced_events(self):
+        self.open_entry()
+        checked_in_at = timezone.now() - timedelta(minutes=5)
+
+        response = self.sync(
+            self.event(self.ticket_100_90, checked_in_at),
+            self.event(self.unpaid_ticket, checked_in_at),
+            {
+                'order_number': 'XXXX00000000',
+                'checked_in_at': checked_in_at.isoformat(),
+            },
+            self.event(
+                self.ticket_100_90,
+                checked_in_at,
+                movie_session=self.movie_session_400_120.pk,
+            ),
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=contains(
+                    has_entries(status='checked_in'),
+                    has_entries(
+                        status='ticket_not_paid',
+                        checked_in_at=none(),
+                    ),
+                    has_entries(status='not_found'),
+                    has_entries(status='other_movie_session'),
+                ),
+            ),
+        )
+        self.ticket_100_90.refresh_from_db()
+        assert_that(self.ticket_100_90.checked_in_at, equal_to(checked_in_at))
+
+        [manifest] = self.get_manifests()
+        assert_that(
+            manifest,
+            has_entries(checked_in=seat_bitmap(10, 10, [(5, 5)])),
+        )
+
+    def test_earliest_scan_wins(self):
+        self.open_entry()
+        later = timezone.now() - timedelta(minutes=1)
+        earlier = later - timedelta(minutes=1)
+        first = self.sync(self.event(self.ticket_100_90, later))
+        assert_that(first.data, contains(has_entries(status='checked_in')))
+
+        second = self.sync(
+            self.event(self.ticket_100_90, earlier),
+            self.event(self.ticket_100_90, later),
+        )
+        assert_that(
+            second.data,
+            contains(
+                has_entries(status='checked_in'),
+                has_entries(
+                    status='ticket_already_checked_in',
+                    checked_in_at=timezone.localtime(earlier).isoformat(),
+                ),
+            ),
+        )
+
+        # Batch sent again gets the same results
+        again = self.sync(self.event(self.ticket_100_90, earlier))
+        assert_that(again.data, contains(has_entries(status='checked_in')))
+
+    def test_scans_from_future_count_as_made_now(self):
+        self.open_entry()
+        self.sync(
+            self.event(self.ticket_100_90, timezone.now() + timedelta(days=1)),
+        )
+        self.ticket_100_90.refresh_from_db()
+        assert_that(
+            self.ticket_100_90.checked_in_at <= timezone.now(),
+            equal_to(True),
+        )
+
+    def test_rejects_scans_outside_entry_window(self):
+        # Session of another day, scanned at this door by mistake
+        self.open_entry(timedelta(days=1))
+        later = self.sync(self.event(self.ticket_100_90, timezone.now()))
+
+        self.open_entry(-timedelta(hours=1))
+        late = self.sync(self.event(self.ticket_100_90, timezone.now()))
+
+        for response in (later, late):
+            assert_that(
+                response.data,
+                contains(
+                    has_entries(status='entry_closed', checked_in_at=none()),
+                ),
+            )
+        self.ticket_100_90.refresh_from_db()
+        assert_that(self.ticket_100_90.checked_in_at, none())
+
+    def test_validates_request(self):
+        response = self.client.get(MANIFEST_URL, {'versions': '1:2:3'})
+        assert_that(response.status_code, equal_to(HTTP_400_BAD_REQUEST))
+
+        response = self.sync()
+        assert_that(response.status_code, equal_to(HTTP_400_BAD_REQUEST))
+
+    def test_sync_is_staff_only(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+        response = self.client.get(MANIFEST_URL)
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+        response = self.sync(self.event(self.ticket_100_90, timezone.now()))
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import empty
+from hamcrest import has_properties
+
+from ticket_api.cinema.checks import check_shared_caches
+
+MEMCACHED = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': 'memcached:11211',
+    },
+}
+
+
+class SharedCachesCheckTestCase(SimpleTestCase):
+    def test_warns_of_process_local_caches(self):
+        assert_that(
+            check_shared_caches(None),
+            contains(
+                has_properties(id='cinema.W001'),
+                has_properties(id='cinema.W001'),
+                has_properties(id='cinema.W001'),
+            ),
+        )
+
+    @override_settings(CACHES=MEMCACHED)
+    def test_shared_caches(self):
+        assert_that(check_shared_caches(None), empty())
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import is_
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class ExportTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(ExportTestCase, self).setUp()
+        self.authenticate(self.superuser)
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def read_csv(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def read_ndjson(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_exports_tickets_as_csv(self):
+        response = self.client.get('/api/tickets/export.csv/')
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                streaming=True,
+            ),
+        )
+        assert_that(
+            response['Content-Type'],
+            equal_to('text/csv; charset=utf-8'),
+        )
+        assert_that(
+            response['Content-Disposition'],
+            equal_to('attachment; filename="tickets.csv"'),
+        )
+        assert_that(
+            self.read_csv(response),
+            contains(
+                has_entries(
+                    id=str(self.ticket_100_90.pk),
+                    order_number=self.ticket_100_90.order_number,
+                    movie_session=str(self.movie_session_100_90.pk),
+                    movie=self.movie_session_100_90.movie.name,
+                    hall=self.movie_session_100_90.hall.name,
+                    customer='user_1@example.com',
+                    row_number='5',
+                    seat_number='5',
+                    cost=self.movie_session_100_90_cost_str,
+                    paid_at='',
+                ),
+                has_entries(
+                    id=str(self.ticket_400_120.pk),
+                    cost=self.movie_session_400_120_cost_str,
+                ),
+            ),
+        )
+
+    def test_exports_tickets_as_ndjson(self):
+        response = self.client.get(
+            '/api/tickets/export.ndjson/',
+            {'movie_session': self.movie_session_400_120.pk},
+        )
+        assert_that(response['Content-Type'], equal_to('application/x-ndjson'))
+        assert_that(
+            self.read_ndjson(response),
+            contains(
+                has_entries(
+                    id=self.ticket_400_120.pk,
+                    customer='user_1@example.com',
+                    row_number=10,
+                    cost=self.movie_session_400_120_cost_str,
+                    paid_at=None,
+                ),
+            ),
+        )
+
+    def test_filters_tickets_by_paid_state(self):
+        self.ticket_100_90.paid_at = timezone.now()
+        self.ticket_100_90.save()
+
+        response = self.client.get(
+            '/api/tickets/export.csv/',
+            {'paid_at__isnull': 'false'},
+        )
+        assert_that(
+            self.read_csv(response),
+            contains(has_entries(id=str(self.ticket_100_90.pk))),
+        )
+
+    def test_exports_tickets_with_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tickets/export.csv/')
+            rows = self.read_csv(response)
+
+        assert_that(len(rows), equal_to(2))
+        assert_that(len(queries), equal_to(1))
+
+    def test_exports_movie_sessions(self):
+        response = self.client.get(
+            '/api/movie-sessions/export.ndjson/',
+            {'movie': self.movie_session_400_120.movie.pk},
+        )
+        assert_that(
+            self.read_ndjson(response),
+            contains(
+                has_entries(
+                    id=self.movie_session_400_120.pk,
+                    movie=self.movie_session_400_120.movie.name,
+                    ticket_cost=self.movie_session_400_120_cost_str,
+                    booked_seats=1,
+                    booking_mode='direct',
+                ),
+            ),
+        )
+
+    def test_exports_are_staff_only(self):
+        self.authenticate(self.user_1)
+
+        for url in (
+                '/api/tickets/export.csv/',
+                '/api/movie-sessions/export.csv/',
+        ):
+            response = self.client.get(url)
+            assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+            assert_that(response.streaming, is_(False))
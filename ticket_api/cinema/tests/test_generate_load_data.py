@@ -0,0 +1,94 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.test import TestCase
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import equal_to
+from hamcrest import greater_than
+from hamcrest import raises
+
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.models import User
+
+
+class GenerateLoadDataTestCase(TestCase):
+    def setUp(self):
+        super(GenerateLoadDataTestCase, self).setUp()
+
+        Hall.objects.create(name='Hall 1', rows_number=5, seats_per_row=10)
+        Hall.objects.create(name='Hall 2', rows_number=8, seats_per_row=12)
+
+    def generate(self, seed, **options):
+        call_command(
+            'generate_load_data',
+            seed=seed,
+            users=20,
+            movies=5,
+            days=2,
+            stdout=StringIO(),
+            **options
+        )
+
+    def test_generates_valid_data(self):
+        self.generate(seed=0, start_date=date(2031, 1, 1))
+
+        assert_that(User.objects.count(), equal_to(20))
+        assert_that(Ticket.objects.count(), greater_than(0))
+        for movie_session in MovieSession.objects.all():
+            movie_session.clean()
+
+    def test_is_deterministic(self):
+        self.generate(seed=0)
+        tickets = list(
+            Ticket.objects.order_by('order_number')
+            .values_list('order_number', 'row_number', 'seat_number')
+        )
+        Ticket.objects.all().delete()
+        MovieSession.objects.all().delete()
+
+        self.generate(seed=0)
+
+        assert_that(
+            list(
+                Ticket.objects.order_by('order_number')
+                .values_list('order_number', 'row_number', 'seat_number')
+            ),
+            equal_to(tickets),
+        )
+
+    def test_refuses_to_generate_twice(self):
+        self.generate(seed=1)
+
+        assert_that(
+            calling(self.generate).with_args(seed=1),
+            raises(CommandError),
+        )
+
+    def test_seeds_get_own_sessions(self):
+        self.generate(seed=0)
+        self.generate(seed=1)
+
+        for prefix in ('AAAA', 'BAAA'):
+            assert_that(
+                MovieSession.objects.filter(
+                    tickets__order_number__startswith=prefix,
+                ).distinct().count(),
+                greater_than(0),
+            )
+
+    def test_prefixes_order_numbers_by_seed(self):
+        self.generate(seed=26 ** 3)
+
+        assert_that(
+            Ticket.objects.exclude(order_number__startswith='AAAB').exists(),
+            equal_to(False),
+        )
+        assert_that(
+            calling(self.generate).with_args(seed=26 ** 4),
+            raises(CommandError),
+        )
@@ -0,0 +1,154 @@
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.test import TestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import is_
+from hamcrest import raises
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_429_TOO_MANY_REQUESTS
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.exceptions import PasswordHashingOverloadedError
+from ticket_api.cinema.hashing import PasswordHashingService
+from ticket_api.cinema.hashing import password_hashing
+from ticket_api.cinema.models import User
+from ticket_api.cinema.tests.mixins import UserSetupMixin
+from ticket_api.cinema.throttling import LoginEmailThrottle
+
+
+class PasswordHashingServiceTestCase(TestCase):
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_hashing_in_pool(self):
+        service = PasswordHashingService()
+        encoded = service.make_password('secret')
+
+        assert_that(service.check_password('secret', encoded), is_(True))
+        assert_that(service.check_password('wrong', encoded), is_(False))
+
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=0)
+    def test_rejects_when_saturated(self):
+        service = PasswordHashingService()
+
+        assert_that(
+            calling(service.make_password).with_args('secret'),
+            raises(PasswordHashingOverloadedError),
+        )
+        assert_that(service.stats(), has_entries(rejected_total=1))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_timed_out_hash_stays_pending(self):
+        service = PasswordHashingService()
+        future = Future()
+        with patch.object(service, '_get_executor') as get_executor, \
+                override_settings(PASSWORD_HASHING_TIMEOUT=timedelta()):
+            get_executor.return_value.submit.return_value = future
+            future.set_running_or_notify_cancel()
+
+            assert_that(
+                calling(service.make_password).with_args('secret'),
+                raises(PasswordHashingOverloadedError),
+            )
+            assert_that(
+                service.stats(),
+                has_entries(pending=1, timed_out_total=1, completed_total=0),
+            )
+
+        future.set_result('encoded')
+        assert_that(
+            service.stats(),
+            has_entries(pending=0, completed_total=1),
+        )
+
+    @override_settings(PASSWORD_HASHING_WORKERS=0)
+    def test_counts_failures(self):
+        service = PasswordHashingService()
+
+        with patch.object(hashers, 'make_password', side_effect=ValueError):
+            assert_that(
+                calling(service.make_password).with_args('secret'),
+                raises(ValueError),
+            )
+        assert_that(
+            service.stats(),
+            has_entries(pending=0, failed_total=1, completed_total=0),
+        )
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class LoginTestCase(UserSetupMixin, APITestCase):
+    def setUp(self):
+        super(LoginTestCase, self).setUp()
+
+        # Throttles keep their history in the cache
+        cache.clear()
+
+    def obtain_token(self, password):
+        return self.client.post(
+            '/api/auth/token/',
+            data={
+                'email': self.superuser.email,
+                'password': password,
+            },
+        )
+
+    def test_obtain_token(self):
+        response = self.obtain_token(self.superuser_password)
+        assert_that(response, has_properties(status_code=HTTP_200_OK))
+
+    @override_settings(PASSWORD_HASHING_MAX_PENDING=0)
+    def test_rejects_login_when_saturated(self):
+        response = self.obtain_token(self.superuser_password)
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_503_SERVICE_UNAVAILABLE),
+        )
+
+    def test_throttles_retries_before_hashing(self):
+        with patch.object(LoginEmailThrottle, 'rate', '2/min', create=True), \
+                patch.object(password_hashing, 'check_password') as check:
+            check.return_value = False
+            self.obtain_token('wrong')
+            self.obtain_token('wrong')
+            response = self.obtain_token('wrong')
+
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_429_TOO_MANY_REQUESTS),
+        )
+        assert_that(check.call_count, is_(2))
+
+    def test_rejects_non_string_email(self):
+        for data in ({'email': ['a@example.com'], 'password': 'x'}, [1]):
+            response = self.client.post(
+                '/api/auth/token/',
+                data=data,
+                format='json',
+            )
+            assert_that(
+                response,
+                has_properties(status_code=HTTP_400_BAD_REQUEST),
+            )
+
+    def test_registration(self):
+        response = self.client.post(
+            '/api/auth/register/',
+            data={
+                'email': 'new_user@example.com',
+                'password1': self.user_password,
+                'password2': self.user_password,
+            },
+        )
+        assert_that(response, has_properties(status_code=302))
+
+        user = User.objects.get(email='new_user@example.com')
+        assert_that(user.check_password(self.user_password), is_(True))
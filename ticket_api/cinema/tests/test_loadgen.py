@@ -0,0 +1,162 @@
+import json
+import os
+import random
+import tempfile
+from functools import partial
+from unittest.mock import patch
+
+from django.test import LiveServerTestCase
+from django.test import SimpleTestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_item
+from hamcrest import has_key
+from hamcrest import is_not
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.benchmarks import create_customers
+from ticket_api.cinema.benchmarks import create_movie_session
+from ticket_api.cinema.loadgen import LoadClient
+from ticket_api.cinema.loadgen import TrafficRecord
+from ticket_api.cinema.loadgen import get_endpoint
+from ticket_api.cinema.loadgen import premiere_visit
+from ticket_api.cinema.loadgen import read_traffic
+from ticket_api.cinema.loadgen import replay
+from ticket_api.cinema.loadgen import run_load
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import Movie
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tasks import cancel_non_paid_booking
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class EndpointTestCase(SimpleTestCase):
+    def test_strips_ids_and_query(self):
+        assert_that(
+            get_endpoint('POST', '/api/movie-sessions/12/book_ticket/?a=1'),
+            equal_to('POST /api/movie-sessions/{id}/book_ticket/'),
+        )
+
+
+class LoadGeneratorTestCase(LiveServerTestCase):
+    def setUp(self):
+        super(LoadGeneratorTestCase, self).setUp()
+
+        hall = Hall.objects.create(name='Hall', rows_number=5, seats_per_row=5)
+        movie = Movie.objects.create(name='Movie', duration=90)
+        self.movie_session = create_movie_session(hall, movie)
+        self.customer_pks = create_customers(3, 'load')
+
+        patcher = patch.object(cancel_non_paid_booking, 'apply_async')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_premiere_night(self):
+        rnd = random.Random(0)
+        tasks = [
+            partial(
+                premiere_visit,
+                user_pk=self.customer_pks[i % 3],
+                movie_session_pk=self.movie_session.pk,
+                rnd=rnd,
+            )
+            for i in range(5)
+        ]
+
+        report = run_load(LoadClient(self.live_server_url), tasks, 1)
+
+        endpoint = 'POST /api/movie-sessions/{id}/book_ticket/'
+        assert_that(report.statuses[endpoint][200], equal_to(5))
+        assert_that(Ticket.objects.count(), equal_to(5))
+        assert_that(report.report(), is_not(equal_to('')))
+
+    def test_replays_traffic(self):
+        lines = [
+            json.dumps({
+                'method': 'POST',
+                'path': f'/api/movie-sessions/{self.movie_session.pk}'
+                        f'/book_ticket/',
+                'body': {'row_number': 1, 'seat_number': 1},
+                'user': self.customer_pks[0],
+            }),
+            json.dumps({'method': 'GET', 'path': '/api/tickets/'}),
+        ]
+        tasks = [
+            partial(replay, record=record)
+            for record in read_traffic(lines * 2)
+        ]
+
+        report = run_load(LoadClient(self.live_server_url), tasks, 1)
+
+        booking = 'POST /api/movie-sessions/{id}/book_ticket/'
+        assert_that(report.statuses[booking][200], equal_to(1))
+        assert_that(report.errors(booking)[422], equal_to(1))
+        assert_that(report.errors('GET /api/tickets/')[403], equal_to(2))
+
+
+class TrafficCaptureTestCase(TicketSetupMixin, APITestCase):
+    def capture(self, request):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.jsonl')
+            with override_settings(
+                    TRAFFIC_CAPTURE_FILE=path,
+                    TRAFFIC_CAPTURE_SAMPLE_RATE=1.0,
+            ):
+                request()
+            with open(path) as file:
+                return [json.loads(line) for line in file]
+
+    def test_captures_token_user_request(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+        records = self.capture(
+            lambda: self.client.post(
+                self.movie_session_100_90_url + 'book_ticket/',
+                data={'row_number': 3, 'seat_number': 3},
+                format='json',
+            ),
+        )
+
+        assert_that(
+            records,
+            has_item(
+                has_entries(
+                    method='POST',
+                    path=self.movie_session_100_90_url + 'book_ticket/',
+                    body={'row_number': 3, 'seat_number': 3},
+                    user=self.user_1.pk,
+                ),
+            ),
+        )
+        assert_that(
+            list(read_traffic(json.dumps(record) for record in records)),
+            has_item(
+                TrafficRecord(
+                    method='POST',
+                    path=self.movie_session_100_90_url + 'book_ticket/',
+                    body={'row_number': 3, 'seat_number': 3},
+                    user=self.user_1.pk,
+                ),
+            ),
+        )
+
+    def test_redacts_secrets(self):
+        records = self.capture(
+            lambda: self.client.post(
+                '/api/auth/token/',
+                data={'email': 'user@example.com', 'password': 'secret'},
+                format='json',
+            ),
+        )
+
+        assert_that(
+            records[0],
+            has_entries(body=has_entries(password='***'), user=None),
+        )
+        assert_that(records[0], has_key('status'))
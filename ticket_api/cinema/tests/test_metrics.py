@@ -0,0 +1,148 @@
+import json
+import os
+import socket
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import contains_inanyorder
+from hamcrest import contains_string
+from hamcrest import equal_to
+from hamcrest import has_properties
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ticket_api.cinema.metrics import MetricsRegistry
+from ticket_api.cinema.metrics import registry
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+
+
+class MetricsRegistryTestCase(SimpleTestCase):
+    def test_aggregates_processes(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            with open(os.path.join(directory, '1-other.json'), 'w') as file:
+                json.dump([['requests_total', [['view', 'a']], 2.0]], file)
+
+            own = MetricsRegistry()
+            own.add('requests_total', {'view': 'a'}, 3)
+            own.flush(force=True)
+
+            other = MetricsRegistry()
+            other.add('requests_total', {'view': 'a'}, 1)
+
+            assert_that(
+                other.collect()[('requests_total', (('view', 'a'),))],
+                equal_to(6.0),
+            )
+
+    def test_merges_files_of_finished_processes(self):
+        host = socket.gethostname()
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory), \
+                patch('ticket_api.cinema.metrics._is_alive') as is_alive:
+            is_alive.side_effect = lambda pid: pid == 2
+            for pid in (1, 2, 3):
+                with open(
+                        os.path.join(directory, f'{host}-{pid}-x.json'),
+                        'w',
+                ) as file:
+                    json.dump([['requests_total', [], 1.0]], file)
+            with open(os.path.join(directory, 'other-1-x.json'), 'w') as file:
+                json.dump([['requests_total', [], 1.0]], file)
+
+            registry = MetricsRegistry()
+            for _ in range(2):
+                assert_that(
+                    registry.collect()[('requests_total', ())],
+                    equal_to(4.0),
+                )
+
+            assert_that(
+                [
+                    file_name for file_name in os.listdir(directory)
+                    if file_name.endswith('.json')
+                ],
+                contains_inanyorder(
+                    'finished.json',
+                    f'{host}-2-x.json',
+                    'other-1-x.json',
+                ),
+            )
+
+
+class MetricsAPITestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(MetricsAPITestCase, self).setUp()
+
+        refresh_token = RefreshToken.for_user(self.user_1)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_exports_view_metrics(self):
+        self.client.get('/api/tickets/')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer secret')
+        response = self.client.get('/metrics')
+        assert_that(response, has_properties(status_code=HTTP_200_OK))
+
+        content = response.content.decode()
+        assert_that(
+            content,
+            contains_string(
+                'http_requests_total'
+                '{method="GET",status="200",view="ticket:list"}'
+            ),
+        )
+        assert_that(
+            content,
+            contains_string(
+                'http_request_duration_seconds_bucket'
+                '{le="+Inf",view="ticket:list"}'
+            ),
+        )
+        assert_that(
+            content,
+            contains_string('db_queries_total{view="ticket:list"}'),
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_token_or_staff(self):
+        response = self.client.get('/metrics')
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong')
+        response = self.client.get('/metrics')
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+
+        self.client.credentials()
+        self.client.force_login(self.superuser)
+        response = self.client.get('/metrics')
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_counts_booking_outcomes(self):
+        booked = ('booking_outcomes_total', (('outcome', 'booked'),))
+        not_available = (
+            'booking_outcomes_total',
+            (('outcome', 'seat_not_available'),),
+        )
+        before = registry.collect()
+
+        for _ in range(2):
+            self.client.post(
+                self.movie_session_100_90_url + 'book_ticket/',
+                data={'row_number': 3, 'seat_number': 3},
+            )
+
+        after = registry.collect()
+        assert_that(after[booked] - before[booked], equal_to(1))
+        assert_that(
+            after[not_available] - before[not_available],
+            equal_to(1),
+        )
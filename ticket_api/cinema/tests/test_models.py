@@ -1,11 +1,16 @@
 from contextlib import ExitStack
+from datetime import date
+from datetime import datetime
+from datetime import time
 from unittest.mock import patch
 
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.utils.timezone import utc
 from hamcrest import assert_that
 from hamcrest import calling
+from hamcrest import equal_to
 from hamcrest import raises
 
 from ticket_api.cinema.exceptions import AttemptsIsOverError
@@ -170,3 +175,20 @@ class PaymentTestCase(TicketSetupMixin, TestCase):
             calling(ticket.make_payment),
             raises(NoBookingAvailableError),
         )
+
+
+class MovieSessionStartTestCase(MovieSessionSetupMixin, TestCase):
+    def test_start_is_local_to_cinema(self):
+        movie_session = self.movie_session_100_90
+        movie_session.date = date(2030, 1, 1)
+        movie_session.starts_at = time(12)
+        movie_session.save()
+
+        assert_that(
+            movie_session.starts_at_dt,
+            equal_to(datetime(2030, 1, 1, 9, tzinfo=utc)),
+        )
+        assert_that(
+            movie_session.auto_cancelation_dt,
+            equal_to(datetime(2030, 1, 1, 7, tzinfo=utc)),
+        )
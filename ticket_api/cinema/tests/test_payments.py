@@ -0,0 +1,219 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import is_
+from hamcrest import none
+from hamcrest import not_none
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+PAY_URL = '/api/tickets/pay/'
+
+
+class BatchPaymentTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(BatchPaymentTestCase, self).setUp()
+        self.authenticate(self.user_1)
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def test_pays_tickets_by_ids_and_order_numbers(self):
+        response = self.client.post(
+            PAY_URL,
+            {
+                'tickets': [
+                    self.ticket_100_90.pk,
+                    self.ticket_400_120.order_number,
+                ],
+            },
+            format='json',
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=contains(
+                    has_entries(
+                        ticket=str(self.ticket_100_90.pk),
+                        id=self.ticket_100_90.pk,
+                        order_number=self.ticket_100_90.order_number,
+                        status='paid',
+                        paid_at=not_none(),
+                    ),
+                    has_entries(
+                        ticket=self.ticket_400_120.order_number,
+                        id=self.ticket_400_120.pk,
+                        status='paid',
+                    ),
+                ),
+            ),
+        )
+        assert_that(
+            Ticket.objects.filter(paid_at__isnull=True).exists(),
+            is_(False),
+        )
+
+    def test_reports_tickets_not_paid(self):
+        paid_at = timezone.now() - timedelta(minutes=1)
+        Ticket.objects.filter(pk=self.ticket_100_90.pk).update(
+            paid_at=paid_at,
+        )
+        MovieSession.objects.filter(pk=self.movie_session_400_120.pk).update(
+            starts_at_dt=timezone.now(),
+        )
+        other_ticket = self.movie_session_100_90.book_ticket(
+            self.user_2,
+            row_number=1,
+            seat_number=1,
+        )
+
+        response = self.client.post(
+            PAY_URL,
+            {
+                'tickets': [
+                    self.ticket_100_90.pk,
+                    self.ticket_400_120.pk,
+                    other_ticket.pk,
+                    'XXXX00000000',
+                ],
+            },
+            format='json',
+        )
+        assert_that(
+            response.data,
+            contains(
+                has_entries(status='ticket_already_paid', paid_at=not_none()),
+                has_entries(status='no_booking_available', paid_at=none()),
+                has_entries(status='not_found', id=none()),
+                has_entries(status='not_found', ticket='XXXX00000000'),
+            ),
+        )
+        other_ticket.refresh_from_db()
+        assert_that(other_ticket.paid_at, none())
+
+    def test_staff_pays_tickets_of_customers(self):
+        self.authenticate(self.superuser)
+
+        response = self.client.post(
+            PAY_URL,
+            {'tickets': [self.ticket_100_90.pk]},
+            format='json',
+        )
+        assert_that(response.data, contains(has_entries(status='paid')))
+
+    def test_pays_with_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                PAY_URL,
+                {
+                    'tickets': [
+                        self.ticket_100_90.pk,
+                        self.ticket_400_120.pk,
+                    ],
+                },
+                format='json',
+            )
+
+        # Savepoint queries of the transaction aside
+        statements = [
+            query['sql'] for query in queries.captured_queries
+            if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))
+        ]
+        assert_that(len(statements), equal_to(2))
+
+    def test_validates_tickets(self):
+        for tickets in ([], ['X' * 13]):
+            response = self.client.post(
+                PAY_URL,
+                {'tickets': tickets},
+                format='json',
+            )
+            assert_that(response.status_code, equal_to(HTTP_400_BAD_REQUEST))
+
+    def test_superscript_digit_is_order_number(self):
+        response = self.client.post(
+            PAY_URL,
+            {'tickets': ['\u00b2']},
+            format='json',
+        )
+        assert_that(
+            response.data,
+            contains(has_entries(status='not_found', ticket='\u00b2')),
+        )
+
+
+class PaymentTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(PaymentTestCase, self).setUp()
+        refresh_token = ClaimsRefreshToken.for_user(self.user_1)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+        self.pay_url = f'/api/tickets/{self.ticket_100_90.pk}/pay/'
+
+    def test_pays_with_lookup_and_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.pay_url)
+
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(paid_at=not_none()),
+            ),
+        )
+        assert_that(
+            [query['sql'].split()[0] for query in queries.captured_queries],
+            contains('SELECT', 'UPDATE'),
+        )
+
+    def test_rejects_ticket_paid_meanwhile(self):
+        Ticket.objects.filter(pk=self.ticket_100_90.pk).update(
+            paid_at=timezone.now(),
+        )
+
+        response = self.client.post(self.pay_url)
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(
+                    detail=has_properties(code='ticket_already_paid'),
+                ),
+            ),
+        )
+
+    def test_rejects_ticket_of_closed_session(self):
+        MovieSession.objects.filter(pk=self.movie_session_100_90.pk).update(
+            starts_at_dt=timezone.now(),
+        )
+
+        response = self.client.post(self.pay_url)
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(
+                    detail=has_properties(code='no_booking_available'),
+                ),
+            ),
+        )
+        self.ticket_100_90.refresh_from_db()
+        assert_that(self.ticket_100_90.paid_at, none())
@@ -0,0 +1,85 @@
+from django.core.cache import caches
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import contains_string
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_item
+from hamcrest import has_properties
+from hamcrest import is_
+from hamcrest import not_none
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class SqlProfilingTestCase(TicketSetupMixin, APITestCase):
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def test_profiles_staff_request(self):
+        self.authenticate(self.superuser)
+
+        response = self.client.get('/api/tickets/', HTTP_X_PROFILE_SQL='1')
+        assert_that(response, has_properties(status_code=HTTP_200_OK))
+        assert_that(int(response['X-SQL-Queries']), equal_to(2))
+
+        response = self.client.get(
+            '/api/sql-profiles/{}/'.format(response['X-SQL-Profile-Id']),
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    count=2,
+                    queries=has_item(
+                        has_entries(
+                            origin=has_item(
+                                contains_string('cinema/middleware.py'),
+                            ),
+                        ),
+                    ),
+                ),
+            ),
+        )
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'profiles': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'profiles',
+            },
+        },
+        SQL_PROFILE_CACHE='profiles',
+    )
+    def test_stores_profiles_in_configured_cache(self):
+        self.authenticate(self.superuser)
+
+        response = self.client.get('/api/tickets/', HTTP_X_PROFILE_SQL='1')
+        profile_id = response['X-SQL-Profile-Id']
+        assert_that(
+            caches['profiles'].get(f'sql-profile:{profile_id}'),
+            not_none(),
+        )
+
+    def test_ignores_header_of_regular_user(self):
+        self.authenticate(self.user_1)
+
+        response = self.client.get('/api/tickets/', HTTP_X_PROFILE_SQL='1')
+        assert_that(response.has_header('X-SQL-Profile-Id'), is_(False))
+
+    def test_profiles_are_staff_only(self):
+        self.authenticate(self.user_1)
+
+        response = self.client.get('/api/sql-profiles/unknown/')
+        assert_that(response, has_properties(status_code=HTTP_403_FORBIDDEN))
@@ -0,0 +1,185 @@
+import gzip
+import io
+from datetime import date
+from datetime import datetime
+from datetime import time
+from decimal import Decimal
+
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import override_settings
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import is_
+from hamcrest import raises
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.status import HTTP_200_OK
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.middleware import CompressionMiddleware
+from ticket_api.cinema.renderers import FastJSONParser
+from ticket_api.cinema.renderers import FastJSONRenderer
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class FastJSONTestCase(SimpleTestCase):
+    def test_renders_like_drf(self):
+        data = {
+            'cost': Decimal('12.50'),
+            'date': date(2019, 1, 2),
+            'start_time': time(10, 30),
+            'created_at': datetime(2019, 1, 2, 10, 30, tzinfo=timezone.utc),
+            'title': 'Ticket № 1',
+            'seats': [1, 2.5, None, True],
+        }
+
+        assert_that(
+            FastJSONRenderer().render(data),
+            equal_to(JSONRenderer().render(data)),
+        )
+
+    def test_escapes_line_separators(self):
+        assert_that(
+            FastJSONRenderer().render({'title': 'a\u2028b\u2029c'}),
+            equal_to(b'{"title":"a\\u2028b\\u2029c"}'),
+        )
+
+    def test_indents_on_request(self):
+        content = FastJSONRenderer().render(
+            {'title': 'a'},
+            'application/json; indent=2',
+        )
+        assert_that(content, equal_to(b'{\n  "title": "a"\n}'))
+
+    def test_parses(self):
+        stream = io.BytesIO('{"title": "Ticket № 1", "seat": 2}'.encode())
+        assert_that(
+            FastJSONParser().parse(stream),
+            equal_to({'title': 'Ticket № 1', 'seat': 2}),
+        )
+
+    def test_rejects_invalid_json(self):
+        for content in (b'{"seat": NaN}', b'{"seat": '):
+            assert_that(
+                calling(FastJSONParser().parse).with_args(io.BytesIO(content)),
+                raises(ParseError),
+            )
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTestCase(SimpleTestCase):
+    content = b'{"seats":[' + b','.join([b'1'] * 200) + b']}'
+
+    def process(
+            self,
+            response,
+            accept_encoding='gzip, deflate',
+            get_response=None,
+    ):
+        request = RequestFactory().get(
+            '/',
+            HTTP_ACCEPT_ENCODING=accept_encoding,
+        )
+        return CompressionMiddleware(
+            get_response or (lambda request: response),
+        )(request)
+
+    def make_response(self, content=None):
+        response = HttpResponse(
+            self.content if content is None else content,
+            content_type='application/json',
+        )
+        response['ETag'] = '"abc"'
+        return response
+
+    def test_gzips_response(self):
+        response = self.process(self.make_response())
+
+        assert_that(response['Content-Encoding'], equal_to('gzip'))
+        assert_that(response['Vary'], equal_to('Accept-Encoding'))
+        assert_that(response['ETag'], equal_to('W/"abc"'))
+        assert_that(
+            int(response['Content-Length']),
+            equal_to(len(response.content)),
+        )
+        assert_that(gzip.decompress(response.content), equal_to(self.content))
+
+    def test_gzips_streaming_response(self):
+        response = self.process(
+            StreamingHttpResponse(
+                iter([self.content] * 3),
+                content_type='application/json',
+            ),
+        )
+
+        assert_that(response['Content-Encoding'], equal_to('gzip'))
+        assert_that(
+            gzip.decompress(b''.join(response.streaming_content)),
+            equal_to(self.content * 3),
+        )
+
+    def test_keeps_small_response(self):
+        response = self.process(self.make_response(b'{"seats":[]}'))
+
+        assert_that(response.has_header('Content-Encoding'), is_(False))
+        assert_that(response['ETag'], equal_to('"abc"'))
+
+    def test_keeps_response_for_client_without_gzip(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0'):
+            response = self.process(self.make_response(), accept_encoding)
+
+            assert_that(response.has_header('Content-Encoding'), is_(False))
+            assert_that(response['Vary'], equal_to('Accept-Encoding'))
+            assert_that(response.content, equal_to(self.content))
+
+    def test_keeps_incompressible_type(self):
+        for content_type in ('image/png', 'text/html'):
+            response = HttpResponse(self.content, content_type=content_type)
+            response = self.process(response)
+
+            assert_that(response.has_header('Content-Encoding'), is_(False))
+
+    def test_keeps_response_with_csrf_token(self):
+        def get_response(request):
+            get_token(request)
+            return self.make_response()
+
+        response = self.process(None, get_response=get_response)
+
+        assert_that(response.has_header('Content-Encoding'), is_(False))
+        assert_that(response.content, equal_to(self.content))
+
+
+class CompressedApiTestCase(TicketSetupMixin, APITestCase):
+    @override_settings(COMPRESSION_MIN_SIZE=100)
+    def test_gzips_ticket_list(self):
+        refresh_token = ClaimsRefreshToken.for_user(self.superuser)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+        response = self.client.get(
+            '/api/tickets/',
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(count=2),
+            ),
+        )
+        assert_that(response['Content-Encoding'], equal_to('gzip'))
+        assert_that(
+            gzip.decompress(response.content),
+            equal_to(FastJSONRenderer().render(response.data)),
+        )
@@ -0,0 +1,78 @@
+from django.test import SimpleTestCase
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import none
+
+from ticket_api.cinema.seating import find_best_seats
+from ticket_api.cinema.seating import remap_seats
+
+
+class FindBestSeatsTestCase(SimpleTestCase):
+    def test_picks_center_block(self):
+        assert_that(
+            find_best_seats(5, 10, [], 4),
+            equal_to([(3, 4), (3, 5), (3, 6), (3, 7)]),
+        )
+
+    def test_skips_booked_seats(self):
+        booked = [(3, seat_number) for seat_number in range(1, 11)]
+
+        assert_that(
+            find_best_seats(5, 10, booked, 2),
+            equal_to([(2, 5), (2, 6)]),
+        )
+
+    def test_prefers_aisle(self):
+        assert_that(
+            find_best_seats(5, 10, [], 2, aisle=True),
+            equal_to([(3, 1), (3, 2)]),
+        )
+
+    def test_no_block_for_party_together(self):
+        booked = [
+            (row_number, seat_number)
+            for row_number in range(1, 3)
+            for seat_number in range(2, 11, 2)
+        ]
+
+        assert_that(find_best_seats(2, 10, booked, 2), none())
+
+    def test_scatters_party_not_together(self):
+        booked = [
+            (row_number, seat_number)
+            for row_number in range(1, 3)
+            for seat_number in range(2, 11, 2)
+        ]
+
+        assert_that(
+            find_best_seats(2, 10, booked, 2, together=False),
+            equal_to([(1, 5), (2, 5)]),
+        )
+
+    def test_sold_out(self):
+        assert_that(
+            find_best_seats(1, 2, [(1, 1)], 2, together=False),
+            none(),
+        )
+
+
+class RemapSeatsTestCase(SimpleTestCase):
+    def test_keeps_free_seats(self):
+        tickets = [(1, 10, 1, 1), (2, 10, 1, 2)]
+
+        assert_that(remap_seats(5, 10, [(2, 2)], tickets), equal_to({}))
+
+    def test_moves_displaced_party_together(self):
+        # Booked seat and seat missing in the smaller hall
+        tickets = [(1, 10, 1, 1), (2, 10, 6, 1), (3, 20, 1, 3)]
+
+        assert_that(
+            remap_seats(5, 10, [(1, 1)], tickets),
+            equal_to({1: (3, 5), 2: (3, 6)}),
+        )
+
+    def test_no_seats_for_all_tickets(self):
+        booked = [(1, seat_number) for seat_number in range(1, 3)]
+        tickets = [(1, 10, 1, 1), (2, 10, 1, 2)]
+
+        assert_that(remap_seats(1, 3, booked, tickets), none())
@@ -1,19 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
 from hamcrest import assert_that
 from hamcrest import calling
+from hamcrest import contains_string
+from hamcrest import equal_to
+from hamcrest import greater_than_or_equal_to
 from hamcrest import raises
 
+from ticket_api.cinema.metrics import AUTO_CANCEL_LAG
+from ticket_api.cinema.metrics import AUTO_CANCEL_OUTCOMES
+from ticket_api.cinema.metrics import registry
 from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tasks import AUTO_CANCEL_ALREADY_PAID
+from ticket_api.cinema.tasks import AUTO_CANCEL_CANCELED
+from ticket_api.cinema.tasks import AUTO_CANCEL_GONE
+from ticket_api.cinema.tasks import AUTO_CANCEL_MOVED
 from ticket_api.cinema.tasks import cancel_non_paid_booking
+from ticket_api.cinema.tasks import send_notifications
 from ticket_api.cinema.tests.mixins import TicketSetupMixin
 
 
 class TaskTestCase(TicketSetupMixin, TestCase):
+    def outcomes(self, outcome):
+        return registry.collect()[
+            (AUTO_CANCEL_OUTCOMES.name, (('outcome', outcome),))
+        ]
+
     def test_ticket_canceled(self):
-        cancel_non_paid_booking(self.ticket_100_90.pk)
+        before = self.outcomes(AUTO_CANCEL_CANCELED)
 
+        outcome = cancel_non_paid_booking(self.ticket_100_90.pk)
+
+        assert_that(outcome, equal_to(AUTO_CANCEL_CANCELED))
         assert_that(
             calling(Ticket.objects.get).with_args(pk=self.ticket_100_90.pk),
             raises(ObjectDoesNotExist)
         )
+        assert_that(
+            self.outcomes(AUTO_CANCEL_CANCELED) - before,
+            equal_to(1),
+        )
+
+    def test_lag_measured_from_scheduled_time(self):
+        lag_sum = (f'{AUTO_CANCEL_LAG.name}_sum', ())
+        before = registry.collect()[lag_sum]
+        eta = timezone.now() - timedelta(minutes=1)
+
+        cancel_non_paid_booking(
+            self.ticket_100_90.pk,
+            self.movie_session_100_90.pk,
+            eta.isoformat(),
+        )
+
+        assert_that(
+            registry.collect()[lag_sum] - before,
+            greater_than_or_equal_to(60),
+        )
+
+    def test_paid_ticket_kept(self):
+        self.ticket_100_90.make_payment()
+
+        outcome = cancel_non_paid_booking(self.ticket_100_90.pk)
+
+        assert_that(outcome, equal_to(AUTO_CANCEL_ALREADY_PAID))
+        assert_that(
+            Ticket.objects.filter(pk=self.ticket_100_90.pk).exists(),
+            equal_to(True),
+        )
+
+    def test_gone_ticket(self):
+        self.ticket_100_90.cancel_booking()
+
+        outcome = cancel_non_paid_booking(self.ticket_100_90.pk)
+
+        assert_that(outcome, equal_to(AUTO_CANCEL_GONE))
+
+    def test_moved_ticket_kept(self):
+        outcome = cancel_non_paid_booking(
+            self.ticket_100_90.pk,
+            self.movie_session_400_120.pk,
+        )
+
+        assert_that(outcome, equal_to(AUTO_CANCEL_MOVED))
+        assert_that(
+            Ticket.objects.filter(pk=self.ticket_100_90.pk).exists(),
+            equal_to(True),
+        )
+
+    def test_notifications_sent(self):
+        sent = send_notifications([
+            ('Booking moved', 'Moved.', 'user_1@example.com'),
+            ('Booking moved', 'Moved.', 'user_2@example.com'),
+        ])
+
+        assert_that(sent, equal_to(2))
+        assert_that(
+            [message.to for message in mail.outbox],
+            equal_to([['user_1@example.com'], ['user_2@example.com']]),
+        )
+
+
+class BookingExpiryReportTestCase(TicketSetupMixin, TestCase):
+    def report(self):
+        out = StringIO()
+        call_command('booking_expiry_report', stdout=out)
+        return out.getvalue()
+
+    def test_reports_overdue_bookings(self):
+        Ticket.objects.create(
+            movie_session=self.movie_session_past,
+            customer=self.user_1,
+            row_number=1,
+            seat_number=1,
+            cost=self.movie_session_past.ticket_cost,
+        )
+        Ticket.objects.create(
+            movie_session=self.movie_session_past,
+            customer=self.user_1,
+            row_number=1,
+            seat_number=2,
+            cost=self.movie_session_past.ticket_cost,
+            paid_at=timezone.now(),
+        )
+
+        assert_that(
+            self.report(),
+            contains_string(
+                'Overdue bookings: 1 non paid tickets in 1 sessions',
+            ),
+        )
+
+    def test_reports_auto_cancellations(self):
+        cancel_non_paid_booking(self.ticket_100_90.pk)
+        cancel_non_paid_booking(
+            self.ticket_400_120.pk,
+            self.movie_session_100_90.pk,
+        )
+        moved = int(registry.collect()[
+            (AUTO_CANCEL_OUTCOMES.name, (('outcome', AUTO_CANCEL_MOVED),))
+        ])
+
+        assert_that(self.report(), contains_string('Auto cancellations: '))
+        assert_that(self.report(), contains_string(f'moved {moved})'))
+        assert_that(
+            self.report(),
+            contains_string('Overdue bookings: 0 non paid tickets'),
+        )
@@ -0,0 +1,218 @@
+from unittest.mock import patch
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import contains
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import not_none
+from hamcrest import raises
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.exceptions import InvalidTicketCodeError
+from ticket_api.cinema.exceptions import TicketCodeOutOfDateError
+from ticket_api.cinema.exceptions import TicketCodeRevokedError
+from ticket_api.cinema.models import RevokedTicketCode
+from ticket_api.cinema.models import Ticket
+from ticket_api.cinema.tasks import prune_revoked_ticket_codes
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.ticket_codes import make_ticket_code
+from ticket_api.cinema.ticket_codes import revoked_ticket_codes
+from ticket_api.cinema.ticket_codes import verify_ticket_code
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+
+
+class TicketCodeTestCase(TicketSetupMixin, TestCase):
+    def setUp(self):
+        super(TicketCodeTestCase, self).setUp()
+        # Snapshot outlives test transactions
+        revoked_ticket_codes.invalidate()
+        self.ticket_100_90.make_payment()
+        self.code = make_ticket_code(self.ticket_100_90)
+        self.starts_at = self.movie_session_100_90.starts_at_dt.timestamp()
+
+    def test_verifies_code_without_queries(self):
+        # The first one takes revocations snapshot
+        verify_ticket_code(self.code, self.starts_at)
+
+        with self.assertNumQueries(0):
+            ticket_code = verify_ticket_code(self.code, self.starts_at)
+
+        assert_that(
+            ticket_code,
+            has_properties(
+                ticket=self.ticket_100_90.pk,
+                movie_session=self.movie_session_100_90.pk,
+                row_number=5,
+                seat_number=5,
+                order_number=self.ticket_100_90.order_number,
+            ),
+        )
+
+    def test_rejects_forged_code(self):
+        for code in (self.code[:-2] + 'AA', self.code[:20], '***', ''):
+            assert_that(
+                calling(verify_ticket_code).with_args(code, self.starts_at),
+                raises(InvalidTicketCodeError),
+            )
+
+    def test_rejects_code_out_of_window(self):
+        for now in (self.starts_at - 2 * 3600, self.starts_at + 4 * 3600):
+            assert_that(
+                calling(verify_ticket_code).with_args(self.code, now),
+                raises(TicketCodeOutOfDateError),
+            )
+
+    def test_rejects_revoked_code_of_moved_ticket(self):
+        Ticket.objects.filter(pk=self.ticket_100_90.pk).update(seat_number=6)
+        revoked_ticket_codes.revoke(
+            [self.ticket_100_90.pk],
+            self.movie_session_100_90.starts_at_dt,
+        )
+
+        assert_that(
+            calling(verify_ticket_code).with_args(self.code, self.starts_at),
+            raises(TicketCodeRevokedError),
+        )
+
+    def test_keeps_revoked_code_of_unchanged_ticket(self):
+        revoked_ticket_codes.revoke(
+            [self.ticket_100_90.pk],
+            self.movie_session_100_90.starts_at_dt,
+        )
+        verify_ticket_code(self.code, self.starts_at)
+
+        with self.assertNumQueries(1):
+            verify_ticket_code(self.code, self.starts_at)
+
+    def test_sees_revocations_of_other_processes(self):
+        verify_ticket_code(self.code, self.starts_at)
+        Ticket.objects.filter(pk=self.ticket_100_90.pk).update(seat_number=6)
+        RevokedTicketCode.objects.create(
+            ticket=self.ticket_100_90,
+            expires_at=self.movie_session_100_90.starts_at_dt,
+        )
+
+        with self.settings(TICKET_CODE_REVOCATIONS_SNAPSHOT_TTL=timedelta()):
+            assert_that(
+                calling(verify_ticket_code).with_args(
+                    self.code,
+                    self.starts_at,
+                ),
+                raises(TicketCodeRevokedError),
+            )
+
+    def test_prunes_expired_revocations(self):
+        revoked_ticket_codes.revoke(
+            [self.ticket_100_90.pk],
+            timezone.now() - timedelta(minutes=1),
+        )
+
+        assert_that(prune_revoked_ticket_codes(), equal_to(1))
+        assert_that(RevokedTicketCode.objects.exists(), equal_to(False))
+
+
+class TicketCodeApiTestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        super(TicketCodeApiTestCase, self).setUp()
+        revoked_ticket_codes.invalidate()
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def test_issues_and_verifies_code(self):
+        self.authenticate(self.user_1)
+        response = self.client.get(self.ticket_100_90_url + 'code/')
+        assert_that(
+            response,
+            has_properties(
+                status_code=422,
+                data=has_entries(
+                    detail=has_properties(code='ticket_not_paid'),
+                ),
+            ),
+        )
+
+        self.ticket_100_90.make_payment()
+        code = self.client.get(self.ticket_100_90_url + 'code/').data['code']
+
+        response = self.client.post(
+            '/api/tickets/verify_code/',
+            {'code': code},
+            format='json',
+        )
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+
+        self.authenticate(self.superuser)
+        starts_at = self.movie_session_100_90.starts_at_dt.timestamp()
+        revoked_ticket_codes.revoked_at(self.ticket_100_90.pk)
+        with patch('ticket_api.cinema.ticket_codes.time') as time, \
+                self.assertNumQueries(0):
+            time.return_value = starts_at
+            response = self.client.post(
+                '/api/tickets/verify_code/',
+                {'code': code},
+                format='json',
+            )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    ticket=self.ticket_100_90.pk,
+                    order_number=self.ticket_100_90.order_number,
+                ),
+            ),
+        )
+
+        response = self.client.post(
+            '/api/tickets/verify_code/',
+            {'code': code},
+            format='json',
+        )
+        assert_that(
+            response.data,
+            has_entries(
+                detail=has_properties(code='ticket_code_out_of_date'),
+            ),
+        )
+
+    def test_lists_revoked_codes(self):
+        revoked_ticket_codes.revoke(
+            [self.ticket_100_90.pk],
+            self.movie_session_100_90.starts_at_dt,
+        )
+        revoked_ticket_codes.revoke(
+            [self.ticket_400_120.pk],
+            timezone.now() - timedelta(minutes=1),
+        )
+
+        self.authenticate(self.user_1)
+        response = self.client.get('/api/tickets/revoked_codes/')
+        assert_that(response.status_code, equal_to(HTTP_403_FORBIDDEN))
+
+        self.authenticate(self.superuser)
+        response = self.client.get('/api/tickets/revoked_codes/')
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=contains(
+                    has_entries(
+                        ticket=self.ticket_100_90.pk,
+                        revoked_at=not_none(),
+                        expires_at=not_none(),
+                    ),
+                ),
+            ),
+        )
@@ -10,11 +10,12 @@ from rest_framework.status import HTTP_200_OK
 from rest_framework.status import HTTP_403_FORBIDDEN
 from rest_framework.test import APITestCase
 
+from ticket_api.cinema.tests.mixins import QueryBudgetMixin
 from ticket_api.cinema.tests.mixins import TicketSetupMixin
 from ticket_api.cinema.tests.utils import is_page_of
 
 
-class AnonymousAPITestCase(TicketSetupMixin, APITestCase):
+class AnonymousAPITestCase(QueryBudgetMixin, TicketSetupMixin, APITestCase):
     def setUp(self):
         super(AnonymousAPITestCase, self).setUp()
 
@@ -271,3 +272,18 @@ class AnonymousAPITestCase(TicketSetupMixin, APITestCase):
     def test_prevents_canceling(self):
         response = self.client.post(self.ticket_100_90_url + 'cancel/')
         assert_that(response, has_properties(status_code=HTTP_403_FORBIDDEN))
+
+    def test_user_info_query_budget(self):
+        self.assert_query_budget('/api/user-info/', 0)
+
+    def test_list_halls_query_budget(self):
+        self.assert_query_budget('/api/halls/', 2)
+
+    def test_list_movies_query_budget(self):
+        self.assert_query_budget('/api/movies/', 2)
+
+    def test_list_movie_sessions_query_budget(self):
+        self.assert_query_budget('/api/movie-sessions/', 2)
+
+    def test_get_movie_session_query_budget(self):
+        self.assert_query_budget(self.movie_session_100_90_url, 1)
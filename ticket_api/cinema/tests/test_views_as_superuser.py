@@ -19,11 +19,12 @@ from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from ticket_api.cinema.tests.mixins import QueryBudgetMixin
 from ticket_api.cinema.tests.mixins import TicketSetupMixin
 from ticket_api.cinema.tests.utils import is_page_of
 
 
-class AdminAPITestCase(TicketSetupMixin, APITestCase):
+class AdminAPITestCase(QueryBudgetMixin, TicketSetupMixin, APITestCase):
     def setUp(self):
         super(AdminAPITestCase, self).setUp()
 
@@ -528,3 +529,30 @@ class AdminAPITestCase(TicketSetupMixin, APITestCase):
 
         response = self.client.post(self.ticket_100_90_url + 'cancel/')
         assert_that(response, has_properties(status_code=422))
+
+    def test_user_info_query_budget(self):
+        self.assert_query_budget('/api/user-info/', 1)
+
+    def test_list_users_query_budget(self):
+        self.assert_query_budget('/api/users/', 3)
+
+    def test_list_halls_query_budget(self):
+        self.assert_query_budget('/api/halls/', 3)
+
+    def test_list_movies_query_budget(self):
+        self.assert_query_budget('/api/movies/', 3)
+
+    def test_list_movie_sessions_query_budget(self):
+        self.assert_query_budget('/api/movie-sessions/', 3)
+
+    def test_get_movie_session_query_budget(self):
+        self.assert_query_budget(self.movie_session_100_90_url, 2)
+
+    def test_get_seats_schema_query_budget(self):
+        self.assert_query_budget(self.movie_session_100_90_url + 'seats/', 3)
+
+    def test_list_tickets_query_budget(self):
+        self.assert_query_budget('/api/tickets/', 3)
+
+    def test_get_ticket_query_budget(self):
+        self.assert_query_budget(self.ticket_100_90_url, 2)
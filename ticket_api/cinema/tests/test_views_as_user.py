@@ -1,26 +1,33 @@
 from datetime import date
 from datetime import time
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from hamcrest import all_of
 from hamcrest import assert_that
+from hamcrest import contains
+from hamcrest import contains_string
 from hamcrest import empty
 from hamcrest import has_entries
 from hamcrest import has_item
+from hamcrest import has_key
 from hamcrest import has_length
 from hamcrest import has_properties
 from hamcrest import none
 from hamcrest import not_
 from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_400_BAD_REQUEST
 from rest_framework.status import HTTP_403_FORBIDDEN
 from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from ticket_api.cinema.tests.mixins import QueryBudgetMixin
 from ticket_api.cinema.tests.mixins import TicketSetupMixin
 from ticket_api.cinema.tests.utils import is_page_of
 
 
-class UserAPITestCase(TicketSetupMixin, APITestCase):
+class UserAPITestCase(QueryBudgetMixin, TicketSetupMixin, APITestCase):
     def setUp(self):
         super(UserAPITestCase, self).setUp()
 
@@ -158,6 +165,27 @@ class UserAPITestCase(TicketSetupMixin, APITestCase):
             )
         )
 
+    def test_list_movie_sessions_without_empty_seats(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                '/api/movie-sessions/',
+                data={'fields': 'url,date,starts_at'},
+            )
+
+        assert_that(
+            response.data['results'],
+            has_item(
+                all_of(
+                    has_entries(url=self.movie_session_100_90_url_match),
+                    not_(has_key('empty_seats')),
+                    not_(has_key('hall')),
+                ),
+            ),
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert_that(sql, not_(contains_string('COUNT')))
+        assert_that(sql, not_(contains_string('JOIN')))
+
     def test_list_movies_sessions_without_past(self):
         response = self.client.get('/api/movie-sessions/')
         assert_that(
@@ -299,6 +327,49 @@ class UserAPITestCase(TicketSetupMixin, APITestCase):
         )
         assert_that(response, has_properties(status_code=HTTP_403_FORBIDDEN))
 
+    def test_book_best_seats(self):
+        response = self.client.post(
+            self.movie_session_100_90_url + 'book_best_seats/',
+            data={'party_size': 2},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=contains(
+                    has_entries(row_number=6, seat_number=5),
+                    has_entries(row_number=6, seat_number=6),
+                ),
+            ),
+        )
+
+    def test_book_best_seats_at_aisle(self):
+        response = self.client.post(
+            self.movie_session_100_90_url + 'book_best_seats/',
+            data={'party_size': 3, 'aisle': True},
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=contains(
+                    has_entries(row_number=5, seat_number=1),
+                    has_entries(row_number=5, seat_number=2),
+                    has_entries(row_number=5, seat_number=3),
+                ),
+            ),
+        )
+
+    def test_prevents_best_seats_for_too_big_party(self):
+        response = self.client.post(
+            self.movie_session_100_90_url + 'book_best_seats/',
+            data={'party_size': 11},
+        )
+        assert_that(
+            response,
+            has_properties(status_code=HTTP_400_BAD_REQUEST),
+        )
+
     def test_list_tickets(self):
         response = self.client.get('/api/tickets/')
         assert_that(
@@ -313,6 +384,60 @@ class UserAPITestCase(TicketSetupMixin, APITestCase):
             )
         )
 
+    def test_list_tickets_sparse_fields(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                '/api/tickets/',
+                data={'fields': 'url,row_number,seat_number'},
+            )
+
+        assert_that(
+            response.data['results'],
+            has_item(
+                all_of(
+                    has_entries(row_number=5, seat_number=5),
+                    not_(has_key('movie_session')),
+                    not_(has_key('order_number')),
+                ),
+            ),
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert_that(sql, not_(contains_string('JOIN')))
+        assert_that(sql, not_(contains_string('order_number')))
+
+    def test_list_tickets_without_embedded_session(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/tickets/', data={'expand': ''})
+
+        assert_that(
+            response.data['results'],
+            has_item(
+                has_entries(
+                    movie_session=self.movie_session_100_90_url_match,
+                ),
+            ),
+        )
+        sql = context.captured_queries[-1]['sql']
+        assert_that(sql, not_(contains_string('JOIN')))
+
+    def test_list_tickets_with_embedded_movie_only(self):
+        response = self.client.get(
+            '/api/tickets/',
+            data={'expand': 'movie_session.movie'},
+        )
+
+        assert_that(
+            response.data['results'],
+            has_item(
+                has_entries(
+                    movie_session=has_entries(
+                        hall=self.hall_100_url_match,
+                        movie=self.movie_90_match,
+                    ),
+                ),
+            ),
+        )
+
     def test_prevents_creating_tickets(self):
         response = self.client.post(
             '/api/tickets/',
@@ -372,3 +497,33 @@ class UserAPITestCase(TicketSetupMixin, APITestCase):
     def test_prevents_canceling(self):
         response = self.client.post(self.ticket_100_90_url + 'cancel/')
         assert_that(response, has_properties(status_code=HTTP_403_FORBIDDEN))
+
+    def test_user_info_query_budget(self):
+        self.assert_query_budget('/api/user-info/', 1)
+
+    def test_list_halls_query_budget(self):
+        self.assert_query_budget('/api/halls/', 3)
+
+    def test_list_movies_query_budget(self):
+        self.assert_query_budget('/api/movies/', 3)
+
+    def test_list_movie_sessions_query_budget(self):
+        self.assert_query_budget('/api/movie-sessions/', 3)
+
+    def test_get_movie_session_query_budget(self):
+        self.assert_query_budget(self.movie_session_100_90_url, 2)
+
+    def test_get_seats_schema_query_budget(self):
+        self.assert_query_budget(self.movie_session_100_90_url + 'seats/', 3)
+
+    def test_list_tickets_query_budget(self):
+        self.assert_query_budget('/api/tickets/', 3)
+
+    def test_list_sparse_tickets_query_budget(self):
+        self.assert_query_budget(
+            '/api/tickets/?fields=url,movie_session&expand=movie_session.hall',
+            3,
+        )
+
+    def test_get_ticket_query_budget(self):
+        self.assert_query_budget(self.ticket_100_90_url, 2)
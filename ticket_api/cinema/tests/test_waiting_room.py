@@ -0,0 +1,262 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import override_settings
+from hamcrest import assert_that
+from hamcrest import equal_to
+from hamcrest import greater_than
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import none
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_429_TOO_MANY_REQUESTS
+from rest_framework.test import APITestCase
+
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tokens import ClaimsRefreshToken
+from ticket_api.cinema.waiting_room import CacheWaitingRoom
+from ticket_api.cinema.waiting_room import LocalWaitingRoom
+from ticket_api.cinema.waiting_room import get_waiting_room
+
+LOCAL_WAITING_ROOM = 'ticket_api.cinema.waiting_room.LocalWaitingRoom'
+
+
+@override_settings(WAITING_ROOM_RATE=2, WAITING_ROOM_BURST=2)
+class LocalWaitingRoomTestCase(SimpleTestCase):
+    def setUp(self):
+        super(LocalWaitingRoomTestCase, self).setUp()
+
+        patcher = patch('ticket_api.cinema.waiting_room.time')
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.return_value = 1000.0
+
+        self.waiting_room = LocalWaitingRoom()
+
+    def test_admits_burst(self):
+        positions = [self.waiting_room.enqueue(1) for _ in range(3)]
+
+        assert_that(positions, equal_to([1, 2, 3]))
+        assert_that(self.waiting_room.admit(1, 1), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 2), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 3), greater_than(0))
+
+    def test_admits_at_rate(self):
+        for _ in range(6):
+            self.waiting_room.enqueue(1)
+        self.waiting_room.admit(1, 6)
+
+        self.time.return_value += 1
+
+        assert_that(self.waiting_room.admit(1, 4), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 5), greater_than(0))
+
+    def test_idle_tokens_capped_by_burst(self):
+        self.time.return_value += 60
+        for _ in range(3):
+            self.waiting_room.enqueue(1)
+
+        assert_that(self.waiting_room.admit(1, 2), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 3), greater_than(0))
+
+    def test_clear_drops_queue(self):
+        self.waiting_room.enqueue(1)
+        self.waiting_room.clear(1)
+
+        assert_that(self.waiting_room.enqueue(1), equal_to(1))
+
+
+@override_settings(WAITING_ROOM_RATE=2, WAITING_ROOM_BURST=2)
+class CacheWaitingRoomTestCase(SimpleTestCase):
+    def setUp(self):
+        super(CacheWaitingRoomTestCase, self).setUp()
+        cache.clear()
+
+        patcher = patch('ticket_api.cinema.waiting_room.time')
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.return_value = 1000.0
+
+        self.waiting_room = CacheWaitingRoom()
+
+    def test_admits_burst(self):
+        positions = [self.waiting_room.enqueue(1) for _ in range(3)]
+
+        assert_that(positions, equal_to([1, 2, 3]))
+        assert_that(self.waiting_room.admit(1, 2), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 3), greater_than(0))
+
+    def test_evicted_queue_starts_after_admitted_positions(self):
+        for _ in range(3):
+            self.waiting_room.enqueue(1)
+        self.waiting_room.admit(1, 2)
+        cache.delete('waiting-room:1:issued')
+
+        assert_that(self.waiting_room.enqueue(1), equal_to(3))
+        assert_that(self.waiting_room.admit(1, 3), greater_than(0))
+
+    def test_evicted_bucket_admits_burst_again(self):
+        for _ in range(3):
+            self.waiting_room.enqueue(1)
+        cache.delete('waiting-room:1:bucket')
+
+        assert_that(self.waiting_room.admit(1, 2), equal_to(0))
+        assert_that(self.waiting_room.admit(1, 3), greater_than(0))
+
+
+@override_settings(
+    WAITING_ROOM_BACKEND=LOCAL_WAITING_ROOM,
+    WAITING_ROOM_RATE=1,
+    WAITING_ROOM_BURST=1,
+)
+class WaitingRoomAPITestCase(TicketSetupMixin, APITestCase):
+    def setUp(self):
+        get_waiting_room().reset()
+        cache.clear()
+        super(WaitingRoomAPITestCase, self).setUp()
+
+        self.movie_session_100_90.switch(high_demand=True)
+
+        self.authenticate(self.user_1)
+
+    def authenticate(self, user):
+        refresh_token = ClaimsRefreshToken.for_user(user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+
+    def enter(self):
+        response = self.client.post(
+            self.movie_session_100_90_url + 'enter_waiting_room/',
+        )
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+        return response.data
+
+    def book(self, token=None, seat_number=1):
+        extra = {'HTTP_X_QUEUE_TOKEN': token} if token else {}
+        return self.client.post(
+            self.movie_session_100_90_url + 'book_ticket/',
+            data={'row_number': 1, 'seat_number': seat_number},
+            **extra
+        )
+
+    def test_not_guarded_session(self):
+        response = self.client.post(
+            self.movie_session_400_120_url + 'enter_waiting_room/',
+        )
+
+        assert_that(
+            response.data,
+            has_entries(token=none(), position=0, wait=0),
+        )
+
+    def test_booking_requires_queue_token(self):
+        with self.assertNumQueries(0):
+            response = self.book()
+
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                data=has_entries(detail=has_properties(code='not_admitted')),
+            ),
+        )
+
+    def test_admitted_in_order(self):
+        first = self.enter()
+        self.authenticate(self.user_2)
+        second = self.enter()
+
+        assert_that(first, has_entries(position=1, wait=0))
+        assert_that(second, has_entries(position=2, wait=greater_than(0)))
+
+        with self.assertNumQueries(0):
+            response = self.book(second['token'])
+        assert_that(
+            response.status_code,
+            equal_to(HTTP_429_TOO_MANY_REQUESTS),
+        )
+        assert_that(response['Retry-After'], equal_to('1'))
+
+        self.authenticate(self.user_1)
+        assert_that(
+            self.book(first['token']).status_code,
+            equal_to(HTTP_200_OK),
+        )
+
+    def test_entering_again_keeps_place(self):
+        token = self.enter()['token']
+
+        response = self.client.post(
+            self.movie_session_100_90_url + 'enter_waiting_room/',
+            HTTP_X_QUEUE_TOKEN=token,
+        )
+
+        assert_that(response.data, has_entries(position=1))
+
+    def test_token_of_another_user(self):
+        token = self.enter()['token']
+        self.authenticate(self.user_2)
+
+        assert_that(
+            self.book(token).status_code,
+            equal_to(HTTP_429_TOO_MANY_REQUESTS),
+        )
+
+    def test_pay_requires_admission(self):
+        response = self.client.post(self.ticket_100_90_url + 'pay/')
+        assert_that(
+            response.status_code,
+            equal_to(HTTP_429_TOO_MANY_REQUESTS),
+        )
+
+        token = self.enter()['token']
+        response = self.client.post(
+            self.ticket_100_90_url + 'pay/',
+            HTTP_X_QUEUE_TOKEN=token,
+        )
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_pay_other_session_ticket(self):
+        token = self.enter()['token']
+
+        response = self.client.post(
+            self.ticket_400_120_url + 'pay/',
+            HTTP_X_QUEUE_TOKEN=token,
+        )
+
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_pay_other_session_ticket_before_admission(self):
+        self.authenticate(self.user_2)
+        self.enter()
+        self.authenticate(self.user_1)
+        token = self.enter()['token']
+
+        response = self.client.post(
+            self.ticket_400_120_url + 'pay/',
+            HTTP_X_QUEUE_TOKEN=token,
+        )
+
+        assert_that(response.status_code, equal_to(HTTP_200_OK))
+
+    def test_guard_is_read_from_database(self):
+        # Flag cached by another process only, or evicted
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            response = self.book()
+        assert_that(
+            response.status_code,
+            equal_to(HTTP_429_TOO_MANY_REQUESTS),
+        )
+
+    def test_unguarded_session_drops_queue(self):
+        self.enter()
+        self.movie_session_100_90.switch(high_demand=False)
+
+        assert_that(self.book().status_code, equal_to(HTTP_200_OK))
+
+        self.movie_session_100_90.switch(high_demand=True)
+        assert_that(self.enter(), has_entries(position=1))
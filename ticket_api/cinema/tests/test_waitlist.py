@@ -0,0 +1,294 @@
+from datetime import time
+from datetime import timedelta
+from unittest.mock import call
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from hamcrest import assert_that
+from hamcrest import calling
+from hamcrest import contains
+from hamcrest import contains_inanyorder
+from hamcrest import equal_to
+from hamcrest import has_entries
+from hamcrest import has_properties
+from hamcrest import none
+from hamcrest import raises
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_204_NO_CONTENT
+from rest_framework.status import HTTP_422_UNPROCESSABLE_ENTITY
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ticket_api.cinema.exceptions import SeatsAvailableError
+from ticket_api.cinema.models import Hall
+from ticket_api.cinema.models import MovieSession
+from ticket_api.cinema.models import User
+from ticket_api.cinema.models import WaitlistEntry
+from ticket_api.cinema.tasks import cancel_non_paid_bookings
+from ticket_api.cinema.tasks import promote_waitlist
+from ticket_api.cinema.tasks import send_notifications
+from ticket_api.cinema.tests.mixins import TicketSetupMixin
+from ticket_api.cinema.tests.mixins import make_url_of_model
+from ticket_api.cinema.tests.utils import run_on_commit
+
+
+class SoldOutSetupMixin(TicketSetupMixin):
+    def setUp(self):
+        super(SoldOutSetupMixin, self).setUp()
+
+        self.hall_2 = Hall.objects.create(
+            name='Hall 2',
+            rows_number=1,
+            seats_per_row=2,
+        )
+        self.movie_session_sold_out = MovieSession.objects.create(
+            hall=self.hall_2,
+            movie=self.movie_90,
+            date=(timezone.now() + timedelta(days=2)).date(),
+            starts_at=time(8),
+            ticket_cost=100,
+        )
+        self.ticket_sold_out_1 = self.movie_session_sold_out.book_ticket(
+            self.superuser,
+            row_number=1,
+            seat_number=1,
+        )
+        self.ticket_sold_out_2 = self.movie_session_sold_out.book_ticket(
+            self.superuser,
+            row_number=1,
+            seat_number=2,
+        )
+
+
+class WaitlistTestCase(SoldOutSetupMixin, TestCase):
+    def test_join_keeps_place(self):
+        entry_1 = self.movie_session_sold_out.join_waitlist(self.user_1)
+        entry_2 = self.movie_session_sold_out.join_waitlist(self.user_2)
+
+        assert_that(
+            self.movie_session_sold_out.join_waitlist(self.user_1),
+            equal_to(entry_1),
+        )
+        assert_that(entry_1.position, equal_to(1))
+        assert_that(entry_2.position, equal_to(2))
+
+    def test_join_with_seats_available(self):
+        assert_that(
+            calling(self.movie_session_100_90.join_waitlist).with_args(
+                self.user_2,
+            ),
+            raises(SeatsAvailableError),
+        )
+
+    def test_promotes_in_order(self):
+        entry_1 = self.movie_session_sold_out.join_waitlist(self.user_1)
+        entry_2 = self.movie_session_sold_out.join_waitlist(self.user_2)
+        self.ticket_sold_out_2.cancel_booking()
+
+        tickets = self.movie_session_sold_out.promote_waitlist(10)
+
+        assert_that(
+            tickets,
+            contains(
+                has_properties(
+                    customer=self.user_1,
+                    row_number=1,
+                    seat_number=2,
+                ),
+            ),
+        )
+        entry_1.refresh_from_db()
+        entry_2.refresh_from_db()
+        assert_that(
+            entry_1,
+            has_properties(
+                status=WaitlistEntry.OFFERED,
+                ticket=tickets[0],
+                position=none(),
+            ),
+        )
+        assert_that(entry_2.position, equal_to(1))
+
+    def test_rejoins_after_offer_canceled(self):
+        entry = self.movie_session_sold_out.join_waitlist(self.user_1)
+        self.ticket_sold_out_2.cancel_booking()
+        [ticket] = self.movie_session_sold_out.promote_waitlist(10)
+
+        # Expired offer is canceled like any other non paid ticket
+        ticket.cancel_booking()
+
+        assert_that(
+            WaitlistEntry.objects.filter(pk=entry.pk).exists(),
+            equal_to(False),
+        )
+        self.movie_session_sold_out.book_ticket(
+            self.user_2,
+            row_number=1,
+            seat_number=2,
+        )
+        assert_that(
+            self.movie_session_sold_out.join_waitlist(self.user_1),
+            has_properties(status=WaitlistEntry.WAITING, position=1),
+        )
+
+    def test_bulk_cancel_promotes_waitlist(self):
+        self.movie_session_sold_out.join_waitlist(self.user_1)
+
+        with patch.object(transaction, 'on_commit', run_on_commit), \
+                patch.object(send_notifications, 'delay'), \
+                patch.object(promote_waitlist, 'delay') as delay:
+            # Nobody waits for seats of this one
+            self.movie_session_100_90.cancel_unpaid_tickets()
+            delay.assert_not_called()
+
+            self.movie_session_sold_out.cancel_unpaid_tickets()
+
+        delay.assert_called_once_with(self.movie_session_sold_out.pk)
+
+    def test_moved_offer_keeps_entry_and_hold(self):
+        target = MovieSession.objects.create(
+            hall=self.hall_2,
+            movie=self.movie_90,
+            date=(timezone.now() + timedelta(days=3)).date(),
+            starts_at=time(8),
+            ticket_cost=100,
+        )
+        waiting = WaitlistEntry.objects.create(
+            movie_session=target,
+            customer=self.user_1,
+        )
+        entry = self.movie_session_sold_out.join_waitlist(self.user_1)
+        self.ticket_sold_out_2.cancel_booking()
+        [offer] = self.movie_session_sold_out.promote_waitlist(10)
+
+        with patch.object(transaction, 'on_commit', run_on_commit), \
+                patch.object(send_notifications, 'delay'), \
+                patch.object(cancel_non_paid_bookings, 'apply_async') as \
+                cancel:
+            self.movie_session_sold_out.move_tickets(target)
+
+        entry.refresh_from_db()
+        assert_that(
+            entry,
+            has_properties(
+                movie_session=target,
+                status=WaitlistEntry.OFFERED,
+                ticket=offer,
+            ),
+        )
+        assert_that(
+            WaitlistEntry.objects.filter(pk=waiting.pk).exists(),
+            equal_to(False),
+        )
+        assert_that(
+            cancel.call_args_list,
+            contains_inanyorder(
+                call(
+                    (
+                        [offer.pk],
+                        target.pk,
+                        entry.offered_at + settings.WAITLIST_HOLD_PERIOD,
+                    ),
+                    eta=entry.offered_at + settings.WAITLIST_HOLD_PERIOD,
+                ),
+                call(
+                    (
+                        [self.ticket_sold_out_1.pk],
+                        target.pk,
+                        target.auto_cancelation_dt,
+                    ),
+                    eta=target.auto_cancelation_dt,
+                ),
+            ),
+        )
+
+    def test_promotes_batch(self):
+        self.movie_session_sold_out.join_waitlist(self.user_1)
+        self.movie_session_sold_out.join_waitlist(self.user_2)
+        self.ticket_sold_out_1.cancel_booking()
+        self.ticket_sold_out_2.cancel_booking()
+
+        tickets = self.movie_session_sold_out.promote_waitlist(1)
+
+        assert_that(tickets, contains(has_properties(customer=self.user_1)))
+
+    def test_task_promotes(self):
+        self.movie_session_sold_out.join_waitlist(self.user_1)
+        self.ticket_sold_out_1.cancel_booking()
+
+        with patch.object(promote_waitlist, 'delay') as delay:
+            assert_that(
+                promote_waitlist(self.movie_session_sold_out.pk),
+                equal_to(1),
+            )
+
+        delay.assert_not_called()
+
+    def test_task_continues_full_batch(self):
+        self.movie_session_sold_out.join_waitlist(self.user_1)
+        self.movie_session_sold_out.join_waitlist(self.user_2)
+        self.ticket_sold_out_1.cancel_booking()
+        self.ticket_sold_out_2.cancel_booking()
+
+        with self.settings(WAITLIST_BATCH_SIZE=1), \
+                patch.object(promote_waitlist, 'delay') as delay:
+            promote_waitlist(self.movie_session_sold_out.pk)
+
+        delay.assert_called_once_with(self.movie_session_sold_out.pk)
+
+
+class WaitlistAPITestCase(SoldOutSetupMixin, APITestCase):
+    def setUp(self):
+        super(WaitlistAPITestCase, self).setUp()
+
+        refresh_token = RefreshToken.for_user(self.user_1)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(refresh_token.access_token),
+        )
+        self.movie_session_sold_out_url = make_url_of_model(
+            self.movie_session_sold_out,
+        )
+
+    def test_join_waitlist(self):
+        response = self.client.post(
+            self.movie_session_sold_out_url + 'join_waitlist/',
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_200_OK,
+                data=has_entries(
+                    status=WaitlistEntry.WAITING,
+                    position=1,
+                    ticket=none(),
+                ),
+            ),
+        )
+
+    def test_join_waitlist_with_seats_available(self):
+        response = self.client.post(
+            make_url_of_model(self.movie_session_100_90) + 'join_waitlist/',
+        )
+        assert_that(
+            response,
+            has_properties(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                data=has_entries(detail=has_properties(code='seats_available')),
+            ),
+        )
+
+    def test_leave_waitlist(self):
+        self.movie_session_sold_out.join_waitlist(self.user_1)
+
+        response = self.client.post(
+            self.movie_session_sold_out_url + 'leave_waitlist/',
+        )
+
+        assert_that(response.status_code, equal_to(HTTP_204_NO_CONTENT))
+        assert_that(
+            User.objects.get(pk=self.user_1.pk).waitlist_entries.exists(),
+            equal_to(False),
+        )
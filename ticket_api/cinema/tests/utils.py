@@ -12,3 +12,7 @@ def is_page_of(*items, count):
         count=count,
         results=all_of(*conditions),
     )
+
+
+def run_on_commit(func):
+    func()
@@ -0,0 +1,28 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginIPThrottle(SimpleRateThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class LoginEmailThrottle(SimpleRateThrottle):
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        # Works for both DRF and plain Django requests
+        data = getattr(request, 'data', request.POST)
+        email = data.get('email') if isinstance(data, dict) else None
+        # Malformed emails are left to validation
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': email.strip().lower(),
+        }
@@ -0,0 +1,222 @@
+import hmac
+import struct
+import threading
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from collections import namedtuple
+from datetime import datetime
+from datetime import timedelta
+from hashlib import sha256
+from time import monotonic
+from time import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+
+from ticket_api.cinema.exceptions import InvalidTicketCodeError
+from ticket_api.cinema.exceptions import TicketCodeOutOfDateError
+from ticket_api.cinema.exceptions import TicketCodeRevokedError
+
+VERSION = 1
+KEY_SALT = b'ticket_api.cinema.ticket_codes'
+# Version, ticket, session, row, seat, issue time and validity window as
+# unix seconds, then order number and truncated signature
+LAYOUT = struct.Struct('>BIIHHIII12s')
+SIGNATURE_LENGTH = 10
+
+TicketCode = namedtuple(
+    'TicketCode',
+    'ticket movie_session row_number seat_number issued_at valid_from '
+    'valid_until order_number',
+)
+
+
+def ticket_code_key() -> bytes:
+    """
+    Key signing ticket codes, door devices verifying codes offline are
+    provisioned with it.
+    """
+    secret = settings.TICKET_CODE_SECRET or settings.SECRET_KEY
+    return sha256(KEY_SALT + force_bytes(secret)).digest()
+
+
+def _sign(payload: bytes) -> bytes:
+    digest = hmac.new(ticket_code_key(), payload, sha256).digest()
+    return digest[:SIGNATURE_LENGTH]
+
+
+def _encode(payload: bytes) -> str:
+    return urlsafe_b64encode(payload).rstrip(b'=').decode()
+
+
+def _decode(code: str) -> bytes:
+    return urlsafe_b64decode(code + '=' * (-len(code) % 4))
+
+
+def make_ticket_code(ticket) -> str:
+    """
+    Returns signed code of paid ticket, valid from `TICKET_CODE_ENTRY_PERIOD`
+    before its session starts till the session ends.
+    """
+    movie_session = ticket.movie_session
+    valid_from = movie_session.starts_at_dt - settings.TICKET_CODE_ENTRY_PERIOD
+    valid_until = movie_session.starts_at_dt + timedelta(
+        minutes=movie_session.total_duration,
+    )
+    payload = LAYOUT.pack(
+        VERSION,
+        ticket.pk,
+        ticket.movie_session_id,
+        ticket.row_number,
+        ticket.seat_number,
+        int(time()),
+        int(valid_from.timestamp()),
+        int(valid_until.timestamp()),
+        ticket.order_number.encode(),
+    )
+    return _encode(payload + _sign(payload))
+
+
+def read_ticket_code(code: str) -> TicketCode:
+    """
+    Decodes the code checking its signature only.
+    """
+    try:
+        data = _decode(code)
+    except (ValueError, TypeError):
+        raise InvalidTicketCodeError()
+
+    payload, signature = data[:LAYOUT.size], data[LAYOUT.size:]
+    if len(payload) != LAYOUT.size or \
+            not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidTicketCodeError()
+
+    version, *fields, order_number = LAYOUT.unpack(payload)
+    if version != VERSION:
+        raise InvalidTicketCodeError()
+    return TicketCode(*fields, order_number.decode())
+
+
+class RevokedTicketCodes:
+    """
+    Ticket code revocations stored in the database and mirrored into a
+    per-process snapshot of the latest revocation time by ticket pk.
+
+    Checking a code costs no I/O while the snapshot is fresh, revocations
+    made by other processes are seen once it is rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked_at = None
+        self._built_at = None
+
+    def _is_stale(self):
+        return (
+                self._revoked_at is None or
+                monotonic() - self._built_at >
+                settings.TICKET_CODE_REVOCATIONS_SNAPSHOT_TTL.total_seconds()
+        )
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            if self._is_stale():
+                revoked_at = {}
+                for ticket_pk, at in self.active().values_list(
+                        'ticket_id',
+                        'revoked_at',
+                ).iterator():
+                    revoked_at[ticket_pk] = max(
+                        at.timestamp(),
+                        revoked_at.get(ticket_pk, 0),
+                    )
+
+                self._revoked_at = revoked_at
+                self._built_at = monotonic()
+
+            return self._revoked_at
+
+    def invalidate(self):
+        with self._lock:
+            self._revoked_at = None
+
+    def active(self):
+        """
+        Revocations of codes not expired yet, the list door devices
+        verifying codes offline download.
+        """
+        from ticket_api.cinema.models import RevokedTicketCode
+
+        return RevokedTicketCode.objects.filter(expires_at__gt=timezone.now())
+
+    def revoked_at(self, ticket_pk):
+        return self._snapshot().get(ticket_pk)
+
+    def revoke(self, ticket_pks, valid_until: datetime):
+        """
+        Marks codes issued so far for the tickets, e.g. moved ones, as
+        stale.
+        """
+        from ticket_api.cinema.models import RevokedTicketCode
+
+        revoked_at = timezone.now()
+        RevokedTicketCode.objects.bulk_create(
+            RevokedTicketCode(
+                ticket_id=pk,
+                revoked_at=revoked_at,
+                expires_at=valid_until,
+            )
+            for pk in ticket_pks
+        )
+        # Snapshot rebuilt before commit misses them, so it's dropped again
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+    def prune(self) -> int:
+        from ticket_api.cinema.models import RevokedTicketCode
+
+        deleted, _ = RevokedTicketCode.objects.filter(
+            expires_at__lte=timezone.now(),
+        ).delete()
+        return deleted
+
+
+revoked_ticket_codes = RevokedTicketCodes()
+
+
+def _is_revoked(ticket_code: TicketCode) -> bool:
+    from ticket_api.cinema.models import Ticket
+
+    revoked_at = revoked_ticket_codes.revoked_at(ticket_code.ticket)
+    if revoked_at is None or ticket_code.issued_at > revoked_at:
+        return False
+
+    # Ticket may be back in the same seat, so the code still holds
+    return not Ticket.objects.filter(
+        pk=ticket_code.ticket,
+        movie_session_id=ticket_code.movie_session,
+        row_number=ticket_code.row_number,
+        seat_number=ticket_code.seat_number,
+        order_number=ticket_code.order_number,
+        paid_at__isnull=False,
+    ).exists()
+
+
+def verify_ticket_code(code: str, now: float = None) -> TicketCode:
+    """
+    Checks signature, validity window and revocation of the code. Costs no
+    database queries unless codes of the ticket were revoked or revocations
+    snapshot is rebuilt.
+    """
+    ticket_code = read_ticket_code(code)
+
+    now = time() if now is None else now
+    if not ticket_code.valid_from <= now <= ticket_code.valid_until:
+        raise TicketCodeOutOfDateError()
+
+    if _is_revoked(ticket_code):
+        raise TicketCodeRevokedError()
+
+    return ticket_code
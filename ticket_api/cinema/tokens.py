@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+CLAIMS_AT_CLAIM = 'claims_at'
+USER_CLAIMS = (
+    'email', 'is_staff', 'is_superuser', 'is_active', 'date_joined',
+    'last_login',
+)
+DATETIME_CLAIMS = ('date_joined', 'last_login')
+
+
+def _revocation_key(user_pk):
+    return f'jwt:claims-revoked-at:{user_pk}'
+
+
+def _revocation_cache():
+    return caches[settings.JWT_REVOCATION_CACHE]
+
+
+def revoke_user_claims(user_pk):
+    """
+    Marks claims issued for the user so far as stale.
+
+    Entry lives as long as an access token does, so every token carrying
+    stale claims expires before the mark itself.
+    """
+    _revocation_cache().set(
+        _revocation_key(user_pk),
+        timezone.now().timestamp(),
+        int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+def are_claims_trusted(token) -> bool:
+    claims_at = token.get(CLAIMS_AT_CLAIM)
+    if claims_at is None:
+        return False
+
+    revoked_at = _revocation_cache().get(
+        _revocation_key(token[api_settings.USER_ID_CLAIM]),
+    )
+    return revoked_at is None or claims_at > revoked_at
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying a snapshot of user attributes.
+
+    Claims are copied into every access token made from it, so requests can
+    be authenticated without loading the user row.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super(ClaimsRefreshToken, cls).for_user(user)
+
+        for claim in USER_CLAIMS:
+            value = getattr(user, claim)
+            if claim in DATETIME_CLAIMS and value is not None:
+                value = value.timestamp()
+            token[claim] = value
+
+        token[CLAIMS_AT_CLAIM] = timezone.now().timestamp()
+
+        return token
@@ -1,8 +1,10 @@
 from rest_framework.routers import DefaultRouter
 
+from ticket_api.cinema.views import ArchivedTicketViewSet
 from ticket_api.cinema.views import HallViewSet
 from ticket_api.cinema.views import MovieSessionViewSet
 from ticket_api.cinema.views import MovieViewSet
+from ticket_api.cinema.views import SqlProfileViewSet
 from ticket_api.cinema.views import TicketViewSet
 from ticket_api.cinema.views import UserInfoViewSet
 from ticket_api.cinema.views import UserViewSet
@@ -14,5 +16,7 @@ router.register(r'halls', HallViewSet)
 router.register(r'movies', MovieViewSet)
 router.register(r'movie-sessions', MovieSessionViewSet)
 router.register(r'tickets', TicketViewSet)
+router.register(r'archived-tickets', ArchivedTicketViewSet)
+router.register(r'sql-profiles', SqlProfileViewSet, base_name='sql-profile')
 
 urlpatterns = router.urls
@@ -1,5 +1,19 @@
+from datetime import date
+from datetime import datetime
+from datetime import time
+
 from django.utils import timezone
 
 
-def local_time_as_naive():
-    return timezone.localtime().replace(tzinfo=None)
+def local_datetime(day: date, time_of_day: time) -> datetime:
+    # Session time is local to the cinema, not to the server
+    return timezone.make_aware(
+        datetime.combine(day, time_of_day),
+        timezone.get_default_timezone(),
+    )
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[int(round(q * (len(sorted_values) - 1)))]
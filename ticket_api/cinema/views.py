@@ -1,15 +1,36 @@
+from django.conf import settings
 from django.db.models import ProtectedError
-from django.db.models import Q
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django_registration.backends.one_step.views import RegistrationView
 from rest_framework.decorators import detail_route
+from rest_framework.decorators import list_route
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import HTTP_204_NO_CONTENT
 from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.status import HTTP_404_NOT_FOUND
+from rest_framework.status import HTTP_429_TOO_MANY_REQUESTS
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.viewsets import ViewSet
 
+from ticket_api.cinema.check_ins import build_manifests
+from ticket_api.cinema.check_ins import sync_check_ins
+from ticket_api.cinema.exceptions import AttemptsIsOverError
+from ticket_api.cinema.exceptions import BookingQueueBusyAPIError
+from ticket_api.cinema.exceptions import BookingQueueBusyError
+from ticket_api.cinema.exceptions import EntryClosedAPIError
+from ticket_api.cinema.exceptions import EntryClosedError
+from ticket_api.cinema.exceptions import IncompatibleMovieSessionAPIError
+from ticket_api.cinema.exceptions import IncompatibleMovieSessionError
+from ticket_api.cinema.exceptions import InvalidTicketCodeAPIError
+from ticket_api.cinema.exceptions import InvalidTicketCodeError
 from ticket_api.cinema.exceptions import MovieIsScheduledAPIError
 from ticket_api.cinema.exceptions import MovieIsScheduledError
 from ticket_api.cinema.exceptions import MovieSessionHasBookingsAPIError
@@ -18,30 +39,110 @@ from ticket_api.cinema.exceptions import MovieSessionOverlapsAPIError
 from ticket_api.cinema.exceptions import MovieSessionOverlapsError
 from ticket_api.cinema.exceptions import NoBookingAvailableAPIError
 from ticket_api.cinema.exceptions import NoBookingAvailableError
+from ticket_api.cinema.exceptions import NoSuitableSeatsAPIError
+from ticket_api.cinema.exceptions import NoSuitableSeatsError
+from ticket_api.cinema.exceptions import OtherMovieSessionAPIError
+from ticket_api.cinema.exceptions import OtherMovieSessionError
+from ticket_api.cinema.exceptions import PasswordHashingOverloadedError
 from ticket_api.cinema.exceptions import SeatNotAvailableAPIError
 from ticket_api.cinema.exceptions import SeatNotAvailableError
+from ticket_api.cinema.exceptions import SeatsAvailableAPIError
+from ticket_api.cinema.exceptions import SeatsAvailableError
+from ticket_api.cinema.exceptions import TicketAlreadyCheckedInAPIError
+from ticket_api.cinema.exceptions import TicketAlreadyCheckedInError
 from ticket_api.cinema.exceptions import TicketAlreadyPaidAPIError
 from ticket_api.cinema.exceptions import TicketAlreadyPaidError
+from ticket_api.cinema.exceptions import TicketCodeOutOfDateAPIError
+from ticket_api.cinema.exceptions import TicketCodeOutOfDateError
+from ticket_api.cinema.exceptions import TicketCodeRevokedAPIError
+from ticket_api.cinema.exceptions import TicketCodeRevokedError
+from ticket_api.cinema.exceptions import TicketNotPaidAPIError
+from ticket_api.cinema.exceptions import TicketNotPaidError
+from ticket_api.cinema.export import EXPORT_URL_PATH
+from ticket_api.cinema.export import export_movie_sessions
+from ticket_api.cinema.export import export_tickets
+from ticket_api.cinema.metrics import BOOKINGS
+from ticket_api.cinema.metrics import registry
+from ticket_api.cinema.models import ArchivedTicket
 from ticket_api.cinema.models import Hall
 from ticket_api.cinema.models import Movie
 from ticket_api.cinema.models import MovieSession
 from ticket_api.cinema.models import Ticket
 from ticket_api.cinema.models import User
+from ticket_api.cinema.payments import pay_tickets
 from ticket_api.cinema.permissions import ReadOnly
+from ticket_api.cinema.profiling import get_stored_profile
 from ticket_api.cinema.serializers import AnonymousUserInfoSerializer
+from ticket_api.cinema.serializers import ArchivedTicketSerializer
+from ticket_api.cinema.serializers import BatchPaymentSerializer
+from ticket_api.cinema.serializers import BestSeatsSerializer
 from ticket_api.cinema.serializers import BookingForCustomerSerializer
 from ticket_api.cinema.serializers import BookingSerializer
+from ticket_api.cinema.serializers import CheckInResultSerializer
+from ticket_api.cinema.serializers import CheckInSerializer
+from ticket_api.cinema.serializers import CheckInSyncSerializer
 from ticket_api.cinema.serializers import HallAdminSerializer
 from ticket_api.cinema.serializers import HallPublicSerializer
+from ticket_api.cinema.serializers import ManifestSerializer
+from ticket_api.cinema.serializers import MoveTicketsSerializer
 from ticket_api.cinema.serializers import MovieAdminSerializer
 from ticket_api.cinema.serializers import MoviePublicSerializer
 from ticket_api.cinema.serializers import MovieSessionAdminSerializer
 from ticket_api.cinema.serializers import MovieSessionPublicSerializer
+from ticket_api.cinema.serializers import PaymentResultSerializer
+from ticket_api.cinema.serializers import RevokedTicketCodeSerializer
 from ticket_api.cinema.serializers import SeatSchemaSerializer
 from ticket_api.cinema.serializers import TicketAdminSerializer
+from ticket_api.cinema.serializers import TicketCodeSerializer
 from ticket_api.cinema.serializers import TicketPrivateSerializer
 from ticket_api.cinema.serializers import UserAdminSerializer
 from ticket_api.cinema.serializers import UserInfoSerializer
+from ticket_api.cinema.serializers import WaitlistEntrySerializer
+from ticket_api.cinema.sparse import SparseQuerySetMixin
+from ticket_api.cinema.throttling import LoginEmailThrottle
+from ticket_api.cinema.throttling import LoginIPThrottle
+from ticket_api.cinema.ticket_codes import make_ticket_code
+from ticket_api.cinema.ticket_codes import revoked_ticket_codes
+from ticket_api.cinema.ticket_codes import verify_ticket_code
+from ticket_api.cinema.waiting_room import check_admission
+from ticket_api.cinema.waiting_room import get_waiting_room
+from ticket_api.cinema.waiting_room import is_guarded
+from ticket_api.cinema.waiting_room import make_queue_token
+from ticket_api.cinema.waiting_room import read_queue_token
+
+
+def metrics(request):
+    # Served on the public port, so scrapers authenticate with a token
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not request.user.is_staff and not (
+            token and constant_time_compare(authorization, f'Bearer {token}')
+    ):
+        return HttpResponse(status=HTTP_403_FORBIDDEN)
+
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+class ThrottledRegistrationView(RegistrationView):
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)
+
+    def post(self, request, *args, **kwargs):
+        # Abusive retries are rejected before any password hashing
+        for throttle_class in self.throttle_classes:
+            if not throttle_class().allow_request(request, self):
+                return HttpResponse(status=HTTP_429_TOO_MANY_REQUESTS)
+
+        try:
+            return super(ThrottledRegistrationView, self).post(
+                request,
+                *args,
+                **kwargs
+            )
+        except PasswordHashingOverloadedError:
+            return HttpResponse(status=HTTP_503_SERVICE_UNAVAILABLE)
 
 
 class UserInfoViewSet(ViewSet):
@@ -53,21 +154,37 @@ class UserInfoViewSet(ViewSet):
         return Response(serializer.data)
 
 
-class UserViewSet(ModelViewSet):
+class SqlProfileViewSet(ViewSet):
+    permission_classes = (IsAuthenticated & IsAdminUser,)
+
+    def retrieve(self, request, pk=None):
+        profile = get_stored_profile(pk)
+        if profile is None:
+            return Response(status=HTTP_404_NOT_FOUND)
+        return Response(profile)
+
+
+class UserViewSet(SparseQuerySetMixin, ModelViewSet):
     permission_classes = (ReadOnly & IsAuthenticated & IsAdminUser,)
     queryset = User.objects.all()
     serializer_class = UserAdminSerializer
     search_fields = ('^email', '$first_name', '$last_name')
     ordering = ('email',)
 
+    def get_queryset(self):
+        return self.sparse_queryset(User.objects.all())
+
 
-class HallViewSet(ModelViewSet):
+class HallViewSet(SparseQuerySetMixin, ModelViewSet):
     permission_classes = (ReadOnly,)
     queryset = Hall.objects.all()
     search_fields = ('$name',)
     ordering_fields = ('name',)
     ordering = ('name',)
 
+    def get_queryset(self):
+        return self.sparse_queryset(Hall.objects.all())
+
     def get_serializer_class(self):
         if self.request.user.is_staff:
             return HallAdminSerializer
@@ -75,7 +192,7 @@ class HallViewSet(ModelViewSet):
             return HallPublicSerializer
 
 
-class MovieViewSet(ModelViewSet):
+class MovieViewSet(SparseQuerySetMixin, ModelViewSet):
     permission_classes = (ReadOnly | (IsAuthenticated & IsAdminUser),)
     queryset = Movie.objects.all()
     filterset_fields = {
@@ -85,6 +202,9 @@ class MovieViewSet(ModelViewSet):
     ordering_fields = ('name',)
     ordering = ('name',)
 
+    def get_queryset(self):
+        return self.sparse_queryset(Movie.objects.all())
+
     def get_serializer_class(self):
         if self.request.user.is_staff:
             return MovieAdminSerializer
@@ -104,32 +224,36 @@ class MovieViewSet(ModelViewSet):
             raise MovieIsScheduledAPIError()
 
 
-class MovieSessionViewSet(ModelViewSet):
+class MovieSessionViewSet(SparseQuerySetMixin, ModelViewSet):
     permission_classes = (ReadOnly | (IsAuthenticated & IsAdminUser),)
     queryset = MovieSession.objects.all()
     filterset_fields = {
         'movie': ['exact'],
         'date': ['exact', 'gt', 'lt'],
         'starts_at': ['gt', 'lt'],
+        'starts_at_dt': ['gt', 'lt'],
         'ticket_cost': ['gt', 'lt'],
     }
-    ordering_fields = ('date', 'starts_at', 'ticket_cost')
-    ordering = ('date', 'starts_at')
+    ordering_fields = ('date', 'starts_at', 'starts_at_dt', 'ticket_cost')
+    ordering = ('starts_at_dt',)
 
     def get_queryset(self):
+        queryset = MovieSession.objects.select_related('hall', 'movie')
+        if self.action in ('list', 'retrieve'):
+            if self.sparse_fields() & {'booked_seats', 'empty_seats'}:
+                queryset = queryset.with_booked_seats()
+            queryset = self.sparse_queryset(queryset)
+
         if self.request.user.is_staff:
-            return MovieSession.objects.all()
+            return queryset
         else:
-            now = timezone.now()
-            query = (
-                    Q(date__gt=now.date()) |
-                    (Q(date=now.date()) & Q(starts_at__gt=now.time()))
-            )
-            return MovieSession.objects.filter(query)
+            return queryset.filter(starts_at_dt__gt=timezone.now())
 
     def get_serializer_class(self):
         if self.action == 'book_ticket':
             return BookingSerializer
+        elif self.action == 'book_best_seats':
+            return BestSeatsSerializer
         elif self.action == 'book_ticket_for_customer':
             return BookingForCustomerSerializer
         elif self.request.user.is_staff:
@@ -144,6 +268,12 @@ class MovieSessionViewSet(ModelViewSet):
             raise MovieSessionOverlapsAPIError()
 
     def perform_update(self, serializer):
+        validated_data = serializer.validated_data
+        if validated_data and \
+                set(validated_data) <= set(MovieSession.SWITCHES):
+            serializer.instance.switch(**validated_data)
+            return
+
         try:
             serializer.save()
         except MovieSessionOverlapsError:
@@ -157,6 +287,58 @@ class MovieSessionViewSet(ModelViewSet):
         except (ProtectedError, MovieSessionHasBookingsError):
             raise MovieSessionHasBookingsAPIError()
 
+    @list_route(
+        ['GET'],
+        url_path=EXPORT_URL_PATH,
+        permission_classes=(IsAuthenticated & IsAdminUser,),
+    )
+    def export(self, request, export_format):
+        queryset = self.filter_queryset(MovieSession.objects.all())
+        return export_movie_sessions(queryset, export_format)
+
+    @list_route(['GET'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def manifest(self, request):
+        # Door devices send versions they have and time they got them at to
+        # get changes only
+        serializer = ManifestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, HTTP_400_BAD_REQUEST)
+
+        synced_at = timezone.now()
+        day = timezone.localdate(synced_at)
+        return Response({
+            'date': day,
+            'synced_at': synced_at,
+            'movie_sessions': build_manifests(
+                day,
+                serializer.validated_data['versions'],
+                serializer.validated_data['since'],
+            ),
+        })
+
+    def _book_ticket(self, movie_session, customer, row_number, seat_number):
+        try:
+            ticket = movie_session.book_ticket(
+                customer,
+                row_number=row_number,
+                seat_number=seat_number,
+            )
+        except SeatNotAvailableError:
+            BOOKINGS.inc(outcome='seat_not_available')
+            raise SeatNotAvailableAPIError()
+        except NoBookingAvailableError:
+            BOOKINGS.inc(outcome='no_booking_available')
+            raise NoBookingAvailableAPIError()
+        except AttemptsIsOverError:
+            BOOKINGS.inc(outcome='attempts_is_over')
+            raise
+        except BookingQueueBusyError:
+            BOOKINGS.inc(outcome='booking_queue_busy')
+            raise BookingQueueBusyAPIError()
+
+        BOOKINGS.inc(outcome='booked')
+        return ticket
+
     @detail_route(['GET'], permission_classes=(IsAuthenticated,))
     def seats(self, request, pk=None):
         movie_session: MovieSession = self.get_object()
@@ -166,24 +348,45 @@ class MovieSessionViewSet(ModelViewSet):
         )
         return Response(serializer.data)
 
+    @detail_route(['POST'], permission_classes=(IsAuthenticated,))
+    def enter_waiting_room(self, request, pk=None):
+        waiting_room = get_waiting_room()
+        movie_session: MovieSession = self.get_object()
+        if not is_guarded(movie_session.pk):
+            return Response({'token': None, 'position': 0, 'wait': 0})
+
+        claims = read_queue_token(request)
+        if claims is not None and claims['movie_session'] == movie_session.pk:
+            # Entering again keeps the place
+            position = claims['position']
+        else:
+            position = waiting_room.enqueue(movie_session.pk)
+
+        return Response({
+            'token': make_queue_token(
+                movie_session.pk,
+                request.user.pk,
+                position,
+            ),
+            'position': position,
+            'wait': waiting_room.admit(movie_session.pk, position),
+        })
+
     @detail_route(['POST'], permission_classes=(IsAuthenticated,))
     def book_ticket(self, request, pk=None):
+        check_admission(request, pk)
         movie_session: MovieSession = self.get_object()
         in_serializer = BookingSerializer(
             data=request.data,
             context={'movie_session': movie_session},
         )
         if in_serializer.is_valid():
-            try:
-                ticket = movie_session.book_ticket(
-                    request.user,
-                    row_number=in_serializer.validated_data['row_number'],
-                    seat_number=in_serializer.validated_data['seat_number'],
-                )
-            except SeatNotAvailableError:
-                raise SeatNotAvailableAPIError()
-            except NoBookingAvailableError:
-                raise NoBookingAvailableAPIError()
+            ticket = self._book_ticket(
+                movie_session,
+                request.user,
+                row_number=in_serializer.validated_data['row_number'],
+                seat_number=in_serializer.validated_data['seat_number'],
+            )
 
             if self.request.user.is_staff:
                 serializer_class = TicketAdminSerializer
@@ -198,8 +401,69 @@ class MovieSessionViewSet(ModelViewSet):
         else:
             return Response(in_serializer.errors, HTTP_400_BAD_REQUEST)
 
+    @detail_route(['POST'], permission_classes=(IsAuthenticated,))
+    def book_best_seats(self, request, pk=None):
+        check_admission(request, pk)
+        movie_session: MovieSession = self.get_object()
+        in_serializer = BestSeatsSerializer(data=request.data)
+        if not in_serializer.is_valid():
+            return Response(in_serializer.errors, HTTP_400_BAD_REQUEST)
+
+        try:
+            tickets = movie_session.book_best_seats(
+                request.user,
+                **in_serializer.validated_data,
+            )
+        except (SeatNotAvailableError, NoSuitableSeatsError):
+            BOOKINGS.inc(outcome='no_suitable_seats')
+            raise NoSuitableSeatsAPIError()
+        except NoBookingAvailableError:
+            BOOKINGS.inc(outcome='no_booking_available')
+            raise NoBookingAvailableAPIError()
+        except AttemptsIsOverError:
+            BOOKINGS.inc(outcome='attempts_is_over')
+            raise
+
+        BOOKINGS.inc(len(tickets), outcome='booked')
+
+        if self.request.user.is_staff:
+            serializer_class = TicketAdminSerializer
+        else:
+            serializer_class = TicketPrivateSerializer
+
+        out_serializer = serializer_class(
+            tickets,
+            many=True,
+            context={'request': request},
+        )
+        return Response(out_serializer.data)
+
+    @detail_route(['POST'], permission_classes=(IsAuthenticated,))
+    def join_waitlist(self, request, pk=None):
+        movie_session: MovieSession = self.get_object()
+
+        try:
+            entry = movie_session.join_waitlist(request.user)
+        except SeatsAvailableError:
+            raise SeatsAvailableAPIError()
+        except NoBookingAvailableError:
+            raise NoBookingAvailableAPIError()
+
+        serializer = WaitlistEntrySerializer(
+            entry,
+            context={'request': request},
+        )
+        return Response(serializer.data)
+
+    @detail_route(['POST'], permission_classes=(IsAuthenticated,))
+    def leave_waitlist(self, request, pk=None):
+        movie_session: MovieSession = self.get_object()
+        movie_session.waitlist.filter(customer=request.user).delete()
+        return Response(status=HTTP_204_NO_CONTENT)
+
     @detail_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
     def book_ticket_for_customer(self, request, pk=None):
+        check_admission(request, pk)
         movie_session: MovieSession = self.get_object()
 
         serializer = BookingForCustomerSerializer(
@@ -208,16 +472,12 @@ class MovieSessionViewSet(ModelViewSet):
         )
         if serializer.is_valid():
             validated_data = serializer.validated_data
-            try:
-                ticket = movie_session.book_ticket(
-                    validated_data['customer'],
-                    row_number=validated_data['row_number'],
-                    seat_number=validated_data['seat_number'],
-                )
-            except SeatNotAvailableError:
-                raise SeatNotAvailableAPIError()
-            except NoBookingAvailableError:
-                raise NoBookingAvailableAPIError()
+            ticket = self._book_ticket(
+                movie_session,
+                validated_data['customer'],
+                row_number=validated_data['row_number'],
+                seat_number=validated_data['seat_number'],
+            )
 
             serializer = TicketAdminSerializer(
                 ticket,
@@ -227,16 +487,53 @@ class MovieSessionViewSet(ModelViewSet):
         else:
             return Response(serializer.errors, HTTP_400_BAD_REQUEST)
 
+    @detail_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def cancel_unpaid_tickets(self, request, pk=None):
+        movie_session: MovieSession = self.get_object()
+        canceled = movie_session.cancel_unpaid_tickets()
+        return Response({'canceled': canceled})
+
+    @detail_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def move_tickets(self, request, pk=None):
+        movie_session: MovieSession = self.get_object()
+        serializer = MoveTicketsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, HTTP_400_BAD_REQUEST)
 
-class TicketViewSet(ModelViewSet):
+        try:
+            moved = movie_session.move_tickets(
+                serializer.validated_data['movie_session'],
+            )
+        except IncompatibleMovieSessionError:
+            raise IncompatibleMovieSessionAPIError()
+        except NoBookingAvailableError:
+            raise NoBookingAvailableAPIError()
+        except NoSuitableSeatsError:
+            raise NoSuitableSeatsAPIError()
+        except SeatNotAvailableError:
+            raise SeatNotAvailableAPIError()
+
+        return Response({'moved': moved})
+
+
+class TicketViewSet(SparseQuerySetMixin, ModelViewSet):
     permission_classes = (ReadOnly & IsAuthenticated,)
     queryset = Ticket.objects.all()
+    filterset_fields = {
+        'movie_session': ['exact'],
+        'movie_session__date': ['exact', 'gt', 'lt'],
+        'paid_at': ['isnull'],
+    }
 
     def get_queryset(self):
         if self.request.user.is_staff:
-            return Ticket.objects.all()
+            queryset = Ticket.objects.select_related('customer')
         else:
-            return Ticket.objects.filter(customer=self.request.user)
+            queryset = Ticket.objects.select_related(
+                'movie_session__hall',
+                'movie_session__movie',
+            ).filter(customer=self.request.user)
+        return self.sparse_queryset(queryset)
 
     def get_serializer_class(self):
         if self.request.user.is_staff:
@@ -247,6 +544,7 @@ class TicketViewSet(ModelViewSet):
     @detail_route(['POST'], permission_classes=(IsAuthenticated,))
     def pay(self, request, pk=None):
         ticket: Ticket = self.get_object()
+        check_admission(request, ticket.movie_session_id)
 
         try:
             ticket.make_payment()
@@ -258,6 +556,30 @@ class TicketViewSet(ModelViewSet):
         serializer = self.get_serializer(ticket)
         return Response(serializer.data)
 
+    @list_route(
+        ['POST'],
+        url_path='pay',
+        permission_classes=(IsAuthenticated,),
+    )
+    def pay_many(self, request):
+        in_serializer = BatchPaymentSerializer(data=request.data)
+        if not in_serializer.is_valid():
+            return Response(in_serializer.errors, HTTP_400_BAD_REQUEST)
+
+        if request.user.is_staff:
+            queryset = Ticket.objects.all()
+        else:
+            queryset = Ticket.objects.filter(customer=request.user)
+
+        results = pay_tickets(
+            queryset,
+            in_serializer.validated_data['tickets'],
+            check_session=lambda pk: check_admission(request, pk),
+        )
+
+        out_serializer = PaymentResultSerializer(results, many=True)
+        return Response(out_serializer.data)
+
     @detail_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
     def cancel(self, request, pk=None):
         ticket: Ticket = self.get_object()
@@ -268,3 +590,130 @@ class TicketViewSet(ModelViewSet):
             raise TicketAlreadyPaidAPIError()
 
         return Response(status=HTTP_204_NO_CONTENT)
+
+    @detail_route(['GET'], permission_classes=(IsAuthenticated,))
+    def code(self, request, pk=None):
+        ticket: Ticket = self.get_object()
+        if ticket.paid_at is None:
+            raise TicketNotPaidAPIError()
+
+        return Response({'code': make_ticket_code(ticket)})
+
+    @list_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def verify_code(self, request):
+        serializer = TicketCodeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, HTTP_400_BAD_REQUEST)
+
+        try:
+            ticket_code = verify_ticket_code(
+                serializer.validated_data['code'],
+            )
+        except InvalidTicketCodeError:
+            raise InvalidTicketCodeAPIError()
+        except TicketCodeOutOfDateError:
+            raise TicketCodeOutOfDateAPIError()
+        except TicketCodeRevokedError:
+            raise TicketCodeRevokedAPIError()
+
+        return Response({
+            'ticket': ticket_code.ticket,
+            'movie_session': ticket_code.movie_session,
+            'row_number': ticket_code.row_number,
+            'seat_number': ticket_code.seat_number,
+            'order_number': ticket_code.order_number,
+        })
+
+    @list_route(['GET'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def revoked_codes(self, request):
+        # Devices verifying codes offline download it with manifests
+        serializer = RevokedTicketCodeSerializer(
+            revoked_ticket_codes.active().order_by('pk'),
+            many=True,
+        )
+        return Response(serializer.data)
+
+    @list_route(['POST'], permission_classes=(IsAuthenticated & IsAdminUser,))
+    def check_in(self, request):
+        # Door scanners get by with one update of the ticket and one of
+        # its session manifest, ticket is never loaded
+        serializer = CheckInSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, HTTP_400_BAD_REQUEST)
+
+        order_number = serializer.validated_data['order_number']
+        try:
+            checked_in_at = Ticket.objects.check_in(
+                order_number,
+                serializer.validated_data['movie_session'],
+            )
+        except Ticket.DoesNotExist:
+            raise NotFound()
+        except OtherMovieSessionError:
+            raise OtherMovieSessionAPIError()
+        except TicketAlreadyCheckedInError:
+            raise TicketAlreadyCheckedInAPIError()
+        except TicketNotPaidError:
+            raise TicketNotPaidAPIError()
+        except EntryClosedError:
+            raise EntryClosedAPIError()
+
+        return Response({
+            'order_number': order_number,
+            'checked_in_at': checked_in_at,
+        })
+
+    @list_route(
+        ['POST'],
+        url_path='check_in/sync',
+        permission_classes=(IsAuthenticated & IsAdminUser,),
+    )
+    def sync_check_ins(self, request):
+        in_serializer = CheckInSyncSerializer(data=request.data)
+        if not in_serializer.is_valid():
+            return Response(in_serializer.errors, HTTP_400_BAD_REQUEST)
+
+        events = in_serializer.validated_data['events']
+        results = sync_check_ins([
+            (
+                event['order_number'],
+                event['movie_session'],
+                event['checked_in_at'],
+            )
+            for event in events
+        ])
+
+        out_serializer = CheckInResultSerializer(results, many=True)
+        return Response(out_serializer.data)
+
+    @list_route(
+        ['GET'],
+        url_path=EXPORT_URL_PATH,
+        permission_classes=(IsAuthenticated & IsAdminUser,),
+    )
+    def export(self, request, export_format):
+        queryset = self.filter_queryset(Ticket.objects.all())
+        return export_tickets(queryset, export_format)
+
+
+class ArchivedTicketViewSet(SparseQuerySetMixin, ReadOnlyModelViewSet):
+    permission_classes = (IsAuthenticated & IsAdminUser,)
+    queryset = ArchivedTicket.objects.select_related(
+        'customer',
+        'movie_session__hall',
+        'movie_session__movie',
+    )
+    serializer_class = ArchivedTicketSerializer
+    filterset_fields = {
+        'session_date': ['exact', 'gt', 'lt'],
+        'order_number': ['exact'],
+        'customer__email': ['exact'],
+    }
+    ordering_fields = ('session_date', 'booked_at')
+    ordering = ('-session_date', 'pk')
+
+    def get_queryset(self):
+        return self.sparse_queryset(super(
+            ArchivedTicketViewSet,
+            self,
+        ).get_queryset())
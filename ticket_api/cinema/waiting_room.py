@@ -0,0 +1,278 @@
+import threading
+from abc import ABC
+from abc import abstractmethod
+from functools import lru_cache
+from time import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from ticket_api.cinema.exceptions import NotAdmittedAPIError
+
+QUEUE_TOKEN_HEADER = 'HTTP_X_QUEUE_TOKEN'
+QUEUE_TOKEN_SALT = 'ticket_api.cinema.waiting_room'
+
+
+def refill(bucket, now: float, issued: int):
+    """
+    Advances admission frontier of the queue by tokens collected since last
+    refill. Tokens are gained at `WAITING_ROOM_RATE` per second up to
+    `WAITING_ROOM_BURST`, each one admits the next position in the queue.
+
+    Bucket is `(frontier, tokens, updated_at)` tuple, returns updated one.
+    """
+    frontier, tokens, updated_at = bucket
+    tokens = min(
+        settings.WAITING_ROOM_BURST,
+        tokens + (now - updated_at) * settings.WAITING_ROOM_RATE,
+    )
+    step = max(min(int(tokens), issued - frontier), 0)
+    return frontier + step, tokens - step, now
+
+
+def estimate_wait(bucket, position: int) -> float:
+    frontier, tokens, _ = bucket
+    if position <= frontier:
+        return 0
+    return max(position - frontier - tokens, 1) / settings.WAITING_ROOM_RATE
+
+
+class WaitingRoom(ABC):
+    """
+    Queue state of high demand sessions: number of issued queue positions
+    and the token bucket admitting them. State is created on first use, so
+    lost state starts the queue over instead of letting requests bypass it.
+    """
+
+    @abstractmethod
+    def clear(self, movie_session_pk):
+        """
+        Drops queue of the session, which is no longer guarded.
+        """
+
+    @abstractmethod
+    def enqueue(self, movie_session_pk) -> int:
+        """
+        Returns next position in the queue, starting from 1.
+        """
+
+    @abstractmethod
+    def admit(self, movie_session_pk, position: int) -> float:
+        """
+        Returns estimated seconds to wait for the position, 0 once admitted.
+        """
+
+
+def _new_bucket():
+    return 0, settings.WAITING_ROOM_BURST, time()
+
+
+class LocalWaitingRoom(WaitingRoom):
+    """
+    Per-process queue state, for tests and single process deployments.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def clear(self, movie_session_pk):
+        with self._lock:
+            self._issued.pop(movie_session_pk, None)
+            self._buckets.pop(movie_session_pk, None)
+
+    def enqueue(self, movie_session_pk) -> int:
+        with self._lock:
+            self._issued[movie_session_pk] = (
+                self._issued.get(movie_session_pk, 0) + 1
+            )
+            return self._issued[movie_session_pk]
+
+    def admit(self, movie_session_pk, position: int) -> float:
+        with self._lock:
+            bucket = self._buckets.get(movie_session_pk) or _new_bucket()
+            if position > bucket[0]:
+                bucket = refill(
+                    bucket,
+                    time(),
+                    self._issued.get(movie_session_pk, 0),
+                )
+            self._buckets[movie_session_pk] = bucket
+            return estimate_wait(bucket, position)
+
+    def reset(self):
+        self._issued = {}
+        self._buckets = {}
+
+
+class CacheWaitingRoom(WaitingRoom):
+    """
+    Queue state in `WAITING_ROOM_CACHE`, shared by processes using the same
+    cache server.
+
+    Queue positions are issued by atomic increments. Bucket is refilled
+    under a short lock entry, requests not getting the lock are answered
+    from the last stored bucket and simply retry later.
+    """
+
+    lock_timeout = 5
+
+    @property
+    def _cache(self):
+        return caches[settings.WAITING_ROOM_CACHE]
+
+    def _key(self, movie_session_pk, name):
+        return f'waiting-room:{movie_session_pk}:{name}'
+
+    def clear(self, movie_session_pk):
+        self._cache.delete_many([
+            self._key(movie_session_pk, 'bucket'),
+            self._key(movie_session_pk, 'issued'),
+        ])
+
+    def enqueue(self, movie_session_pk) -> int:
+        cache = self._cache
+        issued_key = self._key(movie_session_pk, 'issued')
+        try:
+            return cache.incr(issued_key)
+        except ValueError:
+            # Evicted or not started yet, positions go on after admitted
+            # ones so nobody gets in out of turn
+            bucket = cache.get(self._key(movie_session_pk, 'bucket'))
+            cache.add(issued_key, bucket[0] if bucket else 0, None)
+            return cache.incr(issued_key)
+
+    def admit(self, movie_session_pk, position: int) -> float:
+        cache = self._cache
+        bucket_key = self._key(movie_session_pk, 'bucket')
+        lock_key = self._key(movie_session_pk, 'lock')
+
+        bucket = cache.get(bucket_key)
+        if bucket is None:
+            cache.add(bucket_key, _new_bucket(), None)
+            bucket = cache.get(bucket_key) or _new_bucket()
+        if position <= bucket[0]:
+            return 0
+        if not cache.add(lock_key, 1, self.lock_timeout):
+            return estimate_wait(bucket, position)
+
+        try:
+            bucket = refill(
+                cache.get(bucket_key, bucket),
+                time(),
+                cache.get(self._key(movie_session_pk, 'issued'), 0),
+            )
+            cache.set(bucket_key, bucket, None)
+        finally:
+            cache.delete(lock_key)
+
+        return estimate_wait(bucket, position)
+
+
+@lru_cache(maxsize=None)
+def _load_waiting_room(path) -> WaitingRoom:
+    return import_string(path)()
+
+
+def get_waiting_room() -> WaitingRoom:
+    return _load_waiting_room(settings.WAITING_ROOM_BACKEND)
+
+
+def _guard_key(movie_session_pk):
+    return f'waiting-room:{movie_session_pk}:guarded'
+
+
+def guard_movie_session(movie_session_pk, enabled: bool):
+    """
+    Updates cached high demand flag of the saved session, its queue is kept
+    while the session stays guarded.
+    """
+    caches[settings.WAITING_ROOM_CACHE].set(
+        _guard_key(movie_session_pk),
+        enabled,
+        settings.WAITING_ROOM_GUARD_TTL.total_seconds(),
+    )
+    if not enabled:
+        get_waiting_room().clear(movie_session_pk)
+
+
+def is_guarded(movie_session_pk) -> bool:
+    """
+    Tells high demand sessions by their database flag, cached for
+    `WAITING_ROOM_GUARD_TTL`.
+    """
+    from ticket_api.cinema.models import MovieSession
+
+    cache = caches[settings.WAITING_ROOM_CACHE]
+    guarded = cache.get(_guard_key(movie_session_pk))
+    if guarded is None:
+        guarded = MovieSession.objects.filter(
+            pk=movie_session_pk,
+            high_demand=True,
+        ).exists()
+        cache.set(
+            _guard_key(movie_session_pk),
+            guarded,
+            settings.WAITING_ROOM_GUARD_TTL.total_seconds(),
+        )
+    return guarded
+
+
+def make_queue_token(movie_session_pk, user_pk, position: int) -> str:
+    claims = {
+        'movie_session': movie_session_pk,
+        'user': user_pk,
+        'position': position,
+    }
+    return signing.dumps(claims, salt=QUEUE_TOKEN_SALT, compress=True)
+
+
+def read_queue_token(request):
+    """
+    Returns claims of the queue token sent with the request, None when
+    there is no valid one.
+    """
+    token = request.META.get(QUEUE_TOKEN_HEADER)
+    if not token:
+        return None
+
+    try:
+        claims = signing.loads(
+            token,
+            salt=QUEUE_TOKEN_SALT,
+            max_age=settings.WAITING_ROOM_TOKEN_TTL.total_seconds(),
+        )
+    except signing.BadSignature:
+        return None
+
+    if claims.get('user') != request.user.pk:
+        return None
+    return claims
+
+
+def check_admission(request, movie_session_pk):
+    """
+    Raises `NotAdmittedAPIError` unless the session is not guarded or the
+    request carries a queue token of the session already admitted. Costs no
+    database queries while the high demand flag is cached.
+    """
+    try:
+        movie_session_pk = int(movie_session_pk)
+    except ValueError:
+        # Not found anyway
+        return
+
+    if not is_guarded(movie_session_pk):
+        return
+
+    claims = read_queue_token(request)
+    if claims is None or claims['movie_session'] != movie_session_pk:
+        raise NotAdmittedAPIError(
+            detail='Enter the waiting room of the session first.',
+        )
+
+    wait = get_waiting_room().admit(movie_session_pk, claims['position'])
+    if wait:
+        raise NotAdmittedAPIError(wait)
@@ -17,12 +17,18 @@ from django.urls import include
 from django.urls import path
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView
-from django_registration.backends.one_step.views import RegistrationView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.views import TokenVerifyView
 
 from ticket_api.cinema.forms import RegistrationForm
+from ticket_api.cinema.serializers import ClaimsTokenObtainPairSerializer
+from ticket_api.cinema.serializers import ClaimsTokenRefreshSerializer
+from ticket_api.cinema.serializers import RevocationAwareTokenVerifySerializer
+from ticket_api.cinema.throttling import LoginEmailThrottle
+from ticket_api.cinema.throttling import LoginIPThrottle
+from ticket_api.cinema.views import ThrottledRegistrationView
+from ticket_api.cinema.views import metrics
 
 urlpatterns = [
     path(
@@ -33,17 +39,24 @@ urlpatterns = [
     path(r'api/', include('ticket_api.cinema.urls')),
     path(
         r'api/auth/token/',
-        TokenObtainPairView.as_view(),
+        TokenObtainPairView.as_view(
+            serializer_class=ClaimsTokenObtainPairSerializer,
+            throttle_classes=(LoginIPThrottle, LoginEmailThrottle),
+        ),
         name='token_obtain_pair',
     ),
     path(
         r'api/auth/token/refresh/',
-        TokenRefreshView.as_view(),
+        TokenRefreshView.as_view(
+            serializer_class=ClaimsTokenRefreshSerializer,
+        ),
         name='token_refresh',
     ),
     path(
         r'api/auth/token/verify/',
-        TokenVerifyView.as_view(),
+        TokenVerifyView.as_view(
+            serializer_class=RevocationAwareTokenVerifySerializer,
+        ),
         name='token_verify',
     ),
     path(
@@ -52,10 +65,11 @@ urlpatterns = [
     ),
     path(
         r'api/auth/register/',
-        RegistrationView.as_view(
+        ThrottledRegistrationView.as_view(
             form_class=RegistrationForm,
             success_url=reverse_lazy('api-root'),
         ),
         name='django_registration_register',
     ),
+    path(r'metrics', metrics, name='metrics'),
 ]